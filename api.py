@@ -0,0 +1,482 @@
+# ===== HTTP / JSON API ===== #
+#
+# Optional asyncio service giving other tools the operations the GUI performs,
+# over the same DatabaseManager, instead of their own database connections.
+#
+#   python api.py [--config config.ini] [--host 127.0.0.1] [--port 8765]
+#
+#   GET    /students?limit=&after=&sort=    page of students (keyset: pass the
+#          &field=&term=                    returned "next" as after=); with
+#                                           field/term, a search
+#   GET    /count?field=&term=              number of matching students
+#   GET    /students/<RegistrationNo>       one student
+#   POST   /students                        add (JSON object of CSV columns)
+#   PUT    /students/<RegistrationNo>       update
+#   DELETE /students/<RegistrationNo>       delete
+#   GET    /export                          every student as streamed CSV
+#   GET    /health
+#
+# Database calls block, so they run on a thread pool as large as the
+# connection pool. At most that many run at once; up to max_pending more may
+# wait for a slot, and anything beyond is refused with 503 and Retry-After
+# rather than queued without bound.
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+from models.csv_io import (
+    CSV_HEADER,
+    OperationCancelled,
+    export_students,
+    validate_student_fields,
+)
+from models.database import DatabaseManager
+from models.pagination import KeysetPager, STUDENT_COLUMNS, parse_sort_order
+from models.pool import PoolError
+from models.schema import ensure_schema
+from models.search import SEARCH_FIELDS, build_search, search_order
+from models.students import (
+    CHECK_STUDENT,
+    UPDATE_STUDENT,
+    add_student,
+    delete_student,
+    student_dict,
+)
+
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 100
+MAX_BODY_BYTES = 64 * 1024
+# Idle keep-alive connections are closed after this many seconds
+IDLE_TIMEOUT = 30
+# Export chunks buffered between the database thread and a slow client
+EXPORT_QUEUE_CHUNKS = 4
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Overloaded(Exception):
+    """Raised when every database slot is busy and the wait queue is full."""
+
+
+class _ChunkWriter:
+    """File object for export_students that hands chunks to the event loop.
+
+    Text is buffered and passed on once per fetched batch; put() blocks the
+    database thread while the queue is full, so a slow client slows the
+    cursor instead of growing memory.
+    """
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+        self.buffer = io.StringIO()
+        self.sent = False
+
+    def write(self, text):
+        return self.buffer.write(text)
+
+    def flush(self):
+        data = self.buffer.getvalue()
+        if data:
+            self.buffer = io.StringIO()
+            self.put(data.encode("utf-8"))
+            self.sent = True
+
+    def put(self, chunk):
+        asyncio.run_coroutine_threadsafe(self.queue.put(chunk), self.loop).result()
+
+
+class StudentAPI:
+    def __init__(self, db_manager, max_pending=64):
+        self.db_manager = db_manager
+        self.workers = ThreadPoolExecutor(
+            max_workers=db_manager.capacity, thread_name_prefix="api-db"
+        )
+        self.slots = asyncio.Semaphore(db_manager.capacity)
+        self.max_pending = max_pending
+        self.pending = 0
+
+    # ----- database access ----- #
+
+    async def run_db(self, work, *args):
+        """Run ``work(db_manager, *args)`` on a worker thread, with backpressure."""
+        if self.slots.locked() and self.pending >= self.max_pending:
+            raise Overloaded()
+        self.pending += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.pending -= 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.workers, lambda: work(self.db_manager, *args)
+            )
+        finally:
+            self.slots.release()
+
+    # ----- connection handling ----- #
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        self.read_request(reader), IDLE_TIMEOUT
+                    )
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except HTTPError as e:
+                    await self.send_json(writer, e.status, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, target, keep_alive, body = request
+                keep_alive = await self.respond(
+                    writer, method, target, body, keep_alive
+                )
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """``(method, target, keep_alive, body)``, or None at end of stream."""
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"body larger than {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (
+            version == "HTTP/1.1" or connection == "keep-alive"
+        )
+        return method.upper(), target, keep_alive, body
+
+    async def respond(self, writer, method, target, body, keep_alive):
+        started = time.perf_counter()
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        route = parts[0] if parts else ""
+        try:
+            if method == "GET" and route == "export" and len(parts) == 1:
+                await self.export(writer)
+                return False
+            status, payload = await self.dispatch(method, parts, query, body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Overloaded:
+            status, payload = 503, {"error": "server busy, retry later"}
+        except PoolError as e:
+            status, payload = 503, {"error": str(e)}
+        except Exception as e:
+            print(f"Error handling {method} {url.path}: {e}")
+            status, payload = 500, {"error": str(e)}
+
+        await self.send_json(writer, status, payload, keep_alive)
+        metrics = self.db_manager.metrics
+        if metrics is not None:
+            metrics.record(f"api {method} /{route}", time.perf_counter() - started)
+        return keep_alive
+
+    async def dispatch(self, method, parts, query, body):
+        route, rest = parts[0], parts[1:]
+        if route == "health" and not rest:
+            return 200, {"status": "ok", "backend": self.db_manager.backend}
+        if route == "count" and not rest and method == "GET":
+            return 200, {"count": await self.run_db(count_students, query)}
+        if route == "students" and not rest:
+            if method == "GET":
+                return 200, await self.run_db(list_students, query)
+            if method == "POST":
+                record = parse_student(load_json(body))
+                result = await self.run_db(add_student, record)
+                if result == "exists":
+                    raise HTTPError(409, f"{record[0]} already exists")
+                if result != "added":
+                    raise HTTPError(500, "failed to add student")
+                return 201, student_dict(record)
+            raise HTTPError(405, f"{method} not allowed on /students")
+        if route == "students" and len(rest) == 1:
+            reg_no = rest[0]
+            if method == "GET":
+                record = await self.run_db(get_student, reg_no)
+                if record is None:
+                    raise HTTPError(404, f"{reg_no} not found")
+                return 200, student_dict(record)
+            if method == "PUT":
+                fields = dict(load_json(body), RegistrationNo=reg_no)
+                record = parse_student(fields)
+                if not await self.run_db(replace_student, record):
+                    raise HTTPError(404, f"{reg_no} not found")
+                return 200, student_dict(record)
+            if method == "DELETE":
+                if not await self.run_db(remove_student, reg_no):
+                    raise HTTPError(404, f"{reg_no} not found")
+                return 204, None
+            raise HTTPError(405, f"{method} not allowed on /students/<id>")
+        raise HTTPError(404, "no such endpoint")
+
+    async def export(self, writer):
+        """Stream the CSV export with chunked transfer encoding."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+        cancel_event = threading.Event()
+        chunks = _ChunkWriter(loop, queue)
+
+        def work(db):
+            try:
+                count = export_students(
+                    db,
+                    chunks,
+                    progress=lambda count: chunks.flush(),
+                    cancel_event=cancel_event,
+                )
+            except BaseException:
+                # Only the CSV header is buffered before the first batch; drop
+                # it so the failure is answered with its own status
+                if chunks.sent:
+                    chunks.put(None)
+                raise
+            chunks.flush()
+            chunks.put(None)
+            return count
+
+        # Wait for the first chunk or for the job to fail before it produced
+        # any (Overloaded, no connection, a failed query), so errors can still
+        # get a proper status
+        job = asyncio.ensure_future(self.run_db(work))
+        first = asyncio.ensure_future(queue.get())
+        done, _ = await asyncio.wait({job, first}, return_when=asyncio.FIRST_COMPLETED)
+        if first not in done:
+            first.cancel()
+            try:
+                job.result()
+            except Overloaded:
+                await self.send_json(writer, 503, {"error": "server busy"}, False)
+            except Exception as e:
+                await self.send_json(writer, 500, {"error": str(e)}, False)
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/csv; charset=utf-8\r\n"
+            b'Content-Disposition: attachment; filename="students.csv"\r\n'
+            b"Transfer-Encoding: chunked\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        chunk = first.result()
+        try:
+            while chunk is not None:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+                chunk = await queue.get()
+        except ConnectionError:
+            # Client went away: stop the cursor and let the worker finish
+            cancel_event.set()
+            while chunk is not None:
+                chunk = await queue.get()
+        try:
+            await job
+        except OperationCancelled:
+            return
+        except Exception as e:
+            # Headers are gone; ending without the last chunk marks it truncated
+            print(f"Error streaming export: {e}")
+            return
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def send_json(self, writer, status, payload, keep_alive):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+# ----- request helpers and database work (run on worker threads) ----- #
+
+
+def load_json(body):
+    try:
+        value = json.loads(body or b"{}")
+    except ValueError as e:
+        raise HTTPError(400, f"invalid JSON: {e}")
+    if not isinstance(value, dict):
+        raise HTTPError(400, "expected a JSON object")
+    return value
+
+
+def parse_student(fields):
+    """Validate a JSON student the same way as a CSV import row."""
+    values = [fields.get(column) for column in CSV_HEADER]
+    row, reason = validate_student_fields(
+        ["" if value is None else str(value) for value in values]
+    )
+    if row is None:
+        raise HTTPError(400, reason)
+    return row
+
+
+def page_size(query):
+    try:
+        limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise HTTPError(400, "limit must be a number")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def query_pager(db_manager, query, limit=DEFAULT_PAGE_SIZE):
+    field, term = query.get("field"), (query.get("term") or "").strip()
+    order = parse_sort_order(query.get("sort"))
+    if field is None and not term:
+        return KeysetPager(page_size=limit, order=order)
+    if field not in SEARCH_FIELDS:
+        raise HTTPError(400, f"field must be one of {', '.join(SEARCH_FIELDS)}")
+    if not term:
+        raise HTTPError(400, "term is required with field")
+    try:
+        where, params = build_search(field, term, db_manager.backend)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return KeysetPager(
+        where, params, page_size=limit, order=search_order(field, order)
+    )
+
+
+def list_students(db_manager, query):
+    pager = query_pager(db_manager, query, page_size(query))
+    records = pager.fetch_after(db_manager, query.get("after"))
+    more = len(records) == pager.page_size
+    return {
+        "students": [student_dict(record) for record in records],
+        "next": str(records[-1][0]) if more else None,
+    }
+
+
+def count_students(db_manager, query):
+    return query_pager(db_manager, query).count(db_manager)
+
+
+def get_student(db_manager, reg_no):
+    return db_manager.fetch_one(
+        f"SELECT {STUDENT_COLUMNS} FROM students WHERE RegistrationNo = %s",
+        (reg_no,),
+    )
+
+
+def replace_student(db_manager, record):
+    """Update ``record``; False if there is no such student."""
+    updated = db_manager.execute_count(
+        UPDATE_STUDENT, tuple(record[1:]) + (record[0],)
+    )
+    if updated is None:
+        raise HTTPError(500, "failed to update student")
+    # MySQL reports 0 affected rows when nothing changed, so check existence
+    return updated > 0 or bool(
+        db_manager.fetch_one(
+            CHECK_STUDENT, (record[0],), cached=False, primary=True
+        )
+    )
+
+
+def remove_student(db_manager, reg_no):
+    if not db_manager.fetch_one(
+        CHECK_STUDENT, (reg_no,), cached=False, primary=True
+    ):
+        return False
+    if not delete_student(db_manager, reg_no):
+        raise HTTPError(500, "failed to delete student")
+    return True
+
+
+async def serve(db_manager, host, port, max_pending):
+    api = StudentAPI(db_manager, max_pending)
+    server = await asyncio.start_server(api.handle_connection, host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Listening on http://{address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.workers.shutdown(wait=True, cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student database HTTP/JSON API")
+    parser.add_argument("--config", default="config.ini", help="config file")
+    parser.add_argument("--host", help="address to bind ([API] host)")
+    parser.add_argument("--port", type=int, help="port, 0 for any ([API] port)")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.config, interactive=False)
+    host = args.host or db_manager.config.get("API", "host", fallback="127.0.0.1")
+    port = args.port
+    if port is None:
+        port = db_manager.config.getint("API", "port", fallback=8765)
+    max_pending = db_manager.config.getint("API", "max_pending", fallback=64)
+
+    if not ensure_schema(db_manager):
+        print("Error: could not prepare the database schema", file=sys.stderr)
+        return 1
+    try:
+        asyncio.run(serve(db_manager, host, port, max_pending))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        db_manager.close_connection()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
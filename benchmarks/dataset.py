@@ -0,0 +1,85 @@
+# ===== SYNTHETIC STUDENT DATASET ===== #
+#
+# Deterministic, realistic-looking student rows for benchmarks: the same
+# ``count`` and ``seed`` always produce the same rows.
+#
+#   python -m benchmarks.dataset --rows 100000 --output students.csv
+
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+from models.csv_io import CSV_HEADER, student_csv_row
+
+FIRST_NAMES = (
+    "Muhammad", "Ali", "Ahmed", "Hassan", "Hamza", "Usman", "Bilal", "Zain",
+    "Fatima", "Ayesha", "Zainab", "Maryam", "Hira", "Sana", "Amna", "Iqra",
+    "Omar", "Saad", "Faisal", "Imran", "Sara", "Noor", "Mehwish", "Rabia",
+    "John", "Maria", "David", "Sophia", "James", "Emma", "Daniel", "Olivia",
+)
+LAST_NAMES = (
+    "Khan", "Ahmed", "Ali", "Hussain", "Malik", "Qureshi", "Sheikh", "Butt",
+    "Chaudhry", "Raza", "Iqbal", "Siddiqui", "Javed", "Anwar", "Aslam", "Baig",
+    "Smith", "Johnson", "Brown", "Garcia", "Wilson", "Taylor", "Lee", "Walker",
+)
+DEPARTMENTS = ("CS", "EE", "ME", "CE", "BBA", "SE", "AI", "DS")
+EMAIL_DOMAINS = (
+    "gmail.com", "yahoo.com", "outlook.com", "hotmail.com", "uob.edu.pk",
+)
+MOBILE_PREFIXES = ("0300", "0301", "0312", "0321", "0333", "0345", "0302", "0315")
+
+FIRST_DOB = date(1996, 1, 1)
+DOB_DAYS = 365 * 10
+
+
+def registration_no(index):
+    """Unique YEAR-DEPT-SERIAL numbers, spread over ten intake years."""
+    year = 2015 + index % 10
+    department = DEPARTMENTS[(index // 10) % len(DEPARTMENTS)]
+    return f"{year}-{department}-{index:08d}"
+
+
+def generate_students(count, seed=0):
+    """Yield ``count`` student row tuples, reproducible for a given ``seed``."""
+    rng = random.Random(seed)
+    for index in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        name = f"{first} {last}"
+        email = (
+            f"{first.lower()}.{last.lower()}{index}@{rng.choice(EMAIL_DOMAINS)}"
+            if rng.random() < 0.9
+            else ""
+        )
+        contact = f"{rng.choice(MOBILE_PREFIXES)}{rng.randrange(10**7):07d}"
+        dob = (
+            FIRST_DOB + timedelta(days=rng.randrange(DOB_DAYS))
+            if rng.random() < 0.95
+            else None
+        )
+        hostelite = "Yes" if rng.random() < 0.35 else "No"
+        yield (registration_no(index), name, email, contact, dob, hostelite)
+
+
+def write_csv(file, count, seed=0):
+    """Write the dataset in export_students() layout, ready for import."""
+    writer = csv.writer(file)
+    writer.writerow(CSV_HEADER)
+    for row in generate_students(count, seed):
+        writer.writerow(student_csv_row(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a student CSV dataset")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="students.csv")
+    args = parser.parse_args()
+
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        write_csv(f, args.rows, args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
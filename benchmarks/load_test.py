@@ -0,0 +1,290 @@
+# ===== API LOAD TEST ===== #
+#
+# Drives the HTTP API (api.py) with concurrent keep-alive clients and reports
+# throughput and latency percentiles.
+#
+#   python -m benchmarks.load_test --rows 100000 --concurrency 64 --duration 15
+#   python -m benchmarks.load_test --url http://127.0.0.1:8765 --mix get
+#
+# Without --url a throwaway SQLite database with a generated dataset is created
+# and api.py is started on it in a separate process, so client and server do
+# not share an interpreter.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import quote, urlsplit
+from benchmarks.dataset import write_csv
+from models.csv_io import import_students
+from models.database import DatabaseManager
+from models.schema import ensure_schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Request kinds and the share of traffic each gets in the default mix
+MIXES = {
+    "read": {"get": 5, "list": 3, "search": 2},
+    "get": {"get": 1},
+    "list": {"list": 1},
+    "search": {"search": 1},
+    "write": {"get": 6, "list": 1, "search": 1, "update": 2},
+}
+
+SEARCH_TERMS = ("khan", "ali", "ahmed", "fatima", "sheikh", "wilson")
+
+LOAD_TEST_CONFIG = """\
+[DATABASE]
+backend = sqlite
+path = {path}
+
+[POOL]
+pool_size = {pool_size}
+
+[API]
+max_pending = {max_pending}
+"""
+
+
+def prepare_database(workdir, rows, seed, pool_size, max_pending):
+    config_file = os.path.join(workdir, "api.ini")
+    with open(config_file, "w") as f:
+        f.write(
+            LOAD_TEST_CONFIG.format(
+                path=os.path.join(workdir, "students.db"),
+                pool_size=pool_size,
+                max_pending=max_pending,
+            )
+        )
+    db_manager = DatabaseManager(config_file, interactive=False)
+    ensure_schema(db_manager)
+    csv_path = os.path.join(workdir, "students.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        write_csv(f, rows, seed)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        import_students(db_manager, f)
+    db_manager.close_connection()
+    return config_file
+
+
+def start_server(config_file):
+    """Run api.py on a free port; returns ``(process, host, port)``."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "api.py"), "--config", config_file,
+         "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=ROOT,
+    )
+    line = process.stdout.readline()
+    if not line.startswith("Listening on"):
+        process.kill()
+        raise RuntimeError(f"API did not start: {line!r}")
+    address = urlsplit(line.split()[-1])
+    return process, address.hostname, address.port
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1")
+            + data
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length, keep_alive = 0, True
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection":
+                keep_alive = value.strip().lower() != "close"
+        payload = await self.reader.readexactly(length) if length else b""
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def make_request(kind, students, rng):
+    """``(method, path, body)`` for one request of ``kind``."""
+    student = rng.choice(students)
+    key = quote(student["RegistrationNo"])
+    if kind == "get":
+        return "GET", f"/students/{key}", None
+    if kind == "list":
+        return "GET", f"/students?limit=100&after={key}", None
+    if kind == "search":
+        term = rng.choice(SEARCH_TERMS)
+        return "GET", f"/students?field=Name&term={term}&limit=50", None
+    # PUT replaces the whole record, so send it back with one field changed
+    body = dict(student, Hostelite=rng.choice(("Yes", "No")))
+    return "PUT", f"/students/{key}", body
+
+
+async def run_load(host, port, mix, concurrency, duration, requests, seed):
+    rng = random.Random(seed)
+    sampler = Client(host, port)
+    status, payload = await sampler.request("GET", "/students?limit=1000")
+    sampler.close()
+    if status != 200:
+        raise RuntimeError(f"could not list students: HTTP {status}")
+    students = json.loads(payload)["students"]
+    if not students:
+        raise RuntimeError("the database has no students to request")
+
+    kinds = [kind for kind, weight in MIXES[mix].items() for _ in range(weight)]
+    latencies = []
+    statuses = Counter()
+    deadline = time.perf_counter() + duration
+    remaining = [requests]
+
+    async def worker(worker_rng):
+        client = Client(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                if requests is not None:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                method, path, body = make_request(
+                    worker_rng.choice(kinds), students, worker_rng
+                )
+                started = time.perf_counter()
+                try:
+                    status, _ = await client.request(method, path, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    client.close()
+                    status = "connection error"
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(worker(random.Random(rng.random())) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+    return latencies, statuses, elapsed
+
+
+def percentile(ordered, fraction):
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def report(latencies, statuses, elapsed):
+    ordered = sorted(latencies)
+    ok = sum(count for status, count in statuses.items() if status in (200, 201, 204))
+    return {
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "ok_per_second": ok / elapsed,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "statuses": {str(status): count for status, count in statuses.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the HTTP API")
+    parser.add_argument("--url", help="running API to test (default: start one)")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mix", choices=list(MIXES), default="read")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument(
+        "--pool-size", type=int, default=4, help="connections of a started API"
+    )
+    parser.add_argument(
+        "--max-pending", type=int, default=64, help="queue limit of a started API"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--requests", type=int, help="stop after this many")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.url:
+            address = urlsplit(args.url)
+            host, port = address.hostname, address.port
+        else:
+            print(f"Loading {args.rows:,} generated rows...")
+            config_file = prepare_database(
+                workdir, args.rows, args.seed, args.pool_size, args.max_pending
+            )
+            process, host, port = start_server(config_file)
+        try:
+            print(
+                f"{args.concurrency} clients, '{args.mix}' mix, "
+                f"{args.duration:g} s against http://{host}:{port}"
+            )
+            latencies, statuses, elapsed = asyncio.run(
+                run_load(
+                    host,
+                    port,
+                    args.mix,
+                    args.concurrency,
+                    args.duration,
+                    args.requests,
+                    args.seed,
+                )
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    results = report(latencies, statuses, elapsed)
+    print(
+        f"{results['requests']:,} requests in {results['seconds']:.1f} s: "
+        f"{results['requests_per_second']:,.0f} req/s "
+        f"({results['ok_per_second']:,.0f} successful/s)"
+    )
+    print(
+        f"latency p50 {results['p50_ms']:.1f} ms, p95 {results['p95_ms']:.1f} ms, "
+        f"p99 {results['p99_ms']:.1f} ms, max {results['max_ms']:.1f} ms"
+    )
+    print("statuses: " + ", ".join(f"{s}={n}" for s, n in results["statuses"].items()))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
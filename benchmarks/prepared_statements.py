@@ -0,0 +1,68 @@
+# ===== PREPARED STATEMENT MICRO-BENCHMARK ===== #
+#
+# Measures per-call latency of the statements the form and table repeat most,
+# with the prepared statement cache switched off and on.
+#
+#   python -m benchmarks.prepared_statements --calls 5000
+
+import argparse
+import statistics
+import time
+from models.database import DatabaseManager
+
+STATEMENTS = {
+    "duplicate check": (
+        "SELECT RegistrationNo FROM students WHERE RegistrationNo = %s"
+    ),
+    "page after key": (
+        "SELECT RegistrationNo, Name, Email, Contact, DOB, Hostelite FROM students "
+        "WHERE (RegistrationNo > %s) ORDER BY RegistrationNo LIMIT 100"
+    ),
+}
+
+
+def time_calls(db_manager, query, keys, calls):
+    samples = []
+    for i in range(calls):
+        key = keys[i % len(keys)]
+        started = time.perf_counter()
+        db_manager.fetch_all(query, (key,), cached=False)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-call latency with and without prepared statements"
+    )
+    parser.add_argument("--config", default="config.ini")
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager(args.config)
+    records = db_manager.fetch_all(
+        "SELECT RegistrationNo FROM students LIMIT 500", cached=False
+    )
+    keys = [record[0] for record in records or []] or ["0"]
+
+    for label, query in STATEMENTS.items():
+        results = {}
+        for prepared in (False, True):
+            db_manager.prepared = prepared
+            time_calls(db_manager, query, keys, min(args.calls, 100))  # warm up
+            samples = time_calls(db_manager, query, keys, args.calls)
+            results[prepared] = statistics.median(samples) * 1e6
+
+        saved = results[False] - results[True]
+        print(
+            f"{label:16} text: {results[False]:8.1f} us  "
+            f"prepared: {results[True]:8.1f} us  "
+            f"saved: {saved:7.1f} us/call ({saved / results[False]:.0%})"
+        )
+
+    print(f"statement cache: {db_manager.statement_stats()}")
+    db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    main()
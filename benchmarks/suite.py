@@ -0,0 +1,386 @@
+# ===== BENCHMARK SUITE ===== #
+#
+# Times the application's real code paths against a generated dataset of each
+# requested size and writes the results as JSON for later comparison.
+#
+#   python -m benchmarks.suite --rows 1000 100000
+#   python -m benchmarks.suite --rows 100000 --compare benchmarks/results/old.json
+#
+# Without --config a throwaway SQLite database is used, so it runs on a blank
+# machine. With --config (e.g. a MySQL config.ini) the students table of that
+# database is emptied first, which must be confirmed with --clear.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from benchmarks.dataset import write_csv
+from benchmarks.headless import headless_table_view, set_search
+from models.csv_io import export_students, import_students
+from models.filters import compile_predicates
+from models.database import DatabaseManager
+from models.pagination import STUDENT_COLUMNS, KeysetPager, format_sort_order
+from models.schema import ensure_schema
+from models.search import contains_condition, explain_query
+from models.students import add_student, delete_student, update_student
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SQLITE_CONFIG = """\
+[DATABASE]
+backend = sqlite
+path = {path}
+
+[POOL]
+pool_size = 2
+
+[CACHE]
+enabled = no
+"""
+
+
+def measure(action, repeat):
+    """Run ``action`` ``repeat`` times and return the durations in seconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(rows, name, samples, items=None):
+    result = {
+        "rows": rows,
+        "benchmark": name,
+        "runs": len(samples),
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+    }
+    if items is not None:
+        result["items_per_second"] = items / statistics.median(samples)
+    return result
+
+
+def open_database(args, workdir):
+    if args.config:
+        db_manager = DatabaseManager(args.config)
+    else:
+        config_file = os.path.join(workdir, "benchmark.ini")
+        with open(config_file, "w") as f:
+            f.write(SQLITE_CONFIG.format(path=os.path.join(workdir, "students.db")))
+        db_manager = DatabaseManager(config_file)
+    if not args.cache:
+        # Repeated reads must hit the database, not the result cache
+        db_manager.cache = None
+    ensure_schema(db_manager)
+    db_manager.execute_query("TRUNCATE TABLE students")
+    db_manager.execute_query("TRUNCATE TABLE student_stats")
+    return db_manager
+
+
+def sample_terms(db_manager, rows):
+    """Search terms taken from a row in the middle of the dataset."""
+    record = db_manager.fetch_one(
+        f"SELECT {STUDENT_COLUMNS} FROM students ORDER BY RegistrationNo "
+        f"LIMIT 1 OFFSET {rows // 2}"
+    )
+    reg_no, name, email, contact, dob, hostelite = record
+    year = dob.year if dob else 2000
+    return {
+        "Registration#": reg_no[:9],
+        "Name": name.split()[-1],
+        "Email": (email or name.split()[0].lower())[:6],
+        "Contact#": contact[:6],
+        "D.O.B": dob.strftime("%Y-%m-%d") if dob else "2000-01-01",
+        # One quarter of a birth year, and a two-year age band
+        "D.O.B Range": f"{year}-01-01..{year}-03-31",
+        "Age": "24-25",
+        "Hostelite": hostelite or "Yes",
+    }
+
+
+def filter_terms(db_manager, rows):
+    """Hostel status, first initial and birth year of the middle row."""
+    record = db_manager.fetch_one(
+        f"SELECT {STUDENT_COLUMNS} FROM students ORDER BY RegistrationNo "
+        f"LIMIT 1 OFFSET {rows // 2}"
+    )
+    _, name, _, _, dob, hostelite = record
+    year = dob.year if dob else 2000
+    return [
+        ("Hostelite", hostelite or "Yes"),
+        ("Name", name[0]),
+        ("D.O.B Range", f"{year}-01-01..{year}-12-31"),
+    ]
+
+
+def pager_plan(db_manager, pager):
+    """Access paths (see explain_query) of a pager's count and first page."""
+    return {
+        "count": explain_query(db_manager, pager.count_query(), pager.params),
+        "page": explain_query(db_manager, pager.page_query(), pager.params),
+    }
+
+
+def format_plan(plan):
+    return "  ".join(
+        f"{query}: " + ", ".join(f"{access} {key or '-'}" for access, key in accesses)
+        for query, accesses in plan.items()
+    )
+
+
+def fuzzy_terms(db_manager, rows):
+    """The middle row's Name and Email with a letter dropped from each word."""
+    name, email = db_manager.fetch_one(
+        "SELECT Name, Email FROM students ORDER BY RegistrationNo "
+        f"LIMIT 1 OFFSET {rows // 2}"
+    )
+
+    def misspell(text):
+        return " ".join(
+            word[: len(word) // 2] + word[len(word) // 2 + 1 :]
+            if len(word) > 3
+            else word
+            for word in text.split()
+        )
+
+    return {"Name": misspell(name), "Email": misspell(email or name)}
+
+
+def run_size(args, rows, workdir, make_tree):
+    db_manager = open_database(args, workdir)
+    results = []
+
+    csv_path = os.path.join(workdir, f"students-{rows}.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        write_csv(f, rows, args.seed)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        started = time.perf_counter()
+        report = import_students(db_manager, f)
+        elapsed = time.perf_counter() - started
+    results.append(summarize(rows, "bulk_load", [elapsed], report.inserted))
+
+    view = headless_table_view(db_manager, make_tree())
+    results.append(
+        summarize(rows, "full_load", measure(view.refresh_table, args.repeat))
+    )
+
+    def scroll():
+        view.refresh_table()
+        for _ in range(10):
+            view.load_next_page()
+
+    results.append(summarize(rows, "scroll_10_pages", measure(scroll, args.repeat)))
+
+    # Header sorts, served by the composite indexes
+    for order in ((("Name", False),), (("DOB", True), ("Name", True))):
+        view.sort_order = order
+        samples = measure(scroll, args.repeat)
+        results.append(
+            summarize(rows, f"scroll_10_pages[{format_sort_order(order)}]", samples)
+        )
+    view.sort_order = ()
+
+    # Each search also records how its count and first page reach the rows:
+    # "range <index>" is an index range scan, "ALL" a full table scan
+    for criteria, term in sample_terms(db_manager, rows).items():
+        set_search(view, criteria, term)
+        samples = measure(view.search_records, args.repeat)
+        result = summarize(rows, f"search[{criteria}]", samples)
+        result["plan"] = pager_plan(db_manager, view.pager)
+        results.append(result)
+
+    # Misspelled Name/Email lookups: the trigram index against the
+    # LIKE '%term%' scan (count and first page) that is the server's only way
+    # to look for a substring
+    samples = measure(lambda: view.fuzzy_index.build(db_manager), 1)
+    results.append(summarize(rows, "fuzzy_index_build", samples, rows))
+    view.fuzzy.set(True)
+    for criteria, term in fuzzy_terms(db_manager, rows).items():
+        view.search_criteria.set(criteria)
+        view.search_entry.set(term)
+        samples = measure(view.search_records, args.repeat)
+        results.append(summarize(rows, f"fuzzy_search[{criteria}]", samples))
+
+        where, params = contains_condition(criteria, term)
+        pager = KeysetPager(where, params)
+        samples = measure(
+            lambda: (pager.count(db_manager), pager.fetch_after(db_manager)),
+            args.repeat,
+        )
+        results.append(summarize(rows, f"like_search[{criteria}]", samples))
+    view.fuzzy.set(False)
+
+    # Compound filter: planned once with selectivity probes ("cold"), then
+    # served from the plan cache; "unplanned" runs the same predicates in the
+    # order given, without an index hint
+    predicates = filter_terms(db_manager, rows)
+    view.filter_planner.clear()
+    samples = measure(lambda: view.apply_filter(predicates), 1)
+    results.append(summarize(rows, "filter_cold", samples))
+    samples = measure(lambda: view.apply_filter(predicates), args.repeat)
+    result = summarize(rows, "filter", samples)
+    result["plan"] = pager_plan(db_manager, view.pager)
+    results.append(result)
+
+    compiled = compile_predicates(predicates, db_manager.backend)
+    pager = KeysetPager(
+        " AND ".join(f"({p.where})" for p in compiled),
+        [param for p in compiled for param in p.params],
+    )
+    samples = measure(
+        lambda: (pager.count(db_manager), pager.fetch_after(db_manager)), args.repeat
+    )
+    result = summarize(rows, "filter_unplanned", samples)
+    result["plan"] = pager_plan(db_manager, pager)
+    results.append(result)
+    view.refresh_table()
+
+    def export():
+        with open(os.devnull, "w", newline="", encoding="utf-8") as f:
+            export_students(db_manager, f)
+
+    samples = measure(export, max(args.repeat // 2, 1))
+    results.append(summarize(rows, "export_csv", samples, rows))
+
+    record = ("BENCH-000000", "Bench Mark", "bench@example.com", "0300", None, "No")
+    changed = record[:1] + ("Bench Changed",) + record[2:]
+    adds, updates, deletes = [], [], []
+    for _ in range(args.repeat):
+        adds += measure(lambda: add_student(db_manager, record), 1)
+        updates += measure(lambda: update_student(db_manager, changed), 1)
+        deletes += measure(lambda: delete_student(db_manager, record[0]), 1)
+    results.append(summarize(rows, "add_student", adds))
+    results.append(summarize(rows, "update_student", updates))
+    results.append(summarize(rows, "delete_student", deletes))
+
+    db_manager.close_connection()
+    os.remove(csv_path)
+    return db_manager.backend, results
+
+
+def tree_factory(use_tk):
+    """Treeview source: a real one in a withdrawn Tk root, or the stub."""
+    if not use_tk:
+        return lambda: None
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.withdraw()
+    columns = ("reg_no", "name", "email", "contact", "dob", "hostelite")
+    return lambda: ttk.Treeview(root, columns=columns, show="headings")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file, tolerance):
+    """Print median changes against a previous run; return the regressions."""
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = {
+            (r["rows"], r["benchmark"]): r for r in json.load(f)["results"]
+        }
+    regressions = []
+    for result in results:
+        before = baseline.get((result["rows"], result["benchmark"]))
+        if before is None:
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(result)
+        print(
+            f"{result['rows']:>10,} {result['benchmark']:36} "
+            f"{before['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms "
+            f"({ratio:5.2f}x){flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Student database benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--config", help="benchmark this database instead")
+    parser.add_argument(
+        "--clear", action="store_true", help="allow emptying --config's table"
+    )
+    parser.add_argument("--cache", action="store_true", help="keep the query cache")
+    parser.add_argument("--tk", action="store_true", help="use a real ttk.Treeview")
+    parser.add_argument("--output", help="results file (default: benchmarks/results)")
+    parser.add_argument("--compare", help="previous results file to compare with")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    if args.config and not args.clear:
+        parser.error("--config empties the students table; add --clear to confirm")
+
+    make_tree = tree_factory(args.tk)
+    results = []
+    backend = None
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            print(f"Benchmarking {rows:,} rows...")
+            backend, size_results = run_size(args, rows, workdir, make_tree)
+            for result in size_results:
+                line = (
+                    f"  {result['benchmark']:36} median {result['median_ms']:10.2f} ms"
+                )
+                if "plan" in result:
+                    line += "  " + format_plan(result["plan"])
+                print(line)
+            results.extend(size_results)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"benchmark-{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "meta": {
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "revision": git_revision(),
+                    "backend": backend,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "seed": args.seed,
+                    "repeat": args.repeat,
+                    "treeview": "tk" if args.tk else "stub",
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
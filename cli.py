@@ -0,0 +1,197 @@
+# ===== HEADLESS COMMAND LINE ===== #
+#
+# Batch mode for cron jobs and other systems: the same DatabaseManager and
+# query code as the GUI, without creating a window or importing tkinter.
+#
+#   python cli.py export students.csv        (or - for stdout)
+#   python cli.py import students.csv        (or - for stdin)
+#   python cli.py search Name "khan" --sort Name:asc > matches.jsonl
+#   python cli.py count Email "ali"
+#   python cli.py purge --days 30
+#   python cli.py stats --verify
+#
+# Data goes to stdout; progress, summaries and driver messages go to stderr.
+
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from models.csv_io import export_students, import_students
+from models.database import DatabaseManager
+from models.pagination import KeysetPager, parse_sort_order
+from models.pool import PoolError
+from models.schema import ensure_schema, purge_tombstones
+from models.search import SEARCH_FIELDS, build_search, search_order
+from models.statistics import fetch_statistics, rebuild_statistics, verify_statistics
+from models.students import student_dict
+
+# Exit codes (argparse itself exits with 2 on bad usage)
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_PARTIAL = 3  # import finished, but some rows were invalid or rejected
+EXIT_MISMATCH = 4  # stats --verify found counts that differ from GROUP BY
+
+# Rows read per round trip when streaming search results
+SEARCH_PAGE_SIZE = 1000
+
+
+def student_json(record):
+    """One student row as a JSON object line."""
+    return json.dumps(student_dict(record), ensure_ascii=False)
+
+
+def search_pager(args, order=None):
+    """KeysetPager for ``criteria``/``term`` (every student if both are None)."""
+    if args.criteria is None:
+        return KeysetPager(page_size=SEARCH_PAGE_SIZE, order=order)
+    where, params = build_search(args.criteria, args.term, args.db.backend)
+    return KeysetPager(
+        where,
+        params,
+        page_size=SEARCH_PAGE_SIZE,
+        order=search_order(args.criteria, order),
+    )
+
+
+def cmd_export(args):
+    if args.file == "-":
+        count = export_students(args.db, args.output)
+    else:
+        with open(args.file, "w", newline="", encoding="utf-8") as f:
+            count = export_students(args.db, f)
+    print(f"{count:,} records exported")
+    return EXIT_OK
+
+
+def cmd_import(args):
+    use_load_data = args.db.allow_local_infile and args.file != "-"
+    if args.file == "-":
+        report = import_students(args.db, sys.stdin, use_load_data=False)
+    else:
+        with open(args.file, newline="", encoding="utf-8") as f:
+            report = import_students(args.db, f, use_load_data=use_load_data)
+    print(report.summary())
+    if report.error_count or report.rejected_count:
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def cmd_search(args):
+    pager = search_pager(args, parse_sort_order(args.sort))
+    written, key = 0, None
+    while args.limit is None or written < args.limit:
+        records = pager.fetch_after(args.db, key)
+        if args.limit is not None:
+            records = records[: args.limit - written]
+        for record in records:
+            args.output.write(student_json(record) + "\n")
+        written += len(records)
+        if len(records) < pager.page_size:
+            break
+        key = str(records[-1][0])
+    print(f"{written:,} matching records")
+    return EXIT_OK
+
+
+def cmd_count(args):
+    args.output.write(f"{search_pager(args).count(args.db)}\n")
+    return EXIT_OK
+
+
+def cmd_purge(args):
+    removed = purge_tombstones(args.db, args.days)
+    if removed is None:
+        return EXIT_ERROR
+    print(f"{removed:,} tombstones older than {args.days} days removed")
+    return EXIT_OK
+
+
+def cmd_stats(args):
+    if args.rebuild and not rebuild_statistics(args.db):
+        return EXIT_ERROR
+    if args.verify:
+        mismatches = verify_statistics(args.db)
+        if mismatches is None:
+            return EXIT_ERROR
+        for dimension, bucket, stored, actual in mismatches:
+            print(f"{dimension} {bucket!r}: {stored} stored, {actual} actual")
+        if mismatches:
+            return EXIT_MISMATCH
+        print("Summary tables match a full GROUP BY")
+    args.output.write(json.dumps(fetch_statistics(args.db)) + "\n")
+    return EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Student database batch mode (no GUI)"
+    )
+    parser.add_argument("--config", default="config.ini", help="config file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write every student as CSV")
+    export.add_argument("file", help="output CSV file, or - for stdout")
+    export.set_defaults(run=cmd_export)
+
+    load = commands.add_parser("import", help="load students from CSV")
+    load.add_argument("file", help="input CSV file, or - for stdin")
+    load.set_defaults(run=cmd_import)
+
+    search = commands.add_parser(
+        "search", help="print matching students as JSON lines"
+    )
+    count = commands.add_parser("count", help="print the number of matching students")
+    for command, run in ((search, cmd_search), (count, cmd_count)):
+        command.add_argument(
+            "criteria", nargs="?", choices=list(SEARCH_FIELDS), help="search field"
+        )
+        command.add_argument("term", nargs="?", help="search term")
+        command.set_defaults(run=run)
+    search.add_argument("--sort", default="", help="e.g. Name:asc,DOB:desc")
+    search.add_argument("--limit", type=int, help="stop after this many rows")
+
+    purge = commands.add_parser("purge", help="forget old deletion tombstones")
+    purge.add_argument("--days", type=int, default=30)
+    purge.set_defaults(run=cmd_purge)
+
+    stats = commands.add_parser("stats", help="print the statistics counts as JSON")
+    stats.add_argument("--rebuild", action="store_true", help="recompute first")
+    stats.add_argument(
+        "--verify", action="store_true", help="compare with a full GROUP BY"
+    )
+    stats.set_defaults(run=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    searching = args.command in ("search", "count")
+    if searching and (args.criteria is None) != (args.term is None):
+        parser.error("give both a search field and a term, or neither")
+
+    # Anything printed (summaries, driver messages) goes to stderr so stdout
+    # carries only the data
+    args.output = sys.stdout
+    with redirect_stdout(sys.stderr):
+        args.db = DatabaseManager(args.config, interactive=False)
+        try:
+            # Loads the driver now, so a missing one is reported plainly
+            errors = (args.db.Error, PoolError, OSError, ValueError)
+        except ImportError as e:
+            print(f"Error: database driver not available ({e})")
+            return EXIT_ERROR
+        try:
+            if not ensure_schema(args.db):
+                print("Error: could not prepare the database schema")
+                return EXIT_ERROR
+            return args.run(args)
+        except errors as e:
+            print(f"Error: {e}")
+            return EXIT_ERROR
+        finally:
+            args.db.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,3 +11,23 @@ THEME = {
     "info_color": "#3498DB",
     "other_color": "#9B59B6",
 }
+
+# Table paging
+# Rows fetched per round trip and how many pages the table keeps loaded
+PAGE_SIZE = 100
+WINDOW_PAGES = 3
+PREFETCH_THRESHOLD = 0.8
+
+# Rows pulled per fetchmany() batch when streaming exports
+EXPORT_BATCH_SIZE = 1000
+
+# Rows validated and inserted per transaction during CSV import
+IMPORT_BATCH_SIZE = 1000
+
+# Quiet period after the last keystroke before search-as-you-type runs
+SEARCH_DEBOUNCE_MS = 300
+
+# Change feed polling: how often to ask for deltas, and how far back each poll
+# re-reads so rows committed slightly out of timestamp order are not missed
+CHANGE_POLL_MS = 5000
+CHANGE_OVERLAP_SECONDS = 2
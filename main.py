@@ -7,24 +7,16 @@ from views.main_window import StudentManagementSystem
 
 def main():
     root = tk.Tk()
+    # No connection is opened here; the window connects in the background
     db_manager = DatabaseManager()
 
-    # Create table if not exists
-    db_manager.execute_query(
-        """
-        CREATE TABLE IF NOT EXISTS students (
-            RegistrationNo VARCHAR(20) PRIMARY KEY,
-            Name VARCHAR(50) NOT NULL,
-            Email VARCHAR(50),
-            Contact VARCHAR(15),
-            DOB DATE,
-            Hostelite VARCHAR(5)
-        )
-    """
-    )
-
     app = StudentManagementSystem(root, db_manager)
     root.mainloop()
+    if app.journal is not None:
+        app.journal.close()
+    app.executor.shutdown()
+    if db_manager.metrics is not None and db_manager.metrics_dump_file:
+        db_manager.metrics.dump(db_manager.metrics_dump_file)
     app.db_manager.close_connection()
 
 
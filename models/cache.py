@@ -0,0 +1,113 @@
+# ===== QUERY RESULT CACHE ===== #
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.IGNORECASE)
+_WRITE_TABLE = re.compile(
+    r"^\s*(?:INSERT(?:\s+IGNORE)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM"
+    r"|TRUNCATE(?:\s+TABLE)?|ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?"
+    r"|LOAD\s+DATA.*?\s+INTO\s+TABLE)\s+`?(\w+)`?",
+    re.IGNORECASE | re.DOTALL,
+)
+_READ_ONLY = re.compile(r"^\s*(?:SELECT|SHOW|EXPLAIN|DESCRIBE)\b", re.IGNORECASE)
+
+
+def normalize_query(query):
+    """Collapse whitespace so formatting differences share one cache entry."""
+    return " ".join(query.split())
+
+
+def read_tables(query):
+    return frozenset(name.lower() for name in _READ_TABLES.findall(query))
+
+
+def written_table(query):
+    """Table a write statement modifies, "" if unknown, None for reads."""
+    if _READ_ONLY.match(query):
+        return None
+    match = _WRITE_TABLE.match(query)
+    return match.group(1).lower() if match else ""
+
+
+class QueryCache:
+    """Thread-safe LRU cache of SELECT results with a time-to-live.
+
+    Entries remember which tables their query reads; a write to one of those
+    tables evicts them. A generation counter stops a read that raced with a
+    write from caching the pre-write result.
+    """
+
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(kind, query, data):
+        return (kind, normalize_query(query), tuple(data) if data else ())
+
+    def get(self, key):
+        """Return ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires, _ = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            expires = time.monotonic() + self.ttl
+            self._entries[key] = (value, expires, read_tables(key[1]))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table=""):
+        """Drop entries reading ``table``, or everything when it is unknown."""
+        with self._lock:
+            self.generation += 1
+            if not table:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [k for k, e in self._entries.items() if table in e[2]]
+                for key in stale:
+                    del self._entries[key]
+                dropped = len(stale)
+            self.invalidations += dropped
+
+    def invalidate_for(self, query):
+        table = written_table(query)
+        if table is not None:
+            self.invalidate(table)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
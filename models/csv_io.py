@@ -0,0 +1,372 @@
+# ===== CSV IMPORT / EXPORT ===== #
+
+import csv
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+from constants import EXPORT_BATCH_SIZE, IMPORT_BATCH_SIZE
+from models.pagination import STUDENT_COLUMNS
+
+CSV_HEADER = ["RegistrationNo", "Name", "Email", "Contact", "DOB", "Hostelite"]
+
+# Column widths from the students schema, checked before anything is sent
+FIELD_LIMITS = {"RegistrationNo": 20, "Name": 50, "Email": 50, "Contact": 15}
+
+# Only this many offending rows are kept for display; all of them are counted
+MAX_REPORTED = 1000
+
+INSERT_STUDENT = (
+    f"INSERT INTO students ({STUDENT_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s)"
+)
+
+
+# MySQL error code of a duplicate key, which LOAD DATA ... IGNORE turns into a
+# warning; other warnings name the offending line of the loaded file
+ER_DUP_ENTRY = 1062
+_DUPLICATE_ENTRY = re.compile(r"Duplicate entry '(.*)' for key")
+_WARNING_ROW = re.compile(r"at row (\d+)")
+
+
+class OperationCancelled(Exception):
+    """Raised when the user cancels a long-running import or export."""
+
+
+def student_csv_row(record):
+    dob = record[4].strftime("%Y-%m-%d") if record[4] else ""
+    return (record[0], record[1], record[2], record[3], dob, record[5])
+
+
+def export_students(
+    db_manager, file, progress=None, cancel_event=None, batch_size=EXPORT_BATCH_SIZE
+):
+    """Stream every student row into ``file`` as CSV and return the row count.
+
+    Rows are read in batches from a server-side cursor and written straight out,
+    so only one batch is held in memory at a time. ``progress(count)`` is called
+    after each batch; setting ``cancel_event`` stops the export with
+    OperationCancelled.
+    """
+    writer = csv.writer(file)
+    writer.writerow(CSV_HEADER)
+
+    count = 0
+    batches = db_manager.stream(
+        f"SELECT {STUDENT_COLUMNS} FROM students", batch_size=batch_size
+    )
+    try:
+        for rows in batches:
+            if cancel_event is not None and cancel_event.is_set():
+                raise OperationCancelled(f"Export cancelled after {count} rows")
+            writer.writerows(student_csv_row(record) for record in rows)
+            count += len(rows)
+            if progress:
+                progress(count)
+    finally:
+        batches.close()
+    return count
+
+
+class ImportReport:
+    """Outcome of a bulk import: counts, sample problems and throughput."""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.duplicate_count = 0
+        self.duplicates = []
+        self.error_count = 0
+        self.errors = []
+        self.rejected_count = 0
+        self.rejected = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_duplicate(self, reg_no):
+        self.duplicate_count += 1
+        if len(self.duplicates) < MAX_REPORTED:
+            self.duplicates.append(reg_no)
+
+    def add_error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED:
+            self.errors.append((line_no, message))
+
+    def add_rejected(self, reg_no, message):
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED:
+            self.rejected.append((reg_no, message))
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        lines = [
+            f"Processed {self.processed:,} rows in {self.elapsed:.1f}s "
+            f"({self.rows_per_second:,.0f} rows/sec)",
+            f"Inserted: {self.inserted:,}",
+            f"Duplicates skipped: {self.duplicate_count:,}",
+            f"Invalid rows: {self.error_count:,}",
+        ]
+        if self.rejected_count:
+            lines.append(f"Rejected by the database: {self.rejected_count:,}")
+        if self.duplicates:
+            shown = ", ".join(self.duplicates[:10])
+            lines.append(f"First duplicates: {shown}")
+        for line_no, message in self.errors[:10]:
+            lines.append(f"Line {line_no}: {message}")
+        for reg_no, message in self.rejected[:10]:
+            lines.append(f"Registration# {reg_no}: {message}")
+        return "\n".join(lines)
+
+
+def validate_student_fields(fields):
+    """Turn one CSV record into an insertable row tuple.
+
+    Returns ``(row, None)`` on success or ``(None, reason)`` when invalid.
+    """
+    if len(fields) != len(CSV_HEADER):
+        return None, f"expected {len(CSV_HEADER)} fields, got {len(fields)}"
+
+    reg_no, name, email, contact, dob, hostelite = (f.strip() for f in fields)
+    if not reg_no or not name:
+        return None, "Registration# and Name are required"
+
+    for column, value in zip(CSV_HEADER, (reg_no, name, email, contact)):
+        limit = FIELD_LIMITS[column]
+        if len(value) > limit:
+            return None, f"{column} longer than {limit} characters"
+
+    try:
+        dob_value = datetime.strptime(dob, "%Y-%m-%d").date() if dob else None
+    except ValueError:
+        return None, f"invalid D.O.B '{dob}', use YYYY-MM-DD"
+
+    if hostelite not in ("Yes", "No", ""):
+        return None, f"Hostelite must be Yes or No, got '{hostelite}'"
+
+    return (reg_no, name, email, contact, dob_value, hostelite), None
+
+
+def read_student_batches(file, report, batch_size=IMPORT_BATCH_SIZE):
+    """Parse ``file`` lazily, yielding lists of valid, unique row tuples.
+
+    Invalid rows and registration numbers repeated within the file are recorded
+    on ``report`` and left out. Only one batch is materialised at a time.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    if [h.strip().lower() for h in header] != [h.lower() for h in CSV_HEADER]:
+        raise ValueError(f"CSV header must be: {','.join(CSV_HEADER)}")
+
+    seen = set()
+    batch = []
+    for line_no, fields in enumerate(reader, start=2):
+        if not fields:
+            continue
+        report.processed += 1
+        row, error = validate_student_fields(fields)
+        if error:
+            report.add_error(line_no, error)
+            continue
+        if row[0] in seen:
+            report.add_duplicate(row[0])
+            continue
+        seen.add(row[0])
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_students(
+    db_manager,
+    file,
+    progress=None,
+    cancel_event=None,
+    batch_size=IMPORT_BATCH_SIZE,
+    use_load_data=False,
+):
+    """Bulk-load students from a CSV laid out like export_students() output.
+
+    Each batch costs one IN (...) lookup for existing registration numbers and
+    one multi-row INSERT committed as its own transaction, instead of a SELECT,
+    INSERT and commit per student. If the database rejects a row, the batch is
+    rolled back and rerun under savepoints, so the bad rows are reported and
+    skipped without losing the rest of the batch; savepoints are not used up
+    front because they make every row costlier (SQLite journals each statement
+    under one, most of all with the statistics triggers firing).
+    With ``use_load_data`` the validated rows are
+    spooled to a temporary file and handed to LOAD DATA LOCAL INFILE instead.
+    Returns an ImportReport.
+    """
+    report = ImportReport()
+    if use_load_data:
+        _load_data_infile(db_manager, file, report, progress, cancel_event)
+        report.finish()
+        return report
+
+    for batch in read_student_batches(file, report, batch_size):
+        if cancel_event is not None and cancel_event.is_set():
+            report.finish()
+            raise OperationCancelled(
+                f"Import cancelled after {report.inserted:,} rows were inserted"
+            )
+
+        try:
+            try:
+                with db_manager.transaction() as tx:
+                    duplicates, inserted = _insert_batch(tx, batch)
+            except db_manager.Error:
+                with db_manager.transaction(savepoints=True) as tx:
+                    duplicates, inserted = _insert_batch(tx, batch)
+        except Exception as e:
+            raise RuntimeError(
+                f"Batch insert failed after {report.inserted:,} rows; "
+                f"earlier batches were committed ({e})"
+            ) from e
+
+        for reg_no in duplicates:
+            report.add_duplicate(reg_no)
+        report.inserted += inserted
+        for failure in tx.failures:
+            report.add_rejected(failure.data[0], str(failure.error))
+
+        if progress:
+            progress(report.processed)
+
+    report.finish()
+    return report
+
+
+def _insert_batch(tx, batch):
+    """Insert the rows of ``batch`` not already stored.
+
+    Returns ``(duplicate registration numbers, rows inserted)``.
+    """
+    placeholders = ", ".join(["%s"] * len(batch))
+    existing = tx.fetch_all(
+        f"SELECT RegistrationNo FROM students WHERE RegistrationNo IN ({placeholders})",
+        tuple(row[0] for row in batch),
+    )
+    existing = {record[0] for record in existing}
+
+    duplicates = [row[0] for row in batch if row[0] in existing]
+    rows = [row for row in batch if row[0] not in existing]
+    if not rows:
+        return duplicates, 0
+    return duplicates, tx.executemany(INSERT_STUDENT, rows, batch_size=len(rows))
+
+
+def _load_data_infile(db_manager, file, report, progress, cancel_event):
+    spool = tempfile.NamedTemporaryFile(
+        "w", suffix=".csv", newline="", encoding="utf-8", delete=False
+    )
+    try:
+        with spool:
+            writer = csv.writer(spool, lineterminator="\n")
+            written = 0
+            for batch in read_student_batches(file, report):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise OperationCancelled("Import cancelled before loading")
+                for row in batch:
+                    dob = row[4].strftime("%Y-%m-%d") if row[4] else ""
+                    writer.writerow(row[:4] + (dob, row[5]))
+                written += len(batch)
+                if progress:
+                    progress(report.processed)
+
+        # IGNORE turns duplicate keys and bad values into warnings, so rowcount
+        # is what was stored; the warnings must be read on the same connection
+        try:
+            with db_manager.transaction() as tx:
+                tx.execute(
+                    "LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE students "
+                    "CHARACTER SET utf8mb4 "
+                    "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+                    "LINES TERMINATED BY '\\n' "
+                    "(RegistrationNo, Name, Email, Contact, @dob, Hostelite) "
+                    "SET DOB = NULLIF(@dob, '')",
+                    (spool.name,),
+                )
+                loaded = tx.rowcount
+                warning_count = tx.fetch_one("SHOW COUNT(*) WARNINGS")[0]
+                warnings = tx.fetch_all("SHOW WARNINGS")
+                duplicates, rejected = _classify_load_warnings(spool.name, warnings)
+                # IGNORE stored these rows with adjusted values where the
+                # executemany path (strict mode) rejects them; take them out
+                loaded -= _delete_students(tx, [reg_no for reg_no, _ in rejected])
+        except Exception as e:
+            raise RuntimeError(f"LOAD DATA LOCAL INFILE failed ({e})") from e
+
+        report.inserted = loaded
+        for reg_no in duplicates:
+            report.add_duplicate(reg_no)
+        for reg_no, message in rejected:
+            report.add_rejected(reg_no, message)
+        # SHOW WARNINGS stops at max_error_count; rows skipped beyond the ones
+        # it listed are counted as duplicates, the only rows IGNORE discards
+        if warning_count > len(warnings):
+            report.duplicate_count += max(
+                written - report.inserted - len(duplicates) - len(rejected), 0
+            )
+    finally:
+        os.remove(spool.name)
+
+
+def _classify_load_warnings(path, warnings):
+    """Split LOAD DATA warnings into duplicates and rows with bad values.
+
+    Returns ``(registration numbers, [(registration number, message), ...])``.
+    A duplicate warning names its registration number; any other warning names
+    the line of the loaded file ("at row N"), looked up in the spool ``path``.
+    """
+    duplicates = []
+    problems = {}
+    for _, code, message in warnings:
+        if int(code) == ER_DUP_ENTRY:
+            match = _DUPLICATE_ENTRY.search(message)
+            duplicates.append(match.group(1) if match else message)
+            continue
+        match = _WARNING_ROW.search(message)
+        if match:
+            problems.setdefault(int(match.group(1)), []).append(message)
+
+    rejected = []
+    if problems:
+        with open(path, newline="", encoding="utf-8") as f:
+            for line_no, row in enumerate(csv.reader(f), start=1):
+                if line_no in problems:
+                    rejected.append((row[0], "; ".join(problems[line_no])))
+    return duplicates, rejected
+
+
+def _delete_students(tx, reg_nos, batch_size=1000):
+    """Delete ``reg_nos`` inside ``tx``; returns how many rows went."""
+    reg_nos = sorted(set(reg_nos))
+    before = tx.rowcount
+    for start in range(0, len(reg_nos), batch_size):
+        chunk = reg_nos[start : start + batch_size]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        tx.execute(
+            f"DELETE FROM students WHERE RegistrationNo IN ({placeholders})",
+            tuple(chunk),
+        )
+    return tx.rowcount - before
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.reader(f), start=1):
+            for message in problems.pop(line_no, ()):
+                report.add_rejected(row[0], message)
+    for messages in problems.values():
+        for message in messages:
+            report.add_rejected("?", message)
+    return duplicates
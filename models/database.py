@@ -1,115 +1,615 @@
 # ===== DATABASE MANAGER CLASS ===== #
 
-import mysql.connector
-from mysql.connector import Error
 import configparser
 import os
-import tkinter.messagebox as messagebox
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from models.cache import QueryCache
+from models.engines import create_engine, create_replica_engines
+from models.metrics import Metrics
+from models.pool import ConnectionPool, PoolError
+from models.replicas import ReplicaSet, Server
+from models.statements import PREPARABLE, StatementCache, StatementStats
+from models.unit_of_work import UnitOfWork
 
 
 class DatabaseManager:
-    """Handles MySQL database operations with configurable credentials."""
+    """Handles database operations with configurable credentials.
 
-    def __init__(self, config_file="config.ini"):
+    Statements run on connections borrowed from a ConnectionPool, so the
+    manager can be shared by several threads at once. The storage engine
+    (MySQL or SQLite, see models/engines.py) is chosen by ``backend`` in the
+    [DATABASE] section of the config file.
+
+    Reads may be spread over read replicas listed in the [REPLICAS] section
+    (see models/replicas.py); writes, transactions and reads passed
+    ``primary=True`` always go to the primary.
+
+    With ``interactive=False`` notices are printed to stderr instead of shown
+    in a dialog, and tkinter is never imported (see cli.py).
+    """
+
+    def __init__(self, config_file="config.ini", interactive=True):
         self.config_file = config_file
+        self.interactive = interactive
         self.load_config()
-        self.connection = self.create_connection()
+        self._active = {}
+        self.pool = ConnectionPool(
+            self.create_connection,
+            self.engine.is_alive,
+            size=self.pool_size,
+            timeout=self.pool_timeout,
+            validate_after=self.validate_after,
+            max_retries=self.max_retries,
+            backoff=self.backoff,
+            on_discard=self._forget_statements,
+        )
+        self.primary = Server("primary", self.engine, self.pool)
+        self.replicas = None
+        replicas = [
+            Server(
+                name,
+                engine,
+                ConnectionPool(
+                    engine.connect,
+                    engine.is_alive,
+                    size=self.replica_pool_size,
+                    timeout=self.pool_timeout,
+                    validate_after=self.validate_after,
+                    # Fail over to the next server instead of retrying this one
+                    max_retries=0,
+                    on_discard=self._forget_statements,
+                ),
+            )
+            for name, engine in create_replica_engines(self.config)
+        ]
+        if replicas:
+            self.replicas = ReplicaSet(replicas, self.replica_retry_after)
+        self._statements = {}
+        self._statement_stats = StatementStats()
+        self.cache = None
+        if self.cache_enabled:
+            self.cache = QueryCache(self.cache_entries, self.cache_ttl)
+        self._query_hooks = []
+        self.metrics = None
+        if self.diagnostics_enabled:
+            self.metrics = Metrics(self.slow_query_ms, self.slow_query_log)
+            self.add_query_hook(self.metrics.on_query)
 
     def load_config(self):
         self.config = configparser.ConfigParser(interpolation=None)
 
         if not os.path.exists(self.config_file):
             self.config["DATABASE"] = {
+                "backend": "mysql",
+                "path": "students.db",
                 "host": "localhost",
+                "port": "3306",
                 "user": "root",
                 "password": "password",
                 "database": "uobs",
             }
+            self.config["IMPORT"] = {"allow_local_infile": "no"}
+            self.config["STATEMENTS"] = {"prepared": "yes", "cache_size": "32"}
+            self.config["TRANSACTIONS"] = {"batch_size": "500"}
+            self.config["DIAGNOSTICS"] = {
+                "enabled": "yes",
+                "slow_query_ms": "250",
+                "slow_query_log": "slow_queries.log",
+                "dump_file": "",
+            }
+            self.config["JOURNAL"] = {
+                "enabled": "no",
+                "path": "write_journal.jsonl",
+                "batch_size": "100",
+                "fsync": "yes",
+            }
+            self.config["TABLE"] = {"sort_order": ""}
+            self.config["API"] = {
+                "host": "127.0.0.1",
+                "port": "8765",
+                "max_pending": "64",
+            }
+            self.config["CACHE"] = {
+                "enabled": "yes",
+                "max_entries": "256",
+                "ttl_seconds": "30",
+            }
+            self.config["POOL"] = {
+                "pool_size": "5",
+                "timeout": "10",
+                "validate_after": "30",
+                "max_retries": "3",
+                "backoff": "0.5",
+            }
+            self.config["REPLICAS"] = {
+                "hosts": "",
+                "paths": "",
+                "pool_size": "5",
+                "retry_after": "30",
+                "max_lag_seconds": "5",
+            }
             with open(self.config_file, "w") as configfile:
                 self.config.write(configfile)
-            messagebox.showinfo(
-                "Info", f"Created default config file at {self.config_file}"
-            )
+            message = f"Created default config file at {self.config_file}"
+            if self.interactive:
+                from tkinter import messagebox
+
+                messagebox.showinfo("Info", message)
+            else:
+                print(message, file=sys.stderr)
 
         self.config.read(self.config_file)
-        db_config = self.config["DATABASE"]
-        self.host = db_config.get("host", "localhost")
-        self.user = db_config.get("user", "root")
-        self.password = db_config.get("password", "password")
-        self.database = db_config.get("database", "uobs")
+        self.engine = create_engine(self.config)
+        self.backend = self.engine.name
+
+        # A pool size of 1 behaves like the old single shared connection
+        pool_config = (
+            self.config["POOL"] if self.config.has_section("POOL") else {}
+        )
+        self.pool_size = int(pool_config.get("pool_size", "1"))
+        self.pool_timeout = float(pool_config.get("timeout", "10"))
+        self.validate_after = float(pool_config.get("validate_after", "30"))
+        self.max_retries = int(pool_config.get("max_retries", "3"))
+        self.backoff = float(pool_config.get("backoff", "0.5"))
+
+        self.replica_pool_size = self.config.getint(
+            "REPLICAS", "pool_size", fallback=self.pool_size
+        )
+        self.replica_retry_after = self.config.getfloat(
+            "REPLICAS", "retry_after", fallback=30.0
+        )
+        self.replica_max_lag = self.config.getfloat(
+            "REPLICAS", "max_lag_seconds", fallback=5.0
+        )
+
+        self.prepared = self.engine.supports_prepared and self.config.getboolean(
+            "STATEMENTS", "prepared", fallback=False
+        )
+        self.statement_cache_size = self.config.getint(
+            "STATEMENTS", "cache_size", fallback=32
+        )
+
+        self.batch_size = self.config.getint(
+            "TRANSACTIONS", "batch_size", fallback=500
+        )
+
+        self.cache_enabled = self.config.getboolean("CACHE", "enabled", fallback=False)
+        self.cache_entries = self.config.getint("CACHE", "max_entries", fallback=256)
+        self.cache_ttl = self.config.getfloat("CACHE", "ttl_seconds", fallback=30.0)
+
+        self.diagnostics_enabled = self.config.getboolean(
+            "DIAGNOSTICS", "enabled", fallback=False
+        )
+        self.slow_query_ms = self.config.getfloat(
+            "DIAGNOSTICS", "slow_query_ms", fallback=250.0
+        )
+        self.slow_query_log = self.config.get(
+            "DIAGNOSTICS", "slow_query_log", fallback=""
+        )
+        self.metrics_dump_file = self.config.get(
+            "DIAGNOSTICS", "dump_file", fallback=""
+        )
+
+        # LOAD DATA LOCAL INFILE lets the server read client files, so it is opt-in
+        self.allow_local_infile = self.engine.supports_load_data and (
+            self.config.getboolean("IMPORT", "allow_local_infile", fallback=False)
+        )
+
+    @property
+    def Error(self):
+        """The driver's base exception class; importing the driver is deferred."""
+        return self.engine.Error
 
     def create_connection(self):
-        try:
-            connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                passwd=self.password,
-                database=self.database,
-            )
-            print("Connected to MySQL Database successfully")
-            return connection
-        except Error as e:
-            print(f"Database Connection Error: {e}")
+        return self.engine.connect()
+
+    @property
+    def capacity(self):
+        """Statements that can run at once across the primary and replicas."""
+        if self.replicas is None:
+            return self.pool_size
+        return self.pool_size + self.replica_pool_size * len(self.replicas)
+
+    def _servers(self, primary):
+        """Servers to try in order: healthy replicas first unless ``primary``."""
+        if primary or self.replicas is None:
+            return [self.primary]
+        return self.replicas.candidates() + [self.primary]
+
+    def _unreachable(self, server, error):
+        return isinstance(error, PoolError) or server.engine.is_disconnect(error)
+
+    def _run(self, work, retry=False, primary=True):
+        """Run ``work(connection)`` on a pooled connection.
+
+        A connection that fails with a disconnect error is thrown away. Reads pass
+        ``retry=True`` so they are replayed once on a fresh connection; writes are
+        not, since the server may already have applied them. Reads that pass
+        ``primary=False`` run on a replica when there are any; an unreachable
+        replica is marked down and the next server is tried.
+        """
+        for server in self._servers(primary):
+            try:
+                result = self._run_on(server, work, retry)
+            except (self.Error, PoolError) as e:
+                if server is self.primary or not self._unreachable(server, e):
+                    raise
+                self.replicas.failed(server, e)
+                continue
+            if server is not self.primary:
+                self.replicas.succeeded(server)
+            return result
+
+    def _run_on(self, server, work, retry):
+        attempts = 2 if retry else 1
+        for attempt in range(attempts):
+            connection = server.pool.acquire()
+            thread_id = threading.get_ident()
+            self._active[thread_id] = (server, connection)
+            try:
+                return work(connection)
+            except self.Error as e:
+                if server.engine.is_disconnect(e):
+                    server.pool.release(connection, broken=True)
+                    connection = None
+                    if attempt + 1 < attempts:
+                        continue
+                raise
+            finally:
+                self._active.pop(thread_id, None)
+                if connection is not None:
+                    server.pool.release(connection)
+
+    @contextmanager
+    def cursor_for(self, connection, query, data):
+        """Yield ``(cursor, operation)`` to execute ``query`` with ``data``.
+
+        Repeated parameterised statements reuse a prepared cursor from the
+        connection's StatementCache, so the server parses them only once; other
+        statements get a plain cursor that is closed afterwards.
+        """
+        if not (self.prepared and data and PREPARABLE.match(query)):
+            cursor = connection.cursor()
             try:
-                connection = mysql.connector.connect(
-                    host=self.host, user=self.user, passwd=self.password
-                )
-                cursor = connection.cursor()
-                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+                yield cursor, self.engine.translate(query)
+            finally:
                 cursor.close()
-                connection.close()
-
-                connection = mysql.connector.connect(
-                    host=self.host,
-                    user=self.user,
-                    passwd=self.password,
-                    database=self.database,
-                )
-                return connection
-            except Error as e:
-                print(f"Database Creation Error: {e}")
-                return None
+            return
+
+        statements = self._statements.get(id(connection))
+        if statements is None:
+            statements = StatementCache(
+                connection, self.statement_cache_size, self._statement_stats
+            )
+            self._statements[id(connection)] = statements
+        cursor, operation = statements.get(query)
+        try:
+            yield cursor, operation
+        except self.Error:
+            # The statement may be invalid now (e.g. after DDL); prepare afresh
+            statements.discard(query)
+            raise
+
+    def _forget_statements(self, connection):
+        statements = self._statements.pop(id(connection), None)
+        if statements is not None:
+            statements.close()
+
+    def statement_stats(self):
+        """Prepared-statement counters; ``prepares_saved`` counts reuses."""
+        return self._statement_stats.snapshot()
+
+    def add_query_hook(self, callback):
+        """Call ``callback(query, rows, seconds, error)`` after each statement.
+
+        Hooks run on the thread that executed the statement. ``rows`` is the
+        number of rows fetched or affected; cache hits are not reported.
+        """
+        self._query_hooks.append(callback)
+
+    def _observe(self, query, started, rows, error=None):
+        if not self._query_hooks:
+            return
+        elapsed = time.perf_counter() - started
+        for hook in self._query_hooks:
+            hook(query, rows, elapsed, error)
+
+    @contextmanager
+    def timed(self, query):
+        """Time the statements run in the block; set ``result["rows"]`` inside."""
+        result = {"rows": 0}
+        started = time.perf_counter()
+        try:
+            yield result
+        except Exception as e:
+            self._observe(query, started, result["rows"], e)
+            raise
+        self._observe(query, started, result["rows"])
+
+    def kill_query(self, thread_id):
+        """Abort the statement ``thread_id`` is running, on whichever server.
+
+        MySQL uses a throwaway connection so it works even when the pool is
+        exhausted; SQLite interrupts the connection directly.
+        """
+        active = self._active.get(thread_id)
+        if active is None:
+            return False
+        server, connection = active
+        try:
+            return server.engine.kill(connection)
+        except self.Error as e:
+            print(f"Error cancelling query: {e}")
+            return False
 
     def execute_query(self, query, data=None):
-        if self.connection:
-            cursor = self.connection.cursor()
+        def work(connection):
             try:
-                if data:
-                    cursor.execute(query, data)
-                else:
-                    cursor.execute(query)
-                self.connection.commit()
+                with self.cursor_for(connection, query, data) as (cursor, operation):
+                    if data:
+                        cursor.execute(operation, data)
+                    else:
+                        cursor.execute(operation)
+                    observed["rows"] = max(cursor.rowcount, 0)
+                connection.commit()
                 return True
-            except Error as e:
-                print(f"Error executing query: {e}")
-                return False
-            finally:
-                cursor.close()
-        return False
+            except self.Error:
+                connection.rollback()
+                raise
 
-    def fetch_all(self, query, data=None):
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, data) if data else cursor.execute(query)
-            return cursor.fetchall()
-        except mysql.connector.Error as err:
-            print(f"Error fetching data: {err}")
+            with self.timed(query) as observed:
+                return self._run(work)
+        except (self.Error, PoolError) as e:
+            print(f"Error executing query: {e}")
+            return False
+        finally:
+            self._invalidate(query)
+
+    @contextmanager
+    def transaction(self, savepoints=False, batch_size=None):
+        """Group statements into one transaction on a single pooled connection.
+
+            with db_manager.transaction() as tx:
+                tx.execute(...)
+                tx.executemany(..., rows)
+
+        Commits when the block exits normally and rolls back if it raises.
+        See UnitOfWork for ``savepoints`` partial-failure reporting.
+        """
+        connection = self.pool.acquire()
+        thread_id = threading.get_ident()
+        self._active[thread_id] = (self.primary, connection)
+        unit = UnitOfWork(
+            self, connection, savepoints, batch_size or self.batch_size, self.Error
+        )
+        broken = False
+        try:
+            self.engine.begin(connection)
+            yield unit
+            connection.commit()
+        except BaseException as e:
+            broken = isinstance(e, self.Error) and self.engine.is_disconnect(e)
+            if not broken:
+                connection.rollback()
+            raise
+        finally:
+            self._active.pop(thread_id, None)
+            self.pool.release(connection, broken=broken)
+            for query in unit.queries:
+                self._invalidate(query)
+
+    def execute_many(self, query, rows, batch_size=None):
+        """Run ``query`` once per row in ``rows`` as a single transaction.
+
+        INSERT ... VALUES chunks of ``batch_size`` rows are each sent as one
+        multi-row INSERT. Returns the number of rows applied, or None if the batch
+        failed and was rolled back.
+        """
+        try:
+            with self.transaction(batch_size=batch_size) as tx:
+                return tx.executemany(query, rows)
+        except (self.Error, PoolError) as e:
+            print(f"Error executing batch: {e}")
+            return None
+
+    def execute_count(self, query, data=None):
+        """Like execute_query, but return the affected row count (None on error)."""
+
+        def work(connection):
+            try:
+                with self.cursor_for(connection, query, data) as (cursor, operation):
+                    if data:
+                        cursor.execute(operation, data)
+                    else:
+                        cursor.execute(operation)
+                    rowcount = cursor.rowcount
+                    observed["rows"] = max(rowcount, 0)
+                connection.commit()
+                return rowcount
+            except self.Error:
+                connection.rollback()
+                raise
+
+        try:
+            with self.timed(query) as observed:
+                return self._run(work)
+        except (self.Error, PoolError) as e:
+            print(f"Error executing query: {e}")
             return None
         finally:
-            cursor.close()
+            self._invalidate(query)
+
+    def fetch_all(self, query, data=None, cached=True, primary=False):
+        def work(connection):
+            with self.cursor_for(connection, query, data) as (cursor, operation):
+                if data:
+                    cursor.execute(operation, data)
+                else:
+                    cursor.execute(operation)
+                return cursor.fetchall()
+
+        result = self._cached_read("all", query, data, cached, primary, work)
+        return list(result) if result is not None else None
+
+    def fetch_one(self, query, data=None, cached=True, primary=False):
+        def work(connection):
+            with self.cursor_for(connection, query, data) as (cursor, operation):
+                if data:
+                    cursor.execute(operation, data)
+                else:
+                    cursor.execute(operation)
+                row = cursor.fetchone()
+                # Drain the rest so a reused cursor has no unread result
+                cursor.fetchall()
+                return row
+
+        return self._cached_read("one", query, data, cached, primary, work)
+
+    def _cached_read(self, kind, query, data, cached, primary, work):
+        """Serve a read from the cache, or run it and remember the result.
+
+        Pass ``cached=False`` for reads that must see the latest committed data,
+        such as duplicate checks right before a write, and also ``primary=True``
+        when replicas are configured, since a replica may not have it yet.
+        """
+        cache = self.cache if cached else None
+        if cache is not None:
+            key = QueryCache.make_key(kind, query, data)
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            generation = cache.generation
 
-    def fetch_one(self, query, data=None):
-        cursor = self.connection.cursor()
         try:
-            cursor.execute(query, data) if data else cursor.execute(query)
-            return cursor.fetchone()
-        except mysql.connector.Error as err:
+            with self.timed(query) as observed:
+                result = self._run(work, retry=True, primary=primary)
+                observed["rows"] = len(result) if kind == "all" else int(bool(result))
+        except (self.Error, PoolError) as err:
             print(f"Error fetching data: {err}")
             return None
+
+        if cache is not None and result is not None:
+            cache.put(key, tuple(result) if kind == "all" else result, generation)
+        return result
+
+    def _invalidate(self, query):
+        if self.cache is not None:
+            self.cache.invalidate_for(query)
+
+    def cache_stats(self):
+        """Hit/miss counters of the query cache, or None when it is disabled."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def change_watermark(self):
+        """Current server time, to be taken before reading a full snapshot."""
+        result = self.fetch_one(
+            "SELECT CURRENT_TIMESTAMP(6)", cached=False, primary=True
+        )
+        return self._timestamp(result[0]) if result else None
+
+    def fetch_changes(self, since, overlap_seconds=2):
+        """Return ``(rows, deleted_keys, watermark)`` for changes after ``since``.
+
+        One UNION ALL query reads both the updated_at and tombstone indexes, so
+        when nothing changed it is two empty range scans. Each poll re-reads the
+        last ``overlap_seconds`` so a row committed slightly later than its
+        timestamp is not skipped; applying a change twice is harmless. Returns
+        None if the query failed.
+
+        The feed is read from the primary. With replicas the window also spans
+        ``max_lag_seconds``, so a snapshot read from a replica that was that
+        far behind the watermark still gets the rows it was missing.
+        """
+        if self.replicas is not None:
+            overlap_seconds += self.replica_max_lag
+        start = since - timedelta(seconds=overlap_seconds)
+        records = self.fetch_all(
+            "SELECT 'U', RegistrationNo, Name, Email, Contact, DOB, Hostelite, "
+            "updated_at FROM students WHERE updated_at > %s "
+            "UNION ALL "
+            "SELECT 'D', RegistrationNo, NULL, NULL, NULL, NULL, NULL, "
+            "deleted_at FROM student_tombstones WHERE deleted_at > %s",
+            (start, start),
+            cached=False,
+            primary=True,
+        )
+        if records is None:
+            return None
+        if records and self.cache is not None:
+            # Another client may have written; cached reads of students are stale
+            self.cache.invalidate("students")
+
+        rows, deleted, watermark = [], [], since
+        for record in records:
+            if record[0] == "D":
+                deleted.append(record[1])
+            else:
+                rows.append(tuple(record[1:7]))
+            watermark = max(watermark, self._timestamp(record[7]))
+        return rows, deleted, watermark
+
+    @staticmethod
+    def _timestamp(value):
+        # SQLite only converts declared columns; computed values come back as text
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+    def stream(self, query, data=None, batch_size=1000, primary=False):
+        """Yield result rows in ``fetchmany`` batches from an unbuffered cursor.
+
+        Rows are pulled from the server as they are consumed, so memory stays flat
+        however large the result is. Errors propagate to the caller. A connection
+        abandoned before the last batch is closed rather than returned, since it
+        still has unread rows on the wire. Runs on a replica unless ``primary``;
+        failover only happens while connecting, not part way through.
+        """
+        for server in self._servers(primary):
+            try:
+                connection = server.pool.acquire()
+            except PoolError as e:
+                if server is self.primary:
+                    raise
+                self.replicas.failed(server, e)
+                continue
+            if server is not self.primary:
+                self.replicas.succeeded(server)
+            break
+        thread_id = threading.get_ident()
+        self._active[thread_id] = (server, connection)
+        finished = False
+        try:
+            cursor = server.engine.stream_cursor(connection)
+            query = server.engine.translate(query)
+            try:
+                cursor.execute(query, data) if data else cursor.execute(query)
+                started = time.perf_counter()
+                count = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    yield rows
+                finished = True
+                # Includes the consumer's time between batches
+                self._observe(query, started, count)
+            finally:
+                if finished:
+                    cursor.close()
         finally:
-            cursor.close()
+            self._active.pop(thread_id, None)
+            server.pool.release(connection, broken=not finished)
+
+    def replica_stats(self):
+        """Availability and read counts per replica; empty without replicas."""
+        return self.replicas.stats() if self.replicas is not None else []
 
     def close_connection(self):
-        if self.connection:
-            self.connection.close()
-            print("Connection closed successfully")
+        self.pool.close_all()
+        if self.replicas is not None:
+            self.replicas.close_all()
+        print("Connection closed successfully")
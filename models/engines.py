@@ -0,0 +1,304 @@
+# ===== STORAGE ENGINES ===== #
+#
+# DatabaseManager talks to its backend only through one of these objects, so
+# the views keep writing MySQL-flavoured SQL (``%s`` placeholders, TRUNCATE,
+# CURRENT_TIMESTAMP(6)) and the engine adapts it to its own dialect.
+
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+from urllib.parse import quote
+
+# Client errors that mean the socket is gone, not that the statement was bad
+MYSQL_DISCONNECT_ERRORS = (
+    "CR_SERVER_GONE_ERROR",
+    "CR_SERVER_LOST",
+    "CR_SERVER_LOST_EXTENDED",
+    "CR_CONNECTION_ERROR",
+    "CR_CONN_HOST_ERROR",
+)
+
+
+class MySQLEngine:
+    """MySQL server through mysql.connector, imported on first use."""
+
+    name = "mysql"
+    supports_prepared = True
+    supports_load_data = True
+
+    def __init__(
+        self,
+        host,
+        user,
+        password,
+        database,
+        allow_local_infile=False,
+        port=3306,
+        read_only=False,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.database = database
+        self.allow_local_infile = allow_local_infile
+        # Replicas: never create the database, and refuse writes per session
+        self.read_only = read_only
+
+    @property
+    def Error(self):
+        from mysql.connector import Error
+
+        return Error
+
+    def connect(self):
+        import mysql.connector
+
+        try:
+            connection = mysql.connector.connect(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                passwd=self.password,
+                database=self.database,
+                allow_local_infile=self.allow_local_infile,
+            )
+            if self.read_only:
+                cursor = connection.cursor()
+                cursor.execute("SET SESSION TRANSACTION READ ONLY")
+                cursor.close()
+            print("Connected to MySQL Database successfully")
+            return connection
+        except self.Error as e:
+            print(f"Database Connection Error: {e}")
+            if self.read_only:
+                return None
+            try:
+                connection = mysql.connector.connect(
+                    host=self.host, port=self.port, user=self.user, passwd=self.password
+                )
+                cursor = connection.cursor()
+                cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database}")
+                cursor.close()
+                connection.close()
+
+                connection = mysql.connector.connect(
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    passwd=self.password,
+                    database=self.database,
+                    allow_local_infile=self.allow_local_infile,
+                )
+                return connection
+            except self.Error as e:
+                print(f"Database Creation Error: {e}")
+                return None
+
+    def is_alive(self, connection):
+        return connection.is_connected()
+
+    def is_disconnect(self, error):
+        from mysql.connector import errorcode
+
+        errno = getattr(error, "errno", None)
+        return any(
+            getattr(errorcode, name) == errno for name in MYSQL_DISCONNECT_ERRORS
+        )
+
+    def translate(self, query):
+        return query
+
+    def begin(self, connection):
+        # autocommit is off, so the first statement opens the transaction
+        pass
+
+    def stream_cursor(self, connection):
+        return connection.cursor(buffered=False)
+
+    def kill(self, running):
+        """Abort the statement on ``running`` from a throwaway connection."""
+        connection = self.connect()
+        if not connection:
+            return False
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"KILL QUERY {int(running.connection_id)}")
+            return True
+        finally:
+            cursor.close()
+            connection.close()
+
+
+# SQLite keeps timestamps as text; millisecond precision sorts correctly
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",  # readers never block the writer
+    "PRAGMA synchronous = NORMAL",  # durable at checkpoints; safe with WAL
+    "PRAGMA busy_timeout = 5000",  # wait for the write lock instead of failing
+    "PRAGMA cache_size = -32000",  # 32 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA foreign_keys = ON",
+)
+
+_SQLITE_REWRITES = (
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?", re.I), "DELETE FROM "),
+    (re.compile(r"\bINSERT\s+IGNORE\b", re.I), "INSERT OR IGNORE"),
+    (re.compile(r"\bCURRENT_TIMESTAMP\(6\)", re.I), SQLITE_NOW),
+)
+
+
+def register_sqlite_types():
+    """Store dates as ISO text and read DATE/TIMESTAMP columns back as objects.
+
+    The stdlib default adapters are deprecated since Python 3.12, so register
+    our own. Timestamps use millisecond precision like SQLITE_NOW so text
+    comparisons against stored values stay consistent.
+    """
+    sqlite3.register_adapter(date, date.isoformat)
+    sqlite3.register_adapter(
+        datetime, lambda value: value.isoformat(" ", timespec="milliseconds")
+    )
+    sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+    sqlite3.register_converter(
+        "TIMESTAMP", lambda value: datetime.fromisoformat(value.decode())
+    )
+
+
+@lru_cache(maxsize=512)
+def sqlite_dialect(query):
+    """Rewrite the MySQL-isms the application uses into SQLite syntax."""
+    for pattern, replacement in _SQLITE_REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+class SQLiteEngine:
+    """Embedded SQLite database file, tuned for a local single-user store.
+
+    Each pooled connection keeps sqlite3's own prepared statement cache of
+    ``cached_statements`` entries, which plays the role of the server-side
+    prepared statements used with MySQL.
+    """
+
+    name = "sqlite"
+    supports_prepared = False
+    supports_load_data = False
+    Error = sqlite3.Error
+
+    def __init__(self, path, cached_statements=128, read_only=False):
+        self.path = path
+        self.cached_statements = cached_statements
+        # Replicas open the file with mode=ro, so a misrouted write fails
+        self.read_only = read_only
+        register_sqlite_types()
+
+    def connect(self):
+        target, pragmas = self.path, SQLITE_PRAGMAS
+        if self.read_only:
+            target = f"file:{quote(os.path.abspath(self.path))}?mode=ro"
+            # The journal mode is a property of the file, set by the primary
+            pragmas = SQLITE_PRAGMAS[1:]
+        try:
+            connection = sqlite3.connect(
+                target,
+                timeout=5.0,
+                detect_types=sqlite3.PARSE_DECLTYPES,
+                check_same_thread=False,  # the pool hands it to one thread at a time
+                cached_statements=self.cached_statements,
+                uri=self.read_only,
+            )
+            for pragma in pragmas:
+                connection.execute(pragma)
+            return connection
+        except sqlite3.Error as e:
+            print(f"Database Connection Error: {e}")
+            return None
+
+    def is_alive(self, connection):
+        connection.execute("SELECT 1").fetchone()
+        return True
+
+    def is_disconnect(self, error):
+        # There is no socket to lose; a failed statement leaves the file usable
+        return False
+
+    def translate(self, query):
+        return sqlite_dialect(query)
+
+    def begin(self, connection):
+        # An explicit BEGIN keeps the outermost SAVEPOINT from committing on
+        # RELEASE, so savepoints nest inside the unit of work as with MySQL
+        if not connection.in_transaction:
+            connection.execute("BEGIN")
+
+    def stream_cursor(self, connection):
+        # sqlite3 cursors already step through results lazily
+        return connection.cursor()
+
+    def kill(self, running):
+        """Interrupt the statement running on one of our own connections."""
+        running.interrupt()
+        return True
+
+
+def create_engine(config):
+    """Build the engine selected by ``backend`` in the [DATABASE] section."""
+    db_config = config["DATABASE"]
+    backend = db_config.get("backend", "mysql").strip().lower()
+    if backend == "sqlite":
+        return SQLiteEngine(
+            db_config.get("path", "students.db"),
+            config.getint("STATEMENTS", "cache_size", fallback=128),
+        )
+    if backend == "mysql":
+        return MySQLEngine(
+            db_config.get("host", "localhost"),
+            db_config.get("user", "root"),
+            db_config.get("password", "password"),
+            db_config.get("database", "uobs"),
+            config.getboolean("IMPORT", "allow_local_infile", fallback=False),
+            port=db_config.getint("port", 3306),
+        )
+    raise ValueError(f"Unknown database backend: {backend}")
+
+
+def _split_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def create_replica_engines(config):
+    """Read-only engines for the replicas listed in the [REPLICAS] section.
+
+    MySQL replicas are ``hosts`` entries (``host`` or ``host:port``) sharing
+    the primary's credentials and database name; SQLite replicas are database
+    ``paths``. Returns ``[(name, engine), ...]``, empty without replicas.
+    """
+    if not config.has_section("REPLICAS"):
+        return []
+    primary = create_engine(config)
+    replicas = config["REPLICAS"]
+    if primary.name == "sqlite":
+        return [
+            (path, SQLiteEngine(path, primary.cached_statements, read_only=True))
+            for path in _split_list(replicas.get("paths", ""))
+        ]
+    engines = []
+    for address in _split_list(replicas.get("hosts", "")):
+        host, _, port = address.partition(":")
+        engine = MySQLEngine(
+            host,
+            primary.user,
+            primary.password,
+            primary.database,
+            primary.allow_local_infile,
+            port=int(port) if port else primary.port,
+            read_only=True,
+        )
+        engines.append((address, engine))
+    return engines
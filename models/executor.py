@@ -0,0 +1,230 @@
+# ===== BACKGROUND QUERY EXECUTOR ===== #
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueryTask:
+    """Handle for one unit of background database work."""
+
+    def __init__(self, channel, generation, cancellable=True, quiet=False, label=None):
+        self.channel = channel
+        self.generation = generation
+        self.cancellable = cancellable
+        self.quiet = quiet
+        self.label = label
+        self.submitted = time.perf_counter()
+        self.future = None
+        self.thread_id = None
+        self.delivered = False
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        """True once the task was delivered, cancelled or superseded."""
+        return self.delivered or self.cancelled
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+
+class QueryExecutor:
+    """Runs database work on worker threads and hands results back to Tk.
+
+    Workers borrow their own pooled connection from the shared DatabaseManager,
+    so queries never share a socket with the UI thread. Results are queued and
+    delivered from the Tk mainloop via ``root.after``. Tasks submitted on the
+    same ``channel`` supersede each other: only the newest task's result is ever
+    delivered.
+    """
+
+    POLL_MS = 30
+
+    def __init__(self, root, db_manager, workers=None):
+        self.root = root
+        self.db_manager = db_manager
+        if workers is None:
+            # Leave one pooled connection free for the UI thread
+            workers = max(db_manager.pool_size - 1, 1)
+        self._workers = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="sms-db"
+        )
+        self._results = queue.Queue()
+        self._generations = {}
+        self._pending = set()
+        self._busy_listeners = []
+        self._poll_id = None
+        self._ready = threading.Event()
+        self._ready.set()
+
+    def submit(
+        self,
+        work,
+        on_success=None,
+        on_error=None,
+        channel=None,
+        cancellable=True,
+        quiet=False,
+        label=None,
+        startup=False,
+    ):
+        """Run ``work(db_manager)`` in the background.
+
+        ``on_success(result)`` or ``on_error(exception)`` is called on the Tk thread
+        unless the task was cancelled or superseded by a newer task on ``channel``.
+        ``quiet`` tasks, such as periodic polls, do not count as busy. A ``label``
+        records the task's worker, render and total time in the metrics.
+        ``startup`` is for submit_startup() only.
+        """
+        generation = self._generations.get(channel, 0) + 1
+        if channel is not None:
+            self._generations[channel] = generation
+            for task in list(self._pending):
+                if task.channel == channel and task.cancellable:
+                    task.cancel()
+
+        task = QueryTask(channel, generation, cancellable, quiet, label)
+        task.startup = startup
+        task.on_success = on_success
+        task.on_error = on_error
+        self._pending.add(task)
+        task.future = self._workers.submit(self._run, task, work)
+        self._notify_busy()
+        self._schedule_poll()
+        return task
+
+    def submit_startup(self, work, on_success=None, on_error=None):
+        """Run ``work`` ahead of everything else, e.g. connecting at launch.
+
+        Tasks submitted meanwhile wait for it to finish before they start, so
+        they never race the schema bootstrap.
+        """
+        self._ready.clear()
+
+        def startup(db_manager):
+            try:
+                return work(db_manager)
+            finally:
+                self._ready.set()
+
+        return self.submit(
+            startup,
+            on_success=on_success,
+            on_error=on_error,
+            cancellable=False,
+            label="startup",
+            startup=True,
+        )
+
+    def _run(self, task, work):
+        if not task.startup:
+            self._ready.wait()
+        if task.cancelled:
+            self._results.put((task, None, None))
+            return
+        task.thread_id = threading.get_ident()
+        started = time.perf_counter()
+        try:
+            result = work(self.db_manager)
+            self._results.put((task, result, None))
+        except Exception as e:
+            self._results.put((task, None, e))
+        finally:
+            task.thread_id = None
+            self._record(task, "db", started)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(task)
+            if self._is_stale(task):
+                task.cancel()
+                continue
+            task.delivered = True
+            started = time.perf_counter()
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+                else:
+                    print(f"Background query error: {error}")
+            elif task.on_success:
+                task.on_success(result)
+            self._record(task, "render", started)
+            self._record(task, "total", task.submitted)
+
+        # Futures cancelled before they started never reach the result queue
+        for task in list(self._pending):
+            if task.future.cancelled():
+                self._pending.discard(task)
+
+        self._notify_busy()
+        if self._pending:
+            self._schedule_poll()
+
+    def _record(self, task, part, started):
+        metrics = self.db_manager.metrics
+        if task.label and metrics is not None:
+            metrics.record(f"{task.label}.{part}", time.perf_counter() - started)
+
+    def _is_stale(self, task):
+        if task.cancelled:
+            return True
+        if task.channel is None:
+            return False
+        return self._generations.get(task.channel) != task.generation
+
+    def cancel(self, channel=None, kill=True):
+        """Cancel pending work, optionally only on one channel.
+
+        Queued tasks are dropped before they start and results of running ones
+        are discarded. With ``kill`` the running statements are also aborted on
+        the server where the backend supports it.
+        """
+        for task in list(self._pending):
+            if not task.cancellable:
+                continue
+            if channel is not None and task.channel != channel:
+                continue
+            task.cancel()
+            thread_id = task.thread_id
+            if kill and thread_id is not None:
+                self.db_manager.kill_query(thread_id)
+        self._notify_busy()
+
+    @property
+    def busy(self):
+        return any(not (t.cancelled or t.quiet) for t in self._pending)
+
+    def add_busy_listener(self, callback):
+        """Register ``callback(busy)`` to be told when work starts or finishes."""
+        self._busy_listeners.append(callback)
+
+    def _notify_busy(self):
+        busy = self.busy
+        for callback in self._busy_listeners:
+            callback(busy)
+
+    def shutdown(self):
+        for task in list(self._pending):
+            task.cancel()
+        self._ready.set()
+        self._workers.shutdown(wait=False, cancel_futures=True)
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
@@ -0,0 +1,228 @@
+# ===== COMPOUND FILTERS ===== #
+#
+# A filter is a list of ``(criteria, term)`` predicates over SEARCH_FIELDS that
+# must all hold ("Hostelite = Yes and Name starts with A and D.O.B in 2002").
+# It compiles to one parameterised WHERE clause for KeysetPager, so counting
+# and paging a filter cost one statement each, like a single search.
+#
+# A query can be driven by one index; the other predicates are checked on the
+# rows it finds. Plain column statistics cannot tell that "A%" on Name matches
+# more students than one birth month, so the planner asks the data: each
+# indexed predicate is probed with a COUNT capped at PROBE_LIMIT rows (an index
+# range read that stops early). While several of the fewest-matching ones hit
+# the cap the tie is re-probed with a ten times higher cap, up to
+# MAX_PROBE_LIMIT. The predicates are then ordered from fewest matches to most,
+# and the first one's index is named in a hint (USE INDEX on MySQL, INDEXED BY
+# on SQLite).
+#
+# Plans are cached per predicate shape - which criteria, the strategy and the
+# parameterised SQL each compiles to (so which end of a range is open and how
+# many words a Name has), and a coarse size class of each term (prefix length,
+# range span) - not per term, the way a server caches the plan of a prepared
+# statement. Filters of a known shape therefore skip the probes and reuse the
+# cached WHERE clause and hint, only binding their own parameters, so the
+# statement text is the same and the prepared statement cache reuses it too.
+# Plans are re-probed after PLAN_TTL seconds, as the data they were chosen for
+# changes.
+
+import threading
+import time
+from collections import OrderedDict
+from constants import PAGE_SIZE
+from models.pagination import KeysetPager
+from models.search import (
+    AGE,
+    FULLTEXT,
+    PREFIX,
+    RANGE,
+    SEARCH_FIELDS,
+    build_search,
+    date_bounds,
+    effective_strategy,
+    search_index,
+    search_matcher,
+    search_order,
+)
+
+# Rows a selectivity probe counts before stopping, and the highest cap a tie
+# between capped probes is re-probed with
+PROBE_LIMIT = 1000
+MAX_PROBE_LIMIT = 100000
+# Indexes that are FTS5 tables rather than indexes of students on SQLite
+FULLTEXT_INDEXES = {
+    field.index for field in SEARCH_FIELDS.values() if field.strategy == FULLTEXT
+}
+# Compiled plans kept (LRU) and how long one is trusted, in seconds
+PLAN_CACHE_SIZE = 128
+PLAN_TTL = 300
+
+
+class Predicate:
+    """One ``criteria``/``term`` condition of a filter, compiled for ``backend``.
+
+    Raises ValueError like build_search() for a malformed term.
+    """
+
+    def __init__(self, criteria, term, backend="mysql"):
+        self.criteria = criteria
+        self.term = term
+        self.where, self.params = build_search(criteria, term, backend)
+        self.index = search_index(criteria, term, backend)
+        strategy = effective_strategy(criteria, term)
+        # Terms of one shape compile to the same SQL text
+        self.shape = (
+            criteria,
+            strategy,
+            self.where,
+            size_class(criteria, term, strategy),
+        )
+
+    def matcher(self):
+        return search_matcher(self.criteria, self.term)
+
+
+def size_class(criteria, term, strategy):
+    """Coarse bucket of how many rows ``term`` can match, for the plan key."""
+    if strategy in (PREFIX, FULLTEXT):
+        # Every extra letter narrows a prefix; beyond four it rarely matters
+        return min(len(term), 4)
+    if strategy in (RANGE, AGE):
+        first, last = date_bounds(criteria, term)
+        if first is None or last is None:
+            return "open"
+        return min((last - first).days // 365, 5)
+    return None
+
+
+def compile_predicates(predicates, backend="mysql"):
+    """``[Predicate, ...]`` for ``(criteria, term)`` pairs; raises ValueError."""
+    return [Predicate(criteria, term, backend) for criteria, term in predicates]
+
+
+def index_hint(backend, index):
+    """SQL naming ``index`` as the one to read the students table through."""
+    if index is None:
+        return None
+    if backend == "mysql":
+        return f"USE INDEX ({index})"
+    # SQLite's primary key of a WITHOUT ROWID table is not a named index, and
+    # the planner prefers it for key lookups anyway; the FTS5 table behind a
+    # Name search is read in its own subquery, not through students
+    if index == "PRIMARY" or index in FULLTEXT_INDEXES:
+        return None
+    return f"INDEXED BY {index}"
+
+
+class FilterPlan:
+    """The compiled SQL of one filter shape: predicate order and index hint."""
+
+    def __init__(self, order, where, index, hint, estimates):
+        self.order = order  # positions of the predicates, driving one first
+        self.where = where
+        self.index = index
+        self.hint = hint
+        self.estimates = estimates  # probed matches per position (None: unindexed)
+        self.created = time.monotonic()
+
+    def params(self, predicates):
+        return tuple(param for i in self.order for param in predicates[i].params)
+
+
+class FilterPlanner:
+    """Plans compound filters and caches the plans per predicate shape."""
+
+    def __init__(self, max_entries=PLAN_CACHE_SIZE, ttl=PLAN_TTL):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl = ttl
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, db_manager, predicates):
+        """The FilterPlan for ``predicates`` (Predicate objects, at least one)."""
+        key = (db_manager.backend, tuple(p.shape for p in predicates))
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None and time.monotonic() - plan.created < self.ttl:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        plan = self.compile(db_manager, predicates)
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def compile(self, db_manager, predicates):
+        """Probe the indexed predicates and order them, most selective first."""
+        limit = PROBE_LIMIT
+        estimates = [
+            probe(db_manager, p, limit) if p.index else None for p in predicates
+        ]
+        while limit < MAX_PROBE_LIMIT:
+            capped = [i for i, estimate in enumerate(estimates) if estimate == limit]
+            if len(capped) < 2 or min(e for e in estimates if e is not None) < limit:
+                break
+            limit *= 10
+            for i in capped:
+                estimates[i] = probe(db_manager, predicates[i], limit)
+        # Unindexed predicates last, in the order given; ties keep that order too
+        order = tuple(
+            sorted(
+                range(len(predicates)),
+                key=lambda i: (estimates[i] is None, estimates[i] or 0),
+            )
+        )
+        driver = predicates[order[0]]
+        where = " AND ".join(f"({predicates[i].where})" for i in order)
+        return FilterPlan(
+            order,
+            where,
+            driver.index,
+            index_hint(db_manager.backend, driver.index),
+            estimates,
+        )
+
+    def pager(self, db_manager, predicates, sort_order=None, page_size=PAGE_SIZE):
+        """KeysetPager over the students matching every predicate.
+
+        Pages follow ``sort_order``, else the order the driving predicate's
+        index returns rows in (see search_order()).
+        """
+        plan = self.plan(db_manager, predicates)
+        matchers = [p.matcher() for p in predicates]
+        return KeysetPager(
+            plan.where,
+            plan.params(predicates),
+            page_size=page_size,
+            matcher=lambda record: all(match(record) for match in matchers),
+            order=search_order(predicates[plan.order[0]].criteria, sort_order),
+            index_hint=plan.hint,
+        )
+
+    def clear(self):
+        """Forget every plan, e.g. after the table was emptied or reloaded."""
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"plans": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+def probe(db_manager, predicate, limit=PROBE_LIMIT):
+    """Students matching ``predicate`` alone, counted up to ``limit``."""
+    result = db_manager.fetch_one(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM students WHERE {predicate.where} "
+        f"LIMIT {int(limit)}) AS probe",
+        predicate.params,
+    )
+    if result is None:
+        # The probe failed; rank the predicate as if it matched everything
+        return limit
+    return result[0]
@@ -0,0 +1,292 @@
+# ===== FUZZY SEARCH ===== #
+#
+# Typo-tolerant lookup over Name and Email ("Muhamad" finds "Muhammad"), which
+# no index on the server can answer without scanning every row. Instead a
+# trigram index is kept in memory: each distinct value is split into words,
+# each word into padded three-letter grams (as PostgreSQL's pg_trgm does), and
+# every gram maps to the values containing it.
+#
+# A query reads the postings of its rarest grams, takes the values sharing the
+# most grams as candidates and ranks those by word similarity: for each query
+# word, the best Jaccard similarity with any word of the value, averaged.
+# Indexing distinct values rather than rows keeps names (a few thousand
+# distinct values however many students) cheap; emails are mostly unique.
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from functools import lru_cache
+from constants import CHANGE_POLL_MS
+from models.pagination import KeysetPager
+from models.schema import TRUNCATE_MARKER
+
+# Search criteria served by the index -> position in a STUDENT_COLUMNS row
+FUZZY_FIELDS = {"Name": 1, "Email": 2}
+
+# Matches scoring below this are not returned
+MIN_SIMILARITY = 0.3
+# Students returned per search
+FUZZY_LIMIT = 100
+# Postings read per search, rarest grams first, so a query made only of very
+# common grams ("gmail", "khan") still answers in milliseconds
+MAX_POSTINGS = 50_000
+# Candidate values scored exactly per value wanted
+CANDIDATE_FACTOR = 5
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def words(text):
+    """Lower-cased alphanumeric words of ``text``."""
+    return _WORD.findall(text.casefold())
+
+
+@lru_cache(maxsize=65536)
+def word_trigrams(word):
+    # Cached: the same first names, surnames and domains recur on most rows
+    padded = f"  {word} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(grams, other):
+    """Jaccard similarity of two trigram sets."""
+    if not grams or not other:
+        return 0.0
+    shared = len(grams & other)
+    return shared / (len(grams) + len(other) - shared)
+
+
+def word_similarity(query, value):
+    """Mean over the query words of their best similarity with a value word.
+
+    ``query`` is a list of trigram sets, one per word.
+    """
+    value_words = [word_trigrams(word) for word in words(value)]
+    if not query or not value_words:
+        return 0.0
+    return sum(
+        max(similarity(grams, other) for other in value_words) for grams in query
+    ) / len(query)
+
+
+class _FieldIndex:
+    """Trigram postings over the distinct values of one column."""
+
+    def __init__(self):
+        self.values = []  # value id -> text
+        self.ids = {}  # text -> value id
+        self.keys = []  # value id -> registration numbers holding the value
+        self.postings = {}  # trigram -> array of value ids, ascending
+
+    def add(self, text, key):
+        """Record that student ``key`` has ``text``; returns the value id."""
+        value_id = self.ids.get(text)
+        if value_id is None:
+            value_id = len(self.values)
+            self.ids[text] = value_id
+            self.values.append(text)
+            self.keys.append([])
+            postings = self.postings
+            for gram in set().union(*map(word_trigrams, words(text))):
+                if gram in postings:
+                    postings[gram].append(value_id)
+                else:
+                    postings[gram] = array("I", (value_id,))
+        self.keys[value_id].append(key)
+        return value_id
+
+    def remove(self, value_id, key):
+        # Postings of a value nobody holds any more are kept (it may come back)
+        # and skipped when ranking
+        self.keys[value_id].remove(key)
+
+    def search(self, term, limit):
+        """``(score, value_id)`` of the best matching values, best first."""
+        query = [word_trigrams(word) for word in words(term)]
+        if not query:
+            return []
+        grams = set().union(*query)
+        postings = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings), key=len
+        )
+        counts = Counter()
+        read = 0
+        for ids in postings:
+            if read + len(ids) > MAX_POSTINGS:
+                if not read:
+                    # Even the rarest gram is everywhere; its first values are
+                    # as good candidates as any
+                    counts.update(ids[:MAX_POSTINGS])
+                break
+            counts.update(ids)
+            read += len(ids)
+
+        ranked = []
+        for value_id, _ in counts.most_common(limit * CANDIDATE_FACTOR):
+            if not self.keys[value_id]:
+                continue
+            score = word_similarity(query, self.values[value_id])
+            if score >= MIN_SIMILARITY:
+                ranked.append((score, value_id))
+        ranked.sort(key=lambda match: (-match[0], self.values[match[1]]))
+        return ranked
+
+
+class TrigramIndex:
+    """In-memory fuzzy index of the Name and Email of every student.
+
+    Filled once by build(); afterwards add() and remove() apply the form's own
+    writes at once and ensure_current() reads what other clients changed
+    through the change feed. Safe to use from the Tk thread while a worker
+    builds it.
+    """
+
+    def __init__(self):
+        self.fields = {criteria: _FieldIndex() for criteria in FUZZY_FIELDS}
+        self.students = {}  # RegistrationNo -> value id per field (or None)
+        self.ready = False
+        self.watermark = None
+        self.caught_up_at = None
+        # Bumped by clear(), so a build overtaken by one is not marked ready
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.students)
+
+    def add(self, record):
+        """Index a student row, replacing what was indexed for its key."""
+        key = str(record[0])
+        with self.lock:
+            if not self._changed(key, record):
+                # The change feed re-reads recent rows on every catch-up
+                return
+            self._remove(key)
+            self._add(key, record)
+
+    def remove(self, key):
+        with self.lock:
+            self._remove(str(key))
+
+    def _add(self, key, record):
+        value_ids = []
+        for criteria, position in FUZZY_FIELDS.items():
+            text = record[position]
+            if text:
+                value_ids.append(self.fields[criteria].add(text, key))
+            else:
+                value_ids.append(None)
+        self.students[key] = tuple(value_ids)
+
+    def _changed(self, key, record):
+        value_ids = self.students.get(key)
+        if value_ids is None:
+            return True
+        for (criteria, position), value_id in zip(FUZZY_FIELDS.items(), value_ids):
+            text = record[position]
+            if (self.fields[criteria].ids.get(text) if text else None) != value_id:
+                return True
+        return False
+
+    def _remove(self, key):
+        value_ids = self.students.pop(key, None)
+        if value_ids is None:
+            return
+        for index, value_id in zip(self.fields.values(), value_ids):
+            if value_id is not None:
+                index.remove(value_id, key)
+
+    def clear(self):
+        """Forget everything; the next ensure_current() reloads the table."""
+        with self.lock:
+            self.fields = {criteria: _FieldIndex() for criteria in FUZZY_FIELDS}
+            self.students = {}
+            self.ready = False
+            self.generation += 1
+
+    def build(self, db_manager):
+        """Load every student; returns the number indexed.
+
+        Changes committed while the table is read are fetched afterwards and
+        applied on top, the same way the table view takes a snapshot. Errors
+        propagate and leave the index not ready.
+        """
+        self.clear()
+        generation = self.generation
+        self.watermark = db_manager.change_watermark()
+        for rows in db_manager.stream(
+            "SELECT RegistrationNo, Name, Email FROM students"
+        ):
+            with self.lock:
+                for row in rows:
+                    key = str(row[0])
+                    self._remove(key)
+                    self._add(key, row)
+        self.catch_up(db_manager, rebuild_on_truncate=False)
+        with self.lock:
+            self.ready = generation == self.generation
+        return len(self)
+
+    def catch_up(self, db_manager, rebuild_on_truncate=True):
+        """Apply the changes committed since the build or the last catch-up."""
+        self.caught_up_at = time.monotonic()
+        if self.watermark is None:
+            return
+        changes = db_manager.fetch_changes(self.watermark)
+        if changes is None:
+            raise RuntimeError("could not read the change feed")
+        rows, deleted, watermark = changes
+        if rebuild_on_truncate and TRUNCATE_MARKER in deleted:
+            self.build(db_manager)
+            return
+        for key in deleted:
+            self.remove(key)
+        for record in rows:
+            self.add(record)
+        self.watermark = watermark
+
+    def ensure_current(self, db_manager):
+        """Build the index if needed, else catch up; concurrent callers wait.
+
+        Other clients' changes are read at most once per change poll interval,
+        so typing a search does not re-read the feed on every keystroke.
+        """
+        with self.build_lock:
+            if not self.ready:
+                self.build(db_manager)
+            elif time.monotonic() - self.caught_up_at >= CHANGE_POLL_MS / 1000:
+                self.catch_up(db_manager)
+
+    def search(self, criteria, term, limit=FUZZY_LIMIT):
+        """Registration numbers of the best matches for ``term``, best first.
+
+        Returns ``(key, score)`` pairs, at most ``limit``.
+        """
+        with self.lock:
+            index = self.fields[criteria]
+            matches = []
+            for score, value_id in index.search(term, limit):
+                wanted = limit - len(matches)
+                for key in heapq.nsmallest(wanted, index.keys[value_id]):
+                    matches.append((key, score))
+                    if len(matches) == limit:
+                        return matches
+            return matches
+
+
+def fuzzy_pager(keys):
+    """KeysetPager over exactly the students ``keys`` (a fuzzy result)."""
+    if not keys:
+        return KeysetPager("1 = 0")
+    wanted = set(keys)
+    placeholders = ", ".join(["%s"] * len(keys))
+    return KeysetPager(
+        f"RegistrationNo IN ({placeholders})",
+        tuple(keys),
+        page_size=len(keys),
+        matcher=lambda record: str(record[0]) in wanted,
+    )
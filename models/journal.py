@@ -0,0 +1,359 @@
+# ===== WRITE-BEHIND JOURNAL ===== #
+#
+# With ``[JOURNAL] enabled = yes`` the form's Add, Update and Delete do not wait
+# for the database. Each write is appended to a local JSON-lines journal,
+# fsynced, and acknowledged; a flusher thread replays the journal to the
+# database in batched transactions, retrying with backoff while the database
+# is unreachable, so an outage delays writes instead of losing them.
+#
+# Journal file layout, one JSON object per line:
+#   {"journal": "<uuid>", "seq": 41}             header: id and last compacted seq
+#   {"seq": 42, "op": "add", "key": "...", "record": [...], "at": 1712345678.9}
+#
+# Ordering: entries are applied strictly in seq order by the single flusher.
+# Exactly once: each batch transaction also records the highest seq it applied
+# in journal_checkpoints under the journal's id, so after a crash between
+# COMMIT and trimming the file the replay skips what already committed.
+# Per RegistrationNo, an add of a number that exists or an update of one that
+# does not is reported as a conflict and skipped rather than blocking the queue.
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date
+from itertools import islice
+from models.csv_io import INSERT_STUDENT
+from models.students import DELETE_STUDENT, UPDATE_STUDENT
+
+OPERATIONS = ("add", "update", "delete")
+
+# Entries applied per transaction
+JOURNAL_BATCH_SIZE = 100
+# Retry delay after a failed flush, doubled per failure up to the maximum
+RETRY_DELAY = 0.5
+MAX_RETRY_DELAY = 30
+# Rewrite the file once this many applied entries have accumulated in it
+COMPACT_AFTER = 1000
+# Conflicts kept for the UI to collect
+MAX_CONFLICTS = 100
+
+
+class JournalEntry:
+    def __init__(self, seq, op, key, record=None, at=None):
+        self.seq = seq
+        self.op = op
+        self.key = key
+        self.record = record
+        self.at = time.time() if at is None else at
+
+    def to_json(self):
+        record = None
+        if self.record is not None:
+            record = list(self.record)
+            if record[4] is not None:
+                record[4] = record[4].isoformat()
+        return json.dumps(
+            {
+                "seq": self.seq,
+                "op": self.op,
+                "key": self.key,
+                "record": record,
+                "at": self.at,
+            },
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, line):
+        data = json.loads(line)
+        record = data.get("record")
+        if record is not None:
+            if record[4] is not None:
+                record[4] = date.fromisoformat(record[4])
+            record = tuple(record)
+        return cls(data["seq"], data["op"], data["key"], record, data["at"])
+
+
+class JournalConflict:
+    """A journalled write the database state did not allow."""
+
+    def __init__(self, entry, reason):
+        self.entry = entry
+        self.reason = reason
+
+    def __str__(self):
+        return f"{self.entry.op} {self.entry.key}: {self.reason}"
+
+
+class WriteJournal:
+    """Durable local queue of student writes, flushed in the background."""
+
+    def __init__(self, db_manager, path, batch_size=JOURNAL_BATCH_SIZE, fsync=True):
+        self.db_manager = db_manager
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.pending = deque()
+        self.conflicts = deque(maxlen=MAX_CONFLICTS)
+        self.flushed = 0
+        self.conflict_count = 0
+        self.last_error = None
+        self.last_flush = None
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._file = None
+        self._load()
+
+    def _load(self):
+        """Read the journal (creating it if needed) and queue unapplied entries."""
+        self.journal_id = None
+        self.base_seq = 0
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            for line_no, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    if self.journal_id is None:
+                        header = json.loads(line)
+                        self.journal_id = header["journal"]
+                        self.base_seq = header["seq"]
+                        continue
+                    entry = JournalEntry.from_json(line)
+                except (ValueError, KeyError, TypeError, IndexError) as e:
+                    # A torn last line is what a crash mid-append leaves behind
+                    if line_no != len(lines):
+                        print(f"Skipping unreadable journal line {line_no}: {e}")
+                    continue
+                if entry.seq > self.base_seq:
+                    self.pending.append(entry)
+        if self.journal_id is None:
+            self.journal_id = str(uuid.uuid4())
+        self.next_seq = max(
+            [self.base_seq] + [entry.seq for entry in self.pending]
+        ) + 1
+        # Start from a clean file: drops torn lines and anything already applied
+        self._rewrite()
+
+    def _rewrite(self):
+        """Atomically replace the file with the header and the pending entries."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            header = {"journal": self.journal_id, "seq": self.base_seq}
+            f.write(json.dumps(header) + "\n")
+            for entry in self.pending:
+                f.write(entry.to_json() + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        _fsync_directory(self.path)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._applied_in_file = 0
+
+    def append(self, op, record):
+        """Journal one write and return its entry once it is on disk.
+
+        ``record`` is the full student row for "add"/"update" and the
+        registration number for "delete". Raises OSError if it cannot be saved.
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown journal operation: {op}")
+        with self._condition:
+            if op == "delete":
+                entry = JournalEntry(self.next_seq, op, str(record))
+            else:
+                entry = JournalEntry(self.next_seq, op, str(record[0]), tuple(record))
+            self._file.write(entry.to_json() + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.next_seq += 1
+            self.pending.append(entry)
+            self._condition.notify()
+        return entry
+
+    def start(self):
+        """Start the flusher thread (once)."""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="journal-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def close(self, timeout=5):
+        """Stop the flusher, giving it ``timeout`` seconds to drain the queue.
+
+        Whatever is still pending stays in the file for the next start.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._condition:
+            self._file.close()
+
+    def _run(self):
+        delay = RETRY_DELAY
+        while True:
+            with self._condition:
+                while not self.pending and not self._stopping:
+                    self._condition.wait()
+                if not self.pending:
+                    return
+            try:
+                self.flush_once()
+            except Exception as e:
+                if self.last_error is None:
+                    print(f"Journal flush failed, will retry: {e}")
+                self.last_error = str(e)
+                with self._condition:
+                    if self._stopping:
+                        return
+                    self._condition.wait(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+            else:
+                self.last_error = None
+                delay = RETRY_DELAY
+
+    def flush_once(self):
+        """Apply the oldest batch of pending entries; returns how many.
+
+        Raises if the database cannot be reached, leaving the batch queued.
+        """
+        with self._condition:
+            batch = list(islice(self.pending, self.batch_size))
+        if not batch:
+            return 0
+
+        db = self.db_manager
+        started = time.perf_counter()
+        try:
+            with db.transaction() as tx:
+                conflicts = self._apply(tx, batch)
+        except db.Error:
+            # Something in the batch was rejected; isolate it under savepoints
+            with db.transaction(savepoints=True) as tx:
+                conflicts = self._apply(tx, batch)
+        elapsed = time.perf_counter() - started
+
+        with self._condition:
+            for _ in batch:
+                self.pending.popleft()
+            self.base_seq = batch[-1].seq
+            self.flushed += len(batch)
+            self.conflict_count += len(conflicts)
+            self.conflicts.extend(conflicts)
+            self.last_flush = time.time()
+            self._applied_in_file += len(batch)
+            if not self.pending or self._applied_in_file >= COMPACT_AFTER:
+                self._rewrite()
+
+        if db.metrics is not None:
+            db.metrics.record("journal_flush", elapsed, len(batch))
+            db.metrics.record("journal_lag", time.time() - batch[0].at, len(batch))
+        return len(batch)
+
+    def _apply(self, tx, batch):
+        """Run ``batch`` in ``tx`` after the last applied seq; returns conflicts."""
+        record = tx.fetch_one(
+            "SELECT applied_seq FROM journal_checkpoints WHERE journal_id = %s",
+            (self.journal_id,),
+        )
+        applied_seq = record[0] if record else 0
+        todo = [entry for entry in batch if entry.seq > applied_seq]
+
+        keys = sorted({entry.key for entry in todo})
+        existing = set()
+        if keys:
+            placeholders = ", ".join(["%s"] * len(keys))
+            existing = {
+                str(row[0])
+                for row in tx.fetch_all(
+                    "SELECT RegistrationNo FROM students "
+                    f"WHERE RegistrationNo IN ({placeholders})",
+                    tuple(keys),
+                )
+            }
+
+        conflicts = []
+        for entry in todo:
+            if entry.op == "add":
+                if entry.key in existing:
+                    conflicts.append(JournalConflict(entry, "already exists"))
+                    continue
+                query, data = INSERT_STUDENT, entry.record
+            elif entry.op == "update":
+                if entry.key not in existing:
+                    conflicts.append(JournalConflict(entry, "no such student"))
+                    continue
+                query, data = UPDATE_STUDENT, entry.record[1:] + entry.record[:1]
+            else:
+                query, data = DELETE_STUDENT, (entry.key,)
+
+            if not tx.execute(query, data):
+                conflicts.append(JournalConflict(entry, str(tx.failures[-1].error)))
+            elif entry.op == "delete":
+                existing.discard(entry.key)
+            else:
+                existing.add(entry.key)
+
+        tx.execute(
+            "REPLACE INTO journal_checkpoints (journal_id, applied_seq) "
+            "VALUES (%s, %s)",
+            (self.journal_id, batch[-1].seq),
+        )
+        return conflicts
+
+    def status(self):
+        """Queue depth, age of the oldest pending write and flusher state."""
+        with self._condition:
+            oldest = self.pending[0].at if self.pending else None
+            return {
+                "pending": len(self.pending),
+                "lag_seconds": time.time() - oldest if oldest is not None else 0.0,
+                "flushed": self.flushed,
+                "conflicts": self.conflict_count,
+                "last_error": self.last_error,
+                "last_flush": self.last_flush,
+            }
+
+    def take_conflicts(self):
+        """Conflicts found since the last call, oldest first."""
+        with self._condition:
+            conflicts = list(self.conflicts)
+            self.conflicts.clear()
+            return conflicts
+
+
+def _fsync_directory(path):
+    """Make a rename durable; directories cannot be opened on Windows."""
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def open_journal(db_manager):
+    """The WriteJournal configured under [JOURNAL], or None when disabled."""
+    config = db_manager.config
+    if not config.getboolean("JOURNAL", "enabled", fallback=False):
+        return None
+    return WriteJournal(
+        db_manager,
+        config.get("JOURNAL", "path", fallback="write_journal.jsonl"),
+        batch_size=config.getint("JOURNAL", "batch_size", fallback=JOURNAL_BATCH_SIZE),
+        fsync=config.getboolean("JOURNAL", "fsync", fallback=True),
+    )
@@ -0,0 +1,174 @@
+# ===== LATENCY METRICS ===== #
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# Upper bounds (ms) of the histogram buckets; roughly x2.5 apart
+BUCKET_BOUNDS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+
+
+def query_shape(query):
+    """SQL with literals and IN (...) lists collapsed, so calls group together."""
+    shape = _WHITESPACE.sub(" ", query).strip()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _PLACEHOLDER_LIST.sub("%s, ...", shape)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; percentiles are bucket upper bounds."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, ms, rows=0):
+        index = 0
+        while index < len(BUCKET_BOUNDS_MS) and ms > BUCKET_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.rows += rows
+
+    def percentile(self, fraction):
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= wanted:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(BUCKET_BOUNDS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "total_ms": self.total_ms,
+            "rows": self.rows,
+            "buckets": dict(
+                zip([str(b) for b in BUCKET_BOUNDS_MS] + ["inf"], self.buckets)
+            ),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of latency histograms plus the slow-query log.
+
+    Query timings arrive through DatabaseManager's query hook and are grouped
+    by ``query_shape``; UI actions are recorded by the QueryExecutor as
+    ``<action>.db`` (worker time), ``<action>.render`` (Tk callback time) and
+    ``<action>.total`` (submit to rendered, including queueing).
+    """
+
+    MAX_SERIES = 500
+
+    def __init__(self, slow_query_ms=250.0, slow_query_log=None):
+        self.slow_query_ms = slow_query_ms
+        self.slow_query_log = slow_query_log
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.slow_queries = 0
+
+    def record(self, name, seconds, rows=0):
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self._series.get(name)
+            if histogram is None:
+                histogram = self._series[name] = Histogram()
+                while len(self._series) > self.MAX_SERIES:
+                    self._series.popitem(last=False)
+            histogram.add(ms, rows)
+
+    def on_query(self, query, rows, seconds, error=None):
+        """DatabaseManager query hook."""
+        shape = query_shape(query)
+        self.record(f"sql: {shape}", seconds, rows or 0)
+        if seconds * 1000 >= self.slow_query_ms:
+            self.log_slow_query(shape, rows, seconds, error)
+
+    def log_slow_query(self, shape, rows, seconds, error=None):
+        with self._log_lock:
+            self.slow_queries += 1
+            if not self.slow_query_log:
+                return
+            line = (
+                f"{datetime.now().isoformat(sep=' ', timespec='milliseconds')}\t"
+                f"{seconds * 1000:.1f} ms\trows={rows}\t{shape}"
+            )
+            if error is not None:
+                line += f"\terror={error}"
+            try:
+                with open(self.slow_query_log, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                print(f"Error writing slow query log: {e}")
+
+    def snapshot(self):
+        """``{name: summary}`` for every series, slowest total time first."""
+        with self._lock:
+            summaries = {name: h.summary() for name, h in self._series.items()}
+        return dict(
+            sorted(summaries.items(), key=lambda item: -item[1]["total_ms"])
+        )
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def dump(self, path):
+        """Write the current histograms to ``path`` as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created": datetime.now().isoformat(timespec="seconds"),
+                    "slow_query_ms": self.slow_query_ms,
+                    "slow_queries": self.slow_queries,
+                    "series": self.snapshot(),
+                },
+                f,
+                indent=2,
+            )
+
+
+class Span:
+    """Times one piece of work: ``with Span(metrics, "name"): ...``."""
+
+    def __init__(self, metrics, name, rows=0):
+        self.metrics = metrics
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.metrics is not None:
+            elapsed = time.perf_counter() - self.started
+            self.metrics.record(self.name, elapsed, self.rows)
+        return False
@@ -0,0 +1,255 @@
+# ===== KEYSET PAGINATION ===== #
+
+import threading
+from collections import OrderedDict
+from functools import cmp_to_key
+from constants import PAGE_SIZE, WINDOW_PAGES
+
+STUDENT_COLUMNS = "RegistrationNo, Name, Email, Contact, DOB, Hostelite"
+
+# Position of each column in a STUDENT_COLUMNS row
+COLUMN_POSITIONS = {
+    column: index for index, column in enumerate(STUDENT_COLUMNS.split(", "))
+}
+NOT_NULL_COLUMNS = {"RegistrationNo", "Name"}
+
+# Order used when the user has not picked one: (column, descending) pairs
+DEFAULT_ORDER = (("RegistrationNo", False),)
+
+
+def parse_sort_order(text):
+    """``"Name:asc,DOB:desc"`` -> ``(("Name", False), ("DOB", True))``.
+
+    Unknown columns and malformed entries are skipped.
+    """
+    order = []
+    for item in (text or "").split(","):
+        column, _, direction = item.strip().partition(":")
+        if column in COLUMN_POSITIONS and column not in dict(order):
+            order.append((column, direction.strip().lower() == "desc"))
+    return tuple(order)
+
+
+def format_sort_order(order):
+    return ",".join(f"{c}:{'desc' if d else 'asc'}" for c, d in order)
+
+
+def _compare_values(a, b):
+    # Same rules as the SQL ORDER BY: NULLs first, text case-insensitive
+    if a is None or b is None:
+        return (a is not None) - (b is not None)
+    if isinstance(a, str):
+        a, b = a.casefold(), b.casefold()
+    return (a > b) - (a < b)
+
+
+class KeysetPager:
+    """Reads student rows one page at a time in a stable sort order.
+
+    The pager only describes the query; each call takes the DatabaseManager to
+    run it on, so pages can be fetched from a background worker connection.
+    Pages are located with a keyset predicate (``RegistrationNo > last_key``
+    for the default order) instead of OFFSET, so every page is an index range
+    scan no matter how deep the user scrolls.
+
+    ``order`` is a sequence of ``(column, descending)`` pairs. RegistrationNo is
+    appended as a tie-breaker so the order is total; NULLs sort first, as in
+    MySQL and SQLite. Orders that mix directions cannot be read off an index
+    and are sorted by the server on every page. Keys passed to fetch_after and
+    fetch_before are registration numbers: the pager remembers the sort values
+    of rows it recently returned and looks up any others.
+
+    ``index_hint`` is SQL placed after the table name in the count and page
+    queries (``USE INDEX (...)``, ``INDEXED BY ...``) to pick the index that
+    drives them; see models/filters.py.
+    """
+
+    # Enough remembered positions to cover the loaded window several times over
+    MAX_POSITIONS = PAGE_SIZE * WINDOW_PAGES * 4
+
+    def __init__(
+        self,
+        where=None,
+        params=(),
+        page_size=PAGE_SIZE,
+        matcher=None,
+        order=None,
+        index_hint=None,
+    ):
+        self.where = where
+        self.params = tuple(params)
+        self.source = f"students {index_hint}" if index_hint else "students"
+        self.page_size = page_size
+        self.matcher = matcher
+        order = list(order or DEFAULT_ORDER)
+        columns = [column for column, _ in order]
+        if "RegistrationNo" in columns:
+            # Unique, so nothing after it can change the order
+            order = order[: columns.index("RegistrationNo") + 1]
+        else:
+            # Same direction as the column before it, so an index on the sort
+            # columns (which ends in the primary key) can be scanned either way
+            order.append(("RegistrationNo", order[-1][1]))
+        self.order = tuple(order)
+        self._positions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def keyed(self):
+        """True when rows are ordered by RegistrationNo alone."""
+        return len(self.order) == 1
+
+    def matches(self, record):
+        """Whether ``record`` belongs to this result set; None if unknown."""
+        if self.where is None:
+            return True
+        if self.matcher is None:
+            return None
+        return self.matcher(record)
+
+    def sort_values(self, record):
+        return tuple(record[COLUMN_POSITIONS[column]] for column, _ in self.order)
+
+    def compare(self, a, b):
+        """Compare two sort_values() tuples the way ORDER BY would."""
+        for (_, descending), x, y in zip(self.order, a, b):
+            result = _compare_values(x, y)
+            if result:
+                return -result if descending else result
+        return 0
+
+    def remember(self, records):
+        """Note the sort position of rows now on screen (returned or patched in)."""
+        if self.keyed:
+            return
+        with self._lock:
+            for record in records:
+                self._positions[str(record[0])] = self.sort_values(record)
+                self._positions.move_to_end(str(record[0]))
+            while len(self._positions) > self.MAX_POSITIONS:
+                self._positions.popitem(last=False)
+
+    def position(self, key):
+        """Remembered sort values of the row keyed ``key``, or None."""
+        if self.keyed:
+            return (key,)
+        with self._lock:
+            return self._positions.get(key)
+
+    def sorted_index(self, keys, record):
+        """Index at which ``record`` belongs among the ordered row ``keys``.
+
+        Returns None if a key's position is unknown.
+        """
+        positions = [self.position(key) for key in keys]
+        if any(p is None for p in positions):
+            return None
+        target = self.sort_values(record)
+        compare = cmp_to_key(self.compare)
+        low, high = 0, len(positions)
+        while low < high:
+            middle = (low + high) // 2
+            if compare(positions[middle]) < compare(target):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _conditions(self, extra=None):
+        conditions = [c for c in (self.where, extra) if c]
+        if not conditions:
+            return ""
+        return " WHERE " + " AND ".join(f"({c})" for c in conditions)
+
+    def _order_by(self, reverse=False):
+        return ", ".join(
+            f"{column} {'DESC' if descending != reverse else 'ASC'}"
+            for column, descending in self.order
+        )
+
+    def _beyond(self, values, reverse=False):
+        """Predicate for rows strictly after ``values`` (before, with ``reverse``).
+
+        Expands to ``c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...`` with NULL-aware
+        comparisons, a form the range optimizer can serve from the composite
+        index on the sort columns.
+        """
+        branches, params = [], []
+        ties, tie_params = [], []
+        for (column, descending), value in zip(self.order, values):
+            descending = descending != reverse
+            nullable = column not in NOT_NULL_COLUMNS
+            if value is None:
+                # NULLs sort first: everything non-NULL is after them
+                step, step_params = (
+                    (None, ()) if descending else (f"{column} IS NOT NULL", ())
+                )
+                tie, tie_param = f"{column} IS NULL", ()
+            else:
+                step = f"{column} {'<' if descending else '>'} %s"
+                step_params = (value,)
+                if descending and nullable:
+                    step = f"({step} OR {column} IS NULL)"
+                tie, tie_param = f"{column} = %s", (value,)
+            if step is not None:
+                branches.append(" AND ".join(ties + [step]))
+                params.extend(tie_params + list(step_params))
+            ties.append(tie)
+            tie_params.extend(tie_param)
+        if len(branches) == 1:
+            return branches[0], tuple(params)
+        return " OR ".join(f"({b})" for b in branches), tuple(params)
+
+    def _locate(self, db_manager, key):
+        values = self.position(key)
+        if values is None:
+            columns = ", ".join(column for column, _ in self.order)
+            record = db_manager.fetch_one(
+                f"SELECT {columns} FROM students WHERE RegistrationNo = %s",
+                (key,),
+                cached=False,
+                primary=True,
+            )
+            values = tuple(record) if record else None
+        return values
+
+    def page_query(self, extra=None, reverse=False):
+        """The SELECT for one page; ``extra`` is a keyset predicate to add."""
+        return (
+            f"SELECT {STUDENT_COLUMNS} FROM {self.source}{self._conditions(extra)} "
+            f"ORDER BY {self._order_by(reverse)} LIMIT {int(self.page_size)}"
+        )
+
+    def count_query(self):
+        return f"SELECT COUNT(*) FROM {self.source}{self._conditions()}"
+
+    def count(self, db_manager):
+        result = db_manager.fetch_one(self.count_query(), self.params or None)
+        return result[0] if result else 0
+
+    def fetch_after(self, db_manager, key=None):
+        """Return the page that follows ``key`` (the first page if None)."""
+        extra, params = None, self.params
+        if key is not None:
+            values = self._locate(db_manager, key)
+            if values is None:
+                return []
+            extra, beyond_params = self._beyond(values)
+            params = self.params + beyond_params
+
+        query = self.page_query(extra)
+        records = db_manager.fetch_all(query, params or None) or []
+        self.remember(records)
+        return records
+
+    def fetch_before(self, db_manager, key):
+        """Return the page that precedes ``key``, in display order."""
+        values = self._locate(db_manager, key)
+        if values is None:
+            return []
+        extra, beyond_params = self._beyond(values, reverse=True)
+        query = self.page_query(extra, reverse=True)
+        records = db_manager.fetch_all(query, self.params + beyond_params) or []
+        records = list(reversed(records))
+        self.remember(records)
+        return records
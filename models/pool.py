@@ -0,0 +1,135 @@
+# ===== CONNECTION POOL ===== #
+
+import threading
+import time
+from collections import deque
+
+MAX_BACKOFF = 8.0
+
+
+class PoolError(Exception):
+    """Raised when no usable connection can be handed out."""
+
+
+class ConnectionPool:
+    """Thread-safe pool that lends out database connections.
+
+    ``factory`` opens a new connection (returning None on failure) and
+    ``validator`` tells whether an existing one is still usable; ``on_discard``
+    is told about every connection the pool closes. Idle connections are
+    validated on checkout once they have been unused for ``validate_after``
+    seconds; dead ones are replaced, and failed connects are retried with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        factory,
+        validator,
+        size=5,
+        timeout=10.0,
+        validate_after=30.0,
+        max_retries=3,
+        backoff=0.5,
+        on_discard=None,
+    ):
+        self.factory = factory
+        self.on_discard = on_discard
+        self.validator = validator
+        self.size = max(int(size), 1)
+        self.timeout = timeout
+        self.validate_after = validate_after
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._idle = deque()
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+                if self._idle:
+                    # Most recently used first keeps the warmest sockets busy
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    connection, last_used = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(
+                        f"Timed out waiting for a connection ({self.size} in use)"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if connection is None:
+                return self._open()
+            if time.monotonic() - last_used >= self.validate_after:
+                if not self._is_alive(connection):
+                    self._close_quietly(connection)
+                    return self._open()
+            return connection
+        except BaseException:
+            self._forget()
+            raise
+
+    @property
+    def in_use(self):
+        """Connections currently lent out (or being opened)."""
+        with self._cond:
+            return self._created - len(self._idle)
+
+    def release(self, connection, broken=False):
+        if broken or self._closed:
+            self._close_quietly(connection)
+            self._forget()
+            return
+        with self._cond:
+            self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def _open(self):
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            connection = self.factory()
+            if connection is not None:
+                return connection
+            if attempt < self.max_retries:
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_BACKOFF)
+        raise PoolError("Could not connect to the database")
+
+    def _forget(self):
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    def _is_alive(self, connection):
+        try:
+            return self.validator(connection)
+        except Exception:
+            return False
+
+    def _close_quietly(self, connection):
+        if self.on_discard is not None:
+            self.on_discard(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,83 @@
+# ===== READ REPLICAS ===== #
+#
+# With a [REPLICAS] section DatabaseManager sends plain reads (table pages,
+# searches, counts, exports) to read-only replicas and keeps writes,
+# transactions and reads that must see the latest commit on the primary.
+# Each replica has its own ConnectionPool. A read goes to the replica with the
+# fewest connections in use, ties broken round-robin; a replica that cannot be
+# reached is skipped for ``retry_after`` seconds, and when none is left the
+# read falls back to the primary.
+
+import threading
+import time
+
+
+class Server:
+    """One database server: its engine and the pool of connections to it."""
+
+    def __init__(self, name, engine, pool):
+        self.name = name
+        self.engine = engine
+        self.pool = pool
+        self.reads = 0
+        self.failures = 0
+        self.down_until = 0.0
+        self.last_error = None
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "available": self.down_until <= time.monotonic(),
+            "in_use": self.pool.in_use,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Chooses the replica for each read and tracks which ones are down."""
+
+    def __init__(self, replicas, retry_after=30.0):
+        self.replicas = list(replicas)
+        self.retry_after = retry_after
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def candidates(self):
+        """Replicas to try for the next read, best first; down ones are left out."""
+        now = time.monotonic()
+        with self._lock:
+            start = self._turn % len(self.replicas)
+            self._turn += 1
+        rotated = self.replicas[start:] + self.replicas[:start]
+        # sort() is stable, so equally busy replicas keep the round-robin order
+        healthy = [replica for replica in rotated if replica.down_until <= now]
+        healthy.sort(key=lambda replica: replica.pool.in_use)
+        return healthy
+
+    def succeeded(self, replica):
+        replica.reads += 1
+        if replica.down_until:
+            replica.down_until = 0.0
+            print(f"Replica {replica.name} is back")
+
+    def failed(self, replica, error):
+        replica.failures += 1
+        replica.last_error = str(error)
+        if not replica.down_until:
+            print(
+                f"Replica {replica.name} unavailable for {self.retry_after:g} s: "
+                f"{error}"
+            )
+        replica.down_until = time.monotonic() + self.retry_after
+
+    def stats(self):
+        return [replica.stats() for replica in self.replicas]
+
+    def close_all(self):
+        for replica in self.replicas:
+            replica.pool.close_all()
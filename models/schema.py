@@ -0,0 +1,338 @@
+# ===== SCHEMA ===== #
+
+from models.engines import SQLITE_NOW
+from models.statistics import rebuild_statistics, stats_delta
+
+STUDENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS students (
+        RegistrationNo VARCHAR(20) PRIMARY KEY,
+        Name VARCHAR(50) NOT NULL,
+        Email VARCHAR(50),
+        Contact VARCHAR(15),
+        DOB DATE,
+        Hostelite VARCHAR(5),
+        updated_at TIMESTAMP(6) NOT NULL
+            DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+    )
+"""
+
+# Change tracking: updated_at is the row version, deletions leave a tombstone.
+# TRUNCATE bypasses triggers, so clearing the table records TRUNCATE_MARKER.
+TRUNCATE_MARKER = "*"
+
+STUDENT_COLUMNS_ADDED = {
+    "updated_at": (
+        "ALTER TABLE students ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+        "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"
+    ),
+}
+
+TOMBSTONES_TABLE = """
+    CREATE TABLE IF NOT EXISTS student_tombstones (
+        RegistrationNo VARCHAR(20) PRIMARY KEY,
+        deleted_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+        INDEX idx_tombstones_deleted_at (deleted_at)
+    )
+"""
+
+# Summary counts for the statistics view, kept current by the
+# students_stats_* triggers (see models/statistics.py)
+STATS_TABLE = """
+    CREATE TABLE IF NOT EXISTS student_stats (
+        dimension VARCHAR(20) NOT NULL,
+        bucket VARCHAR(50) NOT NULL,
+        students INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, bucket)
+    )
+"""
+
+# Highest write-behind journal entry applied per client journal; written in the
+# same transaction as the entries, so a replay after a crash skips them (see
+# models/journal.py)
+JOURNAL_TABLE = """
+    CREATE TABLE IF NOT EXISTS journal_checkpoints (
+        journal_id VARCHAR(36) PRIMARY KEY,
+        applied_seq BIGINT NOT NULL
+    )
+"""
+
+STUDENT_TRIGGERS = {
+    "students_after_delete": """
+        CREATE TRIGGER students_after_delete AFTER DELETE ON students
+        FOR EACH ROW
+            REPLACE INTO student_tombstones (RegistrationNo, deleted_at)
+            VALUES (OLD.RegistrationNo, CURRENT_TIMESTAMP(6))
+    """,
+    **{
+        f"students_stats_{event.lower()}": (
+            f"CREATE TRIGGER students_stats_{event.lower()} AFTER {event} "
+            f"ON students FOR EACH ROW {stats_delta('mysql', event)}"
+        )
+        for event in ("INSERT", "UPDATE", "DELETE")
+    },
+}
+
+# Secondary indexes backing the search strategies in models/search.py and
+# the column sorts in models/pagination.py
+STUDENT_INDEXES = {
+    "idx_students_name": "CREATE INDEX idx_students_name ON students (Name)",
+    "idx_students_email": "CREATE INDEX idx_students_email ON students (Email)",
+    "idx_students_contact": "CREATE INDEX idx_students_contact ON students (Contact)",
+    "idx_students_dob": "CREATE INDEX idx_students_dob ON students (DOB)",
+    # Composite sort indexes: with the primary key InnoDB appends, each one
+    # serves ORDER BY <columns>, RegistrationNo and its keyset predicate
+    "idx_students_name_dob": (
+        "CREATE INDEX idx_students_name_dob ON students (Name, DOB)"
+    ),
+    "idx_students_dob_name": (
+        "CREATE INDEX idx_students_dob_name ON students (DOB, Name)"
+    ),
+    "idx_students_hostelite_name": (
+        "CREATE INDEX idx_students_hostelite_name ON students (Hostelite, Name)"
+    ),
+    "idx_students_updated_at": (
+        "CREATE INDEX idx_students_updated_at ON students (updated_at)"
+    ),
+    "ft_students_name": (
+        "CREATE FULLTEXT INDEX ft_students_name ON students (Name) WITH PARSER ngram"
+    ),
+}
+
+
+# SQLite equivalents. NOCASE mirrors MySQL's case-insensitive collation, and
+# WITHOUT ROWID clusters rows on the primary key the way InnoDB does. There is
+# no ngram FULLTEXT parser; ft_students_name is an FTS5 trigram table instead.
+# FTS5 indexes rows by integer rowid, which a WITHOUT ROWID table lacks, so it
+# indexes student_names, a rowid copy of (RegistrationNo, Name) kept by the
+# students_names_* triggers (see models/search.py for the queries).
+SQLITE_NAME_INDEX = (
+    """
+    CREATE TABLE IF NOT EXISTS student_names (
+        id INTEGER PRIMARY KEY,
+        RegistrationNo VARCHAR(20) COLLATE NOCASE NOT NULL UNIQUE,
+        Name VARCHAR(50) NOT NULL
+    )
+    """,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS ft_students_name USING fts5("
+    "Name, content='student_names', content_rowid='id', tokenize='trigram')",
+    """
+    CREATE TRIGGER IF NOT EXISTS student_names_insert AFTER INSERT ON student_names
+    BEGIN
+        INSERT INTO ft_students_name (rowid, Name) VALUES (NEW.id, NEW.Name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_names_delete AFTER DELETE ON student_names
+    BEGIN
+        INSERT INTO ft_students_name (ft_students_name, rowid, Name)
+        VALUES ('delete', OLD.id, OLD.Name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS student_names_update AFTER UPDATE ON student_names
+    BEGIN
+        INSERT INTO ft_students_name (ft_students_name, rowid, Name)
+        VALUES ('delete', OLD.id, OLD.Name);
+        INSERT INTO ft_students_name (rowid, Name) VALUES (NEW.id, NEW.Name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_names_insert AFTER INSERT ON students
+    BEGIN
+        INSERT INTO student_names (RegistrationNo, Name)
+        VALUES (NEW.RegistrationNo, NEW.Name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_names_update AFTER UPDATE ON students
+    WHEN NEW.Name IS NOT OLD.Name OR NEW.RegistrationNo IS NOT OLD.RegistrationNo
+    BEGIN
+        UPDATE student_names SET RegistrationNo = NEW.RegistrationNo, Name = NEW.Name
+        WHERE RegistrationNo = OLD.RegistrationNo;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS students_names_delete AFTER DELETE ON students
+    BEGIN
+        DELETE FROM student_names WHERE RegistrationNo = OLD.RegistrationNo;
+    END
+    """,
+    # Databases created before the index existed
+    """
+    INSERT INTO student_names (RegistrationNo, Name)
+    SELECT RegistrationNo, Name FROM students
+    WHERE RegistrationNo NOT IN (SELECT RegistrationNo FROM student_names)
+    """,
+)
+
+SQLITE_SCHEMA = (
+    f"""
+    CREATE TABLE IF NOT EXISTS students (
+        RegistrationNo VARCHAR(20) COLLATE NOCASE PRIMARY KEY,
+        Name VARCHAR(50) COLLATE NOCASE NOT NULL,
+        Email VARCHAR(50) COLLATE NOCASE,
+        Contact VARCHAR(15) COLLATE NOCASE,
+        DOB DATE,
+        Hostelite VARCHAR(5),
+        updated_at TIMESTAMP NOT NULL DEFAULT ({SQLITE_NOW})
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS student_tombstones (
+        RegistrationNo VARCHAR(20) COLLATE NOCASE PRIMARY KEY,
+        deleted_at TIMESTAMP NOT NULL DEFAULT ({SQLITE_NOW})
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_tombstones_deleted_at "
+    "ON student_tombstones (deleted_at)",
+    # Stands in for ON UPDATE CURRENT_TIMESTAMP(6)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS students_after_update AFTER UPDATE ON students
+    FOR EACH ROW WHEN NEW.updated_at = OLD.updated_at
+    BEGIN
+        UPDATE students SET updated_at = {SQLITE_NOW}
+        WHERE RegistrationNo = NEW.RegistrationNo;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS students_after_delete AFTER DELETE ON students
+    FOR EACH ROW
+    BEGIN
+        REPLACE INTO student_tombstones (RegistrationNo, deleted_at)
+        VALUES (OLD.RegistrationNo, {SQLITE_NOW});
+    END
+    """,
+    STATS_TABLE.replace("INT NOT NULL", "INTEGER NOT NULL").replace(
+        "\n    )\n", "\n    ) WITHOUT ROWID\n"
+    ),
+    JOURNAL_TABLE,
+) + tuple(
+    f"CREATE TRIGGER IF NOT EXISTS students_stats_{event.lower()} AFTER {event} "
+    f"ON students FOR EACH ROW BEGIN {stats_delta('sqlite', event)}; END"
+    for event in ("INSERT", "UPDATE", "DELETE")
+) + tuple(
+    ddl.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS")
+    for ddl in STUDENT_INDEXES.values()
+    if "FULLTEXT" not in ddl
+) + SQLITE_NAME_INDEX
+
+
+# Bump whenever the DDL above changes, so clients re-run the checks once
+SCHEMA_VERSION = 5
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        id INT PRIMARY KEY,
+        version INT NOT NULL
+    )
+"""
+
+
+def schema_version(db_manager):
+    """Version recorded by the last successful ensure_schema(), 0 if none."""
+    try:
+        with db_manager.transaction() as tx:
+            record = tx.fetch_one("SELECT version FROM schema_version WHERE id = 1")
+    except db_manager.Error:
+        # No schema_version table yet
+        return 0
+    return record[0] if record else 0
+
+
+def existing_indexes(db_manager, table):
+    records = db_manager.fetch_all(
+        "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+        cached=False,
+        primary=True,
+    )
+    return {record[0] for record in records or []}
+
+
+def existing_columns(db_manager, table):
+    records = db_manager.fetch_all(
+        "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+        cached=False,
+        primary=True,
+    )
+    return {record[0] for record in records or []}
+
+
+def existing_triggers(db_manager):
+    records = db_manager.fetch_all(
+        "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS "
+        "WHERE TRIGGER_SCHEMA = DATABASE()",
+        cached=False,
+        primary=True,
+    )
+    return {record[0] for record in records or []}
+
+
+def ensure_schema(db_manager):
+    """Bring the schema up to SCHEMA_VERSION; returns False if any DDL failed.
+
+    When the recorded version is current this is a single SELECT, so startup
+    does no DDL. Otherwise the tables are created and, since CREATE TABLE IF NOT
+    EXISTS never touches an existing table, columns, indexes and triggers are
+    added one by one to databases created before they were introduced.
+    """
+    if schema_version(db_manager) >= SCHEMA_VERSION:
+        return True
+
+    if db_manager.backend == "sqlite":
+        ok = all(db_manager.execute_query(ddl) for ddl in SQLITE_SCHEMA)
+    else:
+        ok = _migrate_mysql(db_manager)
+
+    # The summary table may be new or have missed writes made before its
+    # triggers existed
+    ok = ok and rebuild_statistics(db_manager)
+
+    return ok and (
+        db_manager.execute_query(SCHEMA_VERSION_TABLE)
+        and db_manager.execute_query(
+            "REPLACE INTO schema_version (id, version) VALUES (1, %s)",
+            (SCHEMA_VERSION,),
+        )
+    )
+
+
+def _migrate_mysql(db_manager):
+    ok = db_manager.execute_query(STUDENTS_TABLE)
+    ok = db_manager.execute_query(TOMBSTONES_TABLE) and ok
+    ok = db_manager.execute_query(STATS_TABLE) and ok
+    ok = db_manager.execute_query(JOURNAL_TABLE) and ok
+
+    present = existing_columns(db_manager, "students")
+    for name, ddl in STUDENT_COLUMNS_ADDED.items():
+        if name not in present:
+            ok = db_manager.execute_query(ddl) and ok
+
+    present = existing_indexes(db_manager, "students")
+    for name, ddl in STUDENT_INDEXES.items():
+        if name not in present:
+            ok = db_manager.execute_query(ddl) and ok
+
+    present = existing_triggers(db_manager)
+    for name, ddl in STUDENT_TRIGGERS.items():
+        if name not in present:
+            ok = db_manager.execute_query(ddl) and ok
+    return ok
+
+
+def purge_tombstones(db_manager, days=30):
+    """Forget deletions older than ``days``; clients idle longer reload fully."""
+    if db_manager.backend == "sqlite":
+        return db_manager.execute_count(
+            "DELETE FROM student_tombstones "
+            "WHERE deleted_at < strftime('%Y-%m-%d %H:%M:%f', 'now', %s)",
+            (f"-{int(days)} days",),
+        )
+    return db_manager.execute_count(
+        "DELETE FROM student_tombstones "
+        "WHERE deleted_at < CURRENT_TIMESTAMP(6) - INTERVAL %s DAY",
+        (int(days),),
+    )
@@ -0,0 +1,402 @@
+# ===== SEARCH ENGINE ===== #
+
+import json
+import re
+from datetime import date, datetime, timedelta
+
+# How each search criterion is matched, and the index that serves it:
+#   prefix    - ``col LIKE 'term%'`` range scan on a B-tree index
+#   fulltext  - ``MATCH ... AGAINST`` on the ngram FULLTEXT index, so any part
+#               of a name matches; terms shorter than the ngram size fall back
+#               to a prefix scan of idx_students_name
+#   date      - exact ``col = date`` lookup on idx_students_dob
+#   range     - ``col >= from AND col <= to`` range scan on idx_students_dob,
+#               paged in DOB order so each page reads the next stretch of the
+#               index instead of filtering a primary key scan
+#   exact     - ``col = value`` for a column with a fixed set of values
+#               (Hostelite), on the leading column of a composite index
+#   age       - an age band ("18-21", "<18", "31+") turned into the DOB range
+#               of the people that old today, then searched like ``range``
+# SQLite has no ngram parser, so there fulltext looks the words up in the
+# ft_students_name FTS5 trigram table (see models/schema.py): the same
+# substring matches. Words shorter than a trigram are matched with LIKE.
+PREFIX = "prefix"
+FULLTEXT = "fulltext"
+DATE = "date"
+RANGE = "range"
+AGE = "age"
+EXACT = "exact"
+
+# Separates the two ends of a date range: "2001-01-01..2003-12-31"; either end
+# may be left out
+RANGE_SEPARATOR = ".."
+
+# Offered in the Age box; any "A-B", "A", "<A" or "A+" is accepted
+AGE_BANDS = ("<18", "18-21", "22-25", "26-30", "31+")
+
+# Default innodb ngram_token_size; shorter words produce no tokens
+NGRAM_SIZE = 2
+# Shortest word SQLite's FTS5 trigram tokenizer can look up
+TRIGRAM_SIZE = 3
+
+
+class SearchField:
+    def __init__(self, column, strategy, index, order=None, prefix_index=None):
+        self.column = column
+        self.strategy = strategy
+        self.index = index
+        # Page order when the user has not sorted by a heading
+        self.order = order
+        # B-tree index a FULLTEXT field's prefix fallback scans
+        self.prefix_index = prefix_index
+
+
+# Position of each searchable column in a STUDENT_COLUMNS row
+COLUMN_INDEX = {
+    "RegistrationNo": 0,
+    "Name": 1,
+    "Email": 2,
+    "Contact": 3,
+    "DOB": 4,
+    "Hostelite": 5,
+}
+
+# Values an ``exact`` column may hold, by how they may be typed
+EXACT_VALUES = {"Hostelite": {"yes": "Yes", "y": "Yes", "no": "No", "n": "No"}}
+
+SEARCH_FIELDS = {
+    "Registration#": SearchField("RegistrationNo", PREFIX, "PRIMARY"),
+    "Name": SearchField(
+        "Name", FULLTEXT, "ft_students_name", prefix_index="idx_students_name"
+    ),
+    "Email": SearchField("Email", PREFIX, "idx_students_email"),
+    "Contact#": SearchField("Contact", PREFIX, "idx_students_contact"),
+    "D.O.B": SearchField("DOB", DATE, "idx_students_dob"),
+    "D.O.B Range": SearchField(
+        "DOB", RANGE, "idx_students_dob", order=(("DOB", False),)
+    ),
+    "Age": SearchField("DOB", AGE, "idx_students_dob", order=(("DOB", False),)),
+    "Hostelite": SearchField("Hostelite", EXACT, "idx_students_hostelite_name"),
+}
+
+
+def escape_like(term):
+    """Escape LIKE wildcards so user input is matched literally (ESCAPE '!')."""
+    return term.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def prefix_condition(column, term):
+    return f"{column} LIKE %s ESCAPE '!'", (escape_like(term) + "%",)
+
+
+def fulltext_condition(column, term):
+    words = term.split()
+    if not words or any(len(word) < NGRAM_SIZE for word in words):
+        return prefix_condition(column, term)
+    # Every word must appear; quoting makes ngram match it as a contiguous run
+    query = " ".join('+"{}"'.format(word.replace('"', "")) for word in words)
+    return f"MATCH({column}) AGAINST (%s IN BOOLEAN MODE)", (query,)
+
+
+def contains_condition(column, term):
+    words = term.split()
+    where = " AND ".join([f"{column} LIKE %s ESCAPE '!'"] * len(words))
+    return where, tuple(f"%{escape_like(word)}%" for word in words)
+
+
+def trigram_condition(column, index, term):
+    """SQLite's fulltext_condition(): the words looked up in FTS5 table ``index``.
+
+    Words shorter than a trigram are matched with LIKE on the rows the others
+    found, or on every row when no word is long enough.
+    """
+    words = term.split()
+    indexed = [word for word in words if len(word) >= TRIGRAM_SIZE]
+    short_words = " ".join(word for word in words if len(word) < TRIGRAM_SIZE)
+    short_where, short_params = contains_condition(column, short_words)
+    if not indexed:
+        return short_where, short_params
+    # Quoted words are implicitly ANDed, each matched as a substring
+    query = " ".join('"{}"'.format(word.replace('"', '""')) for word in indexed)
+    where = (
+        "RegistrationNo IN (SELECT RegistrationNo FROM student_names WHERE id IN "
+        f"(SELECT rowid FROM {index} WHERE {index} MATCH %s))"
+    )
+    if short_where:
+        where = f"{where} AND {short_where}"
+    return where, (query,) + short_params
+
+
+def parse_date(text):
+    try:
+        return datetime.strptime(text, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+
+
+def years_before(day, years):
+    """The date ``years`` years before ``day``; 29 February becomes the 28th."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_range(term):
+    """``(youngest, oldest)`` ages, inclusive, of an age band; None if open."""
+    band = term.replace(" ", "")
+    try:
+        if band.startswith("<"):
+            return None, int(band[1:]) - 1
+        if band.endswith("+"):
+            return int(band[:-1]), None
+        low, _, high = band.partition("-")
+        low = int(low)
+        high = int(high) if high else low
+    except ValueError:
+        raise ValueError("Invalid age band. Use e.g. 18-21, <18 or 31+")
+    if low > high:
+        raise ValueError("Invalid age band: the first age is larger")
+    return low, high
+
+
+def date_bounds(criteria, term, today=None):
+    """Inclusive ``(first, last)`` DOB of a range or age search; None if open.
+
+    Raises ValueError for a malformed term.
+    """
+    field = SEARCH_FIELDS[criteria]
+    if field.strategy == AGE:
+        today = today or date.today()
+        youngest, oldest = age_range(term)
+        # Aged at least N today: born on or before today N years ago. Aged at
+        # most N: born after today N + 1 years ago
+        first = last = None
+        if oldest is not None:
+            first = years_before(today, oldest + 1) + timedelta(days=1)
+        if youngest is not None:
+            last = years_before(today, youngest)
+        return first, last
+
+    start, separator, end = term.partition(RANGE_SEPARATOR)
+    if not separator:
+        raise ValueError("Enter a range as YYYY-MM-DD..YYYY-MM-DD")
+    first = parse_date(start.strip()) if start.strip() else None
+    last = parse_date(end.strip()) if end.strip() else None
+    if first is None and last is None:
+        raise ValueError("Enter at least one end of the date range")
+    if first is not None and last is not None and first > last:
+        raise ValueError("The start of the date range is after its end")
+    return first, last
+
+
+def exact_value(column, term):
+    value = EXACT_VALUES[column].get(term.strip().casefold())
+    if value is None:
+        choices = " or ".join(sorted(set(EXACT_VALUES[column].values()), reverse=True))
+        raise ValueError(f"{column} must be {choices}")
+    return value
+
+
+def range_condition(column, first, last):
+    conditions, params = [], []
+    if first is not None:
+        conditions.append(f"{column} >= %s")
+        params.append(first)
+    if last is not None:
+        conditions.append(f"{column} <= %s")
+        params.append(last)
+    return " AND ".join(conditions), tuple(params)
+
+
+def search_order(criteria, sort_order=None):
+    """The user's heading sort, else the order ``criteria``'s index gives."""
+    if sort_order:
+        return sort_order
+    field = SEARCH_FIELDS.get(criteria)
+    return field.order if field is not None else None
+
+
+def build_search(criteria, term, backend="mysql"):
+    """Compile a search box entry to ``(where, params)`` for KeysetPager.
+
+    Raises ValueError for unknown criteria or a malformed date.
+    """
+    field = SEARCH_FIELDS.get(criteria)
+    if field is None:
+        raise ValueError(f"Unknown search criteria: {criteria}")
+
+    if field.strategy == DATE:
+        return f"{field.column} = %s", (parse_date(term),)
+    if field.strategy in (RANGE, AGE):
+        return range_condition(field.column, *date_bounds(criteria, term))
+    if field.strategy == EXACT:
+        return f"{field.column} = %s", (exact_value(field.column, term),)
+    if field.strategy == FULLTEXT:
+        if backend == "sqlite" and effective_strategy(criteria, term) == FULLTEXT:
+            return trigram_condition(field.column, field.index, term)
+        return fulltext_condition(field.column, term)
+    return prefix_condition(field.column, term)
+
+
+def effective_strategy(criteria, term):
+    """Strategy build_search() will actually use for ``term``."""
+    field = SEARCH_FIELDS[criteria]
+    if field.strategy == FULLTEXT:
+        words = term.split()
+        if not words or any(len(word) < NGRAM_SIZE for word in words):
+            return PREFIX
+    return field.strategy
+
+
+def search_index(criteria, term, backend="mysql"):
+    """Index build_search()'s condition for ``term`` can be served by, or None."""
+    field = SEARCH_FIELDS[criteria]
+    if field.strategy != FULLTEXT:
+        return field.index
+    if effective_strategy(criteria, term) == PREFIX:
+        return field.prefix_index
+    if backend == "sqlite" and all(len(word) < TRIGRAM_SIZE for word in term.split()):
+        # Only LIKE '%word%' is left, which no index serves
+        return None
+    return field.index
+
+
+def can_refine(criteria, previous_term, term):
+    """Whether results for ``term`` are a subset of those for ``previous_term``.
+
+    True when the new term only extends the old one and both compile to the same
+    matching strategy, so filtering the old rows locally gives the exact answer.
+    """
+    if criteria not in SEARCH_FIELDS or not term.startswith(previous_term):
+        return False
+    strategy = effective_strategy(criteria, term)
+    if strategy in (DATE, RANGE, AGE, EXACT):
+        return False
+    return strategy == effective_strategy(criteria, previous_term)
+
+
+def matches_locally(criteria, term, record):
+    """Client-side twin of build_search(), case-insensitive like the server."""
+    field = SEARCH_FIELDS[criteria]
+    value = record[COLUMN_INDEX[field.column]]
+    strategy = effective_strategy(criteria, term)
+    if strategy == DATE:
+        return value is not None and value.strftime("%Y-%m-%d") == term
+    if strategy in (RANGE, AGE):
+        return in_range(value, *date_bounds(criteria, term))
+    if strategy == EXACT:
+        return value == exact_value(field.column, term)
+    value = (value or "").casefold()
+    term = term.casefold()
+    if strategy == FULLTEXT:
+        return all(word in value for word in term.split())
+    return value.startswith(term)
+
+
+def search_matcher(criteria, term):
+    """Predicate telling whether a student row belongs to this search's results."""
+    if SEARCH_FIELDS[criteria].strategy in (RANGE, AGE):
+        # Fix the bounds now, so an age band keeps meaning the same rows
+        first, last = date_bounds(criteria, term)
+        return lambda record: in_range(record[COLUMN_INDEX["DOB"]], first, last)
+    return lambda record: matches_locally(criteria, term, record)
+
+
+def in_range(value, first, last):
+    return (
+        value is not None
+        and (first is None or value >= first)
+        and (last is None or value <= last)
+    )
+
+
+def explain_search(db_manager, criteria, term):
+    """Return ``(access_type, key)`` for each table access of a search query."""
+    where, params = build_search(criteria, term, db_manager.backend)
+    return explain_query(db_manager, f"SELECT * FROM students WHERE {where}", params)
+
+
+def explain_query(db_manager, query, params=()):
+    """``(access_type, key)`` for each table access of any SELECT."""
+    if db_manager.backend == "sqlite":
+        return explain_sqlite(db_manager, query, params)
+
+    result = db_manager.fetch_one(f"EXPLAIN FORMAT=JSON {query}", params)
+    plan = json.loads(result[0]) if result else {}
+
+    accesses = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if "access_type" in node:
+                accesses.append((node["access_type"], node.get("key")))
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return accesses
+
+
+_SQLITE_PLAN = re.compile(
+    r"^(SCAN|SEARCH) (\w+)(?: USING (?:COVERING )?(?:INDEX (\w+)|(?:INTEGER )?"
+    r"(PRIMARY KEY))| VIRTUAL TABLE INDEX \d+:(M)?)?"
+)
+
+
+def explain_sqlite(db_manager, query, params):
+    """EXPLAIN QUERY PLAN, mapped onto MySQL's access types.
+
+    ``SEARCH`` is an index range lookup, ``SCAN`` with an index a full index
+    scan (``index``) and ``SCAN`` without one a table scan (``ALL``). An FTS5
+    table answering a MATCH is reported like MySQL's ``fulltext`` access.
+    """
+    records = db_manager.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+    accesses = []
+    for record in records or []:
+        match = _SQLITE_PLAN.match(record[-1])
+        if not match:
+            continue
+        operation, table, index, primary, fulltext = match.groups()
+        key = index or ("PRIMARY" if primary else None)
+        if fulltext:
+            accesses.append(("fulltext", table))
+        elif operation == "SEARCH":
+            accesses.append(("range", key))
+        else:
+            accesses.append(("index" if key else "ALL", key))
+    return accesses
+
+
+# One term per SEARCH_FIELDS criteria for verify_search_plans()
+VERIFY_SAMPLES = {
+    "Registration#": "2024",
+    "Name": "Muhammad",
+    "Email": "ali@",
+    "Contact#": "0300",
+    "D.O.B": "2002-05-14",
+    "D.O.B Range": "2001-01-01..2001-06-30",
+    "Age": "<18",
+    "Hostelite": "Yes",
+}
+
+
+def verify_search_plans(db_manager, samples=None):
+    """EXPLAIN every criterion and report those that would scan the table.
+
+    Returns a dict of criteria -> list of accesses for plans that use a full
+    table scan (``ALL``) or full index scan (``index``); empty means all good.
+    Run it against a populated table: on a handful of rows the optimizer
+    rightly prefers a scan.
+    """
+    samples = samples or VERIFY_SAMPLES
+    full_scans = {}
+    for criteria, term in samples.items():
+        accesses = explain_search(db_manager, criteria, term)
+        scans = [a for a in accesses if a[0] in ("ALL", "index")]
+        if scans or not accesses:
+            full_scans[criteria] = accesses
+    return full_scans
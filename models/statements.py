@@ -0,0 +1,87 @@
+# ===== PREPARED STATEMENT CACHE ===== #
+
+import re
+import threading
+from collections import OrderedDict
+
+# Statements worth preparing: parameterised DML/queries the views repeat
+PREPARABLE = re.compile(r"^\s*(?:SELECT|INSERT|UPDATE|DELETE|REPLACE)\b", re.I)
+
+
+class StatementStats:
+    """Counters shared by every connection's StatementCache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prepared = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def add(self, prepared=0, reused=0, evicted=0):
+        with self._lock:
+            self.prepared += prepared
+            self.reused += reused
+            self.evicted += evicted
+
+    def snapshot(self):
+        with self._lock:
+            executions = self.prepared + self.reused
+            return {
+                "prepared": self.prepared,
+                "reused": self.reused,
+                "prepares_saved": self.reused,
+                "reuse_ratio": self.reused / executions if executions else 0.0,
+                "evicted": self.evicted,
+            }
+
+
+class StatementCache:
+    """LRU of server-side prepared statements for one connection.
+
+    Each entry is a prepared cursor plus the exact SQL string object it was
+    prepared with: mysql.connector only skips the PREPARE round trip when the
+    same string object is executed again, so callers must run ``operation``
+    rather than their own copy of the text. Evicted cursors are closed, which
+    deallocates the statement on the server.
+    """
+
+    def __init__(self, connection, capacity, stats):
+        self.connection = connection
+        self.capacity = max(int(capacity), 1)
+        self.stats = stats
+        self._entries = OrderedDict()
+
+    def get(self, query):
+        """Return ``(cursor, operation)`` for ``query``, preparing on first use."""
+        entry = self._entries.get(query)
+        if entry is not None:
+            self._entries.move_to_end(query)
+            self.stats.add(reused=1)
+            return entry
+
+        cursor = self.connection.cursor(prepared=True)
+        entry = (cursor, query)
+        self._entries[query] = entry
+        self.stats.add(prepared=1)
+        while len(self._entries) > self.capacity:
+            _, (old_cursor, _) = self._entries.popitem(last=False)
+            self._close_cursor(old_cursor)
+            self.stats.add(evicted=1)
+        return entry
+
+    def discard(self, query):
+        entry = self._entries.pop(query, None)
+        if entry is not None:
+            self._close_cursor(entry[0])
+
+    def close(self):
+        for cursor, _ in self._entries.values():
+            self._close_cursor(cursor)
+        self._entries.clear()
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
@@ -0,0 +1,170 @@
+# ===== STUDENT STATISTICS ===== #
+#
+# Counts per hostel status, birth year and email domain live in the
+# student_stats summary table. Triggers on students (see models/schema.py)
+# adjust the affected buckets on every insert, update and delete, so form
+# writes, CSV imports and other clients all keep it current and reading the
+# dashboard never scans students. rebuild_statistics() recomputes it from
+# scratch and verify_statistics() compares it with a live GROUP BY.
+
+from datetime import date
+
+# Dimension -> bucket expression per backend; ``{row}`` is "NEW.", "OLD." or ""
+STAT_BUCKETS = {
+    "mysql": {
+        "hostelite": "COALESCE({row}Hostelite, '')",
+        "birth_year": "COALESCE(CAST(YEAR({row}DOB) AS CHAR), '')",
+        "email_domain": "COALESCE(LOWER(SUBSTRING_INDEX({row}Email, '@', -1)), '')",
+    },
+    "sqlite": {
+        "hostelite": "COALESCE({row}Hostelite, '')",
+        "birth_year": "COALESCE(strftime('%Y', {row}DOB), '')",
+        "email_domain": (
+            "COALESCE(lower(substr({row}Email, instr({row}Email, '@') + 1)), '')"
+        ),
+    },
+}
+
+DIMENSION_TITLES = {
+    "hostelite": "Hostel Status",
+    "birth_year": "Birth Year",
+    "email_domain": "Email Domain",
+}
+
+# (label, lowest age, highest age); ages are worked out from the birth year
+AGE_BANDS = (
+    ("Under 18", 0, 17),
+    ("18-20", 18, 20),
+    ("21-24", 21, 24),
+    ("25-29", 25, 29),
+    ("30+", 30, 200),
+)
+
+
+def _delta_rows(backend, event):
+    """``(dimension, bucket, delta)`` SELECTs for one trigger event.
+
+    Updates only touch the dimensions whose bucket actually changed.
+    """
+    rows = []
+    for dimension, expression in STAT_BUCKETS[backend].items():
+        new, old = expression.format(row="NEW."), expression.format(row="OLD.")
+        changes = {"INSERT": [(new, 1)], "DELETE": [(old, -1)]}.get(
+            event, [(new, 1), (old, -1)]
+        )
+        where = ""
+        if event == "UPDATE":
+            # MySQL only accepts WHERE on a table-less SELECT with FROM DUAL
+            dual = " FROM DUAL" if backend == "mysql" else ""
+            where = f"{dual} WHERE {old} <> {new}"
+        rows.extend(
+            f"SELECT '{dimension}' AS dimension, {bucket} AS bucket, "
+            f"{delta} AS delta{where}"
+            for bucket, delta in changes
+        )
+    return " UNION ALL ".join(rows)
+
+
+def stats_delta(backend, event):
+    """Statement a students trigger runs to apply ``event`` to student_stats."""
+    rows = _delta_rows(backend, event)
+    if backend == "sqlite":
+        # WHERE true keeps SQLite from reading ON CONFLICT as a join constraint
+        return (
+            "INSERT INTO student_stats (dimension, bucket, students) "
+            f"SELECT dimension, bucket, delta FROM ({rows}) WHERE true "
+            "ON CONFLICT (dimension, bucket) "
+            "DO UPDATE SET students = students + excluded.students"
+        )
+    return (
+        "INSERT INTO student_stats (dimension, bucket, students) "
+        f"SELECT dimension, bucket, delta FROM ({rows}) AS changes "
+        "ON DUPLICATE KEY UPDATE students = students + changes.delta"
+    )
+
+
+def group_by_query(backend):
+    """Full-table counts for every dimension, as one statement."""
+    return " UNION ALL ".join(
+        f"SELECT '{dimension}', {expression.format(row='')}, COUNT(*) "
+        f"FROM students GROUP BY {expression.format(row='')}"
+        for dimension, expression in STAT_BUCKETS[backend].items()
+    )
+
+
+def fetch_statistics(db_manager):
+    """``{dimension: [(bucket, students), ...]}`` read from the summary table."""
+    records = db_manager.fetch_all(
+        "SELECT dimension, bucket, students FROM student_stats "
+        "WHERE students <> 0 ORDER BY dimension, bucket",
+        cached=False,
+    )
+    statistics = {dimension: [] for dimension in DIMENSION_TITLES}
+    for dimension, bucket, students in records or []:
+        statistics.setdefault(dimension, []).append((bucket, students))
+    return statistics
+
+
+def age_bands(birth_years, today=None):
+    """Fold ``[(birth_year, students)]`` into AGE_BANDS plus "Unknown"."""
+    year = (today or date.today()).year
+    counts = {label: 0 for label, _, _ in AGE_BANDS}
+    unknown = 0
+    for birth_year, students in birth_years:
+        if not str(birth_year).isdigit():
+            unknown += students
+            continue
+        age = year - int(birth_year)
+        for label, low, high in AGE_BANDS:
+            if low <= age <= high:
+                counts[label] += students
+                break
+        else:
+            unknown += students
+    bands = list(counts.items())
+    if unknown:
+        bands.append(("Unknown", unknown))
+    return bands
+
+
+def rebuild_statistics(db_manager):
+    """Recompute student_stats from students; returns False on failure."""
+    try:
+        with db_manager.transaction() as tx:
+            tx.execute("DELETE FROM student_stats")
+            tx.execute(
+                "INSERT INTO student_stats (dimension, bucket, students) "
+                + group_by_query(db_manager.backend)
+            )
+    except db_manager.Error as e:
+        print(f"Error rebuilding statistics: {e}")
+        return False
+    return True
+
+
+def verify_statistics(db_manager):
+    """Compare the summary table with a full GROUP BY over students.
+
+    Returns ``[(dimension, bucket, stored, actual), ...]`` for every bucket
+    that differs (empty when they agree), or None if the check could not run.
+    """
+    try:
+        # One snapshot for both reads, so concurrent writes cannot show up as drift
+        with db_manager.transaction() as tx:
+            stored = tx.fetch_all(
+                "SELECT dimension, bucket, students FROM student_stats"
+            )
+            actual = tx.fetch_all(group_by_query(db_manager.backend))
+    except db_manager.Error as e:
+        print(f"Error verifying statistics: {e}")
+        return None
+
+    stored = {(d, b): n for d, b, n in stored if n}
+    actual = {(d, b): n for d, b, n in actual}
+    mismatches = []
+    for dimension, bucket in sorted(stored.keys() | actual.keys()):
+        have = stored.get((dimension, bucket), 0)
+        want = actual.get((dimension, bucket), 0)
+        if have != want:
+            mismatches.append((dimension, bucket, have, want))
+    return mismatches
@@ -0,0 +1,51 @@
+# ===== STUDENT RECORD WRITES ===== #
+#
+# The single-record writes behind the form's Add, Update and Delete buttons.
+# They take the DatabaseManager to run on, so they can be called from an
+# executor worker or from the benchmarks.
+
+from models.csv_io import CSV_HEADER, INSERT_STUDENT
+
+CHECK_STUDENT = "SELECT RegistrationNo FROM students WHERE RegistrationNo = %s"
+
+UPDATE_STUDENT = (
+    "UPDATE students "
+    "SET Name = %s, Email = %s, Contact = %s, DOB = %s, Hostelite = %s "
+    "WHERE RegistrationNo = %s"
+)
+
+DELETE_STUDENT = "DELETE FROM students WHERE RegistrationNo = %s"
+
+
+def student_dict(record):
+    """A student row as a JSON-ready dict keyed by column name."""
+    values = dict(zip(CSV_HEADER, record))
+    if values["DOB"] is not None:
+        values["DOB"] = values["DOB"].isoformat()
+    return values
+
+
+def add_student(db_manager, record):
+    """Insert ``record`` unless its registration number is taken.
+
+    Returns "added", "exists" or "failed". The check and the INSERT run in one
+    transaction so they share a connection.
+    """
+    try:
+        with db_manager.transaction() as tx:
+            if tx.fetch_one(CHECK_STUDENT, (record[0],)):
+                return "exists"
+            tx.execute(INSERT_STUDENT, record)
+            return "added"
+    except Exception as e:
+        print(f"Error adding student: {e}")
+        return "failed"
+
+
+def update_student(db_manager, record):
+    """Overwrite every field of the student ``record[0]``; returns success."""
+    return db_manager.execute_query(UPDATE_STUDENT, tuple(record[1:]) + (record[0],))
+
+
+def delete_student(db_manager, reg_no):
+    return db_manager.execute_query(DELETE_STUDENT, (reg_no,))
@@ -0,0 +1,164 @@
+# ===== UNIT OF WORK ===== #
+
+
+class StatementFailure:
+    """One statement (or row of a batch) that was rolled back to its savepoint."""
+
+    def __init__(self, index, query, data, error):
+        self.index = index
+        self.query = query
+        self.data = data
+        self.error = error
+
+    def __repr__(self):
+        return f"StatementFailure(index={self.index}, error={self.error})"
+
+
+class UnitOfWork:
+    """Statements run on one connection and committed together.
+
+    Obtained from ``DatabaseManager.transaction()``. Without savepoints the
+    first failing statement raises and the whole unit is rolled back. With
+    ``savepoints=True`` every statement (and every executemany chunk) runs under
+    its own SAVEPOINT: a failure only undoes that piece, is recorded in
+    ``failures`` and the rest still commits. A failed chunk is replayed row by
+    row so the report names the exact rows that were rejected.
+    """
+
+    def __init__(self, db_manager, connection, savepoints, batch_size, error_types):
+        self.db_manager = db_manager
+        self.connection = connection
+        self.savepoints = savepoints
+        self.batch_size = batch_size
+        self.error_types = error_types
+        self.failures = []
+        self.rowcount = 0
+        self.queries = set()
+        self._statement_index = 0
+        self._savepoint_seq = 0
+
+    def execute(self, query, data=None):
+        """Run one statement; returns False if it was rolled back."""
+        index = self._next_index()
+        self.queries.add(query)
+        if not self.savepoints:
+            self.rowcount += self._execute(query, data)
+            return True
+        ok, rowcount = self._guarded(
+            index, query, data, lambda: self._execute(query, data)
+        )
+        self.rowcount += rowcount or 0
+        return ok
+
+    def executemany(self, query, rows, batch_size=None):
+        """Run ``query`` for every row in chunks of ``batch_size``.
+
+        Returns the number of rows applied; rejected rows end up in ``failures``
+        when savepoints are on.
+        """
+        batch_size = batch_size or self.batch_size
+        self.queries.add(query)
+        applied = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= batch_size:
+                applied += self._run_chunk(query, chunk)
+                chunk = []
+        if chunk:
+            applied += self._run_chunk(query, chunk)
+        return applied
+
+    def fetch_one(self, query, data=None):
+        """Read inside the transaction, seeing its own uncommitted writes."""
+        db = self.db_manager
+        with db.timed(query) as observed:
+            with db.cursor_for(self.connection, query, data) as (cursor, op):
+                cursor.execute(op, data) if data else cursor.execute(op)
+                row = cursor.fetchone()
+                cursor.fetchall()
+                observed["rows"] = int(row is not None)
+                return row
+
+    def fetch_all(self, query, data=None):
+        db = self.db_manager
+        with db.timed(query) as observed:
+            with db.cursor_for(self.connection, query, data) as (cursor, op):
+                cursor.execute(op, data) if data else cursor.execute(op)
+                rows = cursor.fetchall()
+                observed["rows"] = len(rows)
+                return rows
+
+    def _run_chunk(self, query, chunk):
+        first = self._statement_index
+        self._statement_index += len(chunk)
+        if not self.savepoints:
+            self._executemany(query, chunk)
+            self.rowcount += len(chunk)
+            return len(chunk)
+
+        ok, _ = self._guarded(
+            None, query, chunk, lambda: self._executemany(query, chunk)
+        )
+        if ok:
+            self.rowcount += len(chunk)
+            return len(chunk)
+
+        # Something in the chunk was bad: replay row by row to isolate it
+        applied = 0
+        for offset, row in enumerate(chunk):
+            ok, _ = self._guarded(
+                first + offset, query, row, lambda row=row: self._execute(query, row)
+            )
+            applied += ok
+        self.rowcount += applied
+        return applied
+
+    def _guarded(self, index, query, data, action):
+        """Run ``action`` under a savepoint; returns ``(ok, result)``."""
+        name = self._savepoint()
+        try:
+            result = action()
+        except self.error_types as e:
+            self._raw(f"ROLLBACK TO SAVEPOINT {name}")
+            if index is not None:
+                self.failures.append(StatementFailure(index, query, data, e))
+            return False, None
+        self._raw(f"RELEASE SAVEPOINT {name}")
+        return True, result
+
+    def _execute(self, query, data):
+        db = self.db_manager
+        with db.timed(query) as observed:
+            with db.cursor_for(self.connection, query, data) as (cursor, op):
+                cursor.execute(op, data) if data else cursor.execute(op)
+                observed["rows"] = max(cursor.rowcount, 0)
+                return observed["rows"]
+
+    def _executemany(self, query, rows):
+        db = self.db_manager
+        with db.timed(query) as observed:
+            cursor = self.connection.cursor()
+            try:
+                cursor.executemany(db.engine.translate(query), rows)
+                observed["rows"] = len(rows)
+            finally:
+                cursor.close()
+
+    def _savepoint(self):
+        self._savepoint_seq += 1
+        name = f"sp_{self._savepoint_seq}"
+        self._raw(f"SAVEPOINT {name}")
+        return name
+
+    def _raw(self, statement):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def _next_index(self):
+        index = self._statement_index
+        self._statement_index += 1
+        return index
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import DatabaseManager  # noqa: E402
+from models.schema import ensure_schema  # noqa: E402
+
+SQLITE_CONFIG = """\
+[DATABASE]
+backend = sqlite
+path = {path}
+
+[CACHE]
+enabled = no
+"""
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """An empty students table in a throwaway SQLite database."""
+    config_file = tmp_path / "test.ini"
+    config_file.write_text(SQLITE_CONFIG.format(path=tmp_path / "students.db"))
+    db_manager = DatabaseManager(str(config_file), interactive=False)
+    ensure_schema(db_manager)
+    yield db_manager
+    db_manager.close_connection()
+
+
+@pytest.fixture
+def mysql_manager():
+    """The MySQL database SMS_TEST_MYSQL_CONFIG names; its students are deleted."""
+    config_file = os.environ.get("SMS_TEST_MYSQL_CONFIG")
+    if not config_file:
+        pytest.skip("SMS_TEST_MYSQL_CONFIG does not name a MySQL test database")
+    pytest.importorskip("mysql.connector")
+    db_manager = DatabaseManager(config_file, interactive=False)
+    if db_manager.fetch_one("SELECT 1", cached=False, primary=True) is None:
+        db_manager.close_connection()
+        pytest.skip("MySQL test server is not reachable")
+    ensure_schema(db_manager)
+    db_manager.execute_query("TRUNCATE TABLE students")
+    db_manager.execute_query("TRUNCATE TABLE student_stats")
+    yield db_manager
+    db_manager.close_connection()
@@ -0,0 +1,54 @@
+import asyncio
+from datetime import date
+
+from api import StudentAPI
+from models.students import add_student
+
+STUDENTS = [
+    ("R001", "Ali Khan", "ali@example.com", "03001234567", date(2001, 3, 4), "Yes"),
+    ("R002", "Sara Khan", "sara@example.com", "03007654321", date(1999, 6, 1), "No"),
+]
+
+
+class RecordingWriter:
+    """Stands in for an asyncio StreamWriter and keeps what was written."""
+
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def export(db_manager):
+    writer = RecordingWriter()
+    api = StudentAPI(db_manager)
+    try:
+        asyncio.run(api.export(writer))
+    finally:
+        api.workers.shutdown()
+    return writer.data
+
+
+def test_export_streams_every_student(db_manager):
+    for record in STUDENTS:
+        add_student(db_manager, record)
+    response = export(db_manager)
+    assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+    assert b"RegistrationNo,Name" in response
+    assert all(record[0].encode() in response for record in STUDENTS)
+    assert response.endswith(b"0\r\n\r\n")
+
+
+def test_export_failure_before_first_batch_is_500(db_manager, monkeypatch):
+    def stream(*args, **kwargs):
+        raise db_manager.Error("lost connection")
+        yield
+
+    monkeypatch.setattr(db_manager, "stream", stream)
+    response = export(db_manager)
+    assert response.startswith(b"HTTP/1.1 500 Internal Server Error\r\n")
+    assert b"lost connection" in response
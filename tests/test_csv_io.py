@@ -0,0 +1,37 @@
+from models.csv_io import (
+    ER_DUP_ENTRY,
+    _classify_load_warnings,
+    _delete_students,
+)
+from models.students import add_student
+
+SPOOL = 'R001,Ali Khan,,,,Yes\nR002,Sara Khan,,,2001-02-30,No\nR003,"Raza, A",,,,Yes\n'
+
+
+def test_load_warnings_split_into_duplicates_and_rejected(tmp_path):
+    spool = tmp_path / "spool.csv"
+    spool.write_text(SPOOL, encoding="utf-8")
+    warnings = [
+        ("Warning", ER_DUP_ENTRY, "Duplicate entry 'R001' for key 'students.PRIMARY'"),
+        (
+            "Warning",
+            1292,
+            "Incorrect date value: '2001-02-30' for column 'DOB' at row 2",
+        ),
+        ("Warning", 1265, "Data truncated for column 'Name' at row 3"),
+        ("Warning", 1366, "Incorrect string value for column 'Name' at row 3"),
+    ]
+    duplicates, rejected = _classify_load_warnings(str(spool), warnings)
+    assert duplicates == ["R001"]
+    assert rejected == [
+        ("R002", warnings[1][2]),
+        ("R003", f"{warnings[2][2]}; {warnings[3][2]}"),
+    ]
+
+
+def test_rejected_rows_are_taken_out(db_manager):
+    for reg_no in ("R001", "R002", "R003"):
+        add_student(db_manager, (reg_no, "Ali Khan", None, None, None, "Yes"))
+    with db_manager.transaction() as tx:
+        assert _delete_students(tx, ["R002", "R003", "R002"], batch_size=1) == 2
+    assert db_manager.fetch_all("SELECT RegistrationNo FROM students") == [("R001",)]
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from models.filters import FilterPlanner, compile_predicates
+from models.search import years_before
+from models.students import add_student
+
+TODAY = date.today()
+STUDENTS = [
+    ("R001", "Ali Khan", "ali@example.com", "03001234567",
+     years_before(TODAY, 25), "Yes"),
+    ("R002", "Sara Khan", "sara@example.com", "03007654321",
+     date(1999, 6, 1), "No"),
+    ("R003", "Khan Ali Raza", "raza@example.com", "03111234567",
+     years_before(TODAY, 16), "Yes"),
+]
+
+
+@pytest.fixture
+def students(db_manager):
+    for record in STUDENTS:
+        assert add_student(db_manager, record) == "added"
+    return db_manager
+
+
+def matching(planner, db_manager, predicates):
+    compiled = compile_predicates(predicates, db_manager.backend)
+    pager = planner.pager(db_manager, compiled)
+    records = pager.fetch_after(db_manager)
+    assert pager.count(db_manager) == len(records)
+    return sorted(record[0] for record in records)
+
+
+@pytest.mark.parametrize(
+    "first, second, expected, shared",
+    [
+        # Open age bands bounded from below, then from above
+        ([("Age", "<18"), ("Hostelite", "Yes")],
+         [("Age", "31+"), ("Hostelite", "Yes")], [], False),
+        ([("D.O.B Range", "2000-01-01..")],
+         [("D.O.B Range", "..2000-01-01")], ["R002"], False),
+        # Both words are looked up in one MATCH, so the SQL is the same
+        ([("Name", "Khan")], [("Name", "Khan Ali")], ["R001", "R003"], True),
+    ],
+)
+def test_cached_plan_matches_fresh_plan(students, first, second, expected, shared):
+    planner = FilterPlanner()
+    matching(planner, students, first)
+    assert matching(planner, students, second) == expected
+    assert planner.stats()["hits"] == (1 if shared else 0)
+    assert matching(FilterPlanner(), students, second) == expected
+
+
+def test_same_shape_reuses_cached_statement(students):
+    planner = FilterPlanner()
+    first = compile_predicates(
+        [("Name", "Khan"), ("Hostelite", "Yes")], students.backend
+    )
+    second = compile_predicates(
+        [("Name", "Raza"), ("Hostelite", "No")], students.backend
+    )
+    first_pager = planner.pager(students, first)
+    second_pager = planner.pager(students, second)
+    assert planner.stats() == {"plans": 1, "hits": 1, "misses": 1}
+    assert planner.plan(students, second) is planner.plan(students, first)
+    assert second_pager.count_query() == first_pager.count_query()
+    assert second_pager.page_query() == first_pager.page_query()
+    assert second_pager.params != first_pager.params
+    assert sorted(r[0] for r in second_pager.fetch_after(students)) == []
+    assert sorted(r[0] for r in first_pager.fetch_after(students)) == [
+        "R001",
+        "R003",
+    ]
+
+
+def test_most_selective_predicate_drives(students):
+    planner = FilterPlanner()
+    predicates = [("Hostelite", "Yes"), ("Registration#", "R003")]
+    plan = planner.plan(students, compile_predicates(predicates, students.backend))
+    assert plan.order == (1, 0)
+    assert matching(planner, students, predicates) == ["R003"]
@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from benchmarks.dataset import write_csv
+from models.csv_io import import_students
+from models.search import (
+    SEARCH_FIELDS,
+    VERIFY_SAMPLES,
+    build_search,
+    explain_search,
+    verify_search_plans,
+)
+from models.students import add_student, delete_student, update_student
+
+
+def populate(db_manager, rows=2000):
+    # On a handful of rows the optimizer rightly prefers a scan
+    data = io.StringIO(newline="")
+    write_csv(data, rows)
+    data.seek(0)
+    import_students(db_manager, data)
+    return db_manager
+
+
+@pytest.fixture
+def populated(db_manager):
+    return populate(db_manager)
+
+
+def test_samples_cover_every_criteria():
+    assert set(VERIFY_SAMPLES) == set(SEARCH_FIELDS)
+
+
+def test_no_criteria_scans_the_table(populated):
+    assert verify_search_plans(populated) == {}
+
+
+def test_mysql_plans_use_indexes(mysql_manager):
+    populate(mysql_manager)
+    mysql_manager.fetch_all("ANALYZE TABLE students", cached=False, primary=True)
+    assert verify_search_plans(mysql_manager) == {}
+    assert explain_search(mysql_manager, "Name", "Muhammad") == [
+        ("fulltext", "ft_students_name")
+    ]
+    assert explain_search(mysql_manager, "Email", "ali@") == [
+        ("range", "idx_students_email")
+    ]
+
+
+def test_short_name_term_uses_name_index(populated):
+    # Shorter than an ngram: a prefix search, served by either Name index
+    [(access, key)] = explain_search(populated, "Name", "M")
+    assert access == "range"
+    assert key in ("idx_students_name", "idx_students_name_dob")
+
+
+def names_matching(db_manager, term):
+    where, params = build_search("Name", term, db_manager.backend)
+    records = db_manager.fetch_all(
+        f"SELECT RegistrationNo FROM students WHERE {where}", params
+    )
+    return sorted(record[0] for record in records)
+
+
+def test_name_index_follows_writes(db_manager):
+    add_student(db_manager, ("R001", "Ali Khan", None, None, None, "Yes"))
+    add_student(db_manager, ("R002", "Sara Khanum", None, None, None, "No"))
+    assert names_matching(db_manager, "khan") == ["R001", "R002"]
+    assert names_matching(db_manager, "Kh ali") == ["R001"]
+
+    update_student(db_manager, ("R001", "Ali Raza", None, None, None, "Yes"))
+    assert names_matching(db_manager, "khan") == ["R002"]
+    assert names_matching(db_manager, "raza") == ["R001"]
+
+    delete_student(db_manager, "R002")
+    assert names_matching(db_manager, "khan") == []
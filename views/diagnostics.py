@@ -0,0 +1,127 @@
+# ===== DIAGNOSTICS PANEL ===== #
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from constants import THEME
+
+
+class DiagnosticsDialog:
+    """Latency histograms of queries and UI actions, refreshed while open.
+
+    UI actions appear as ``<action>.db`` (worker time, all queries included),
+    ``<action>.render`` (updating the widgets) and ``<action>.total``; each
+    SQL statement shape appears as ``sql: ...``.
+    """
+
+    REFRESH_MS = 1000
+    COLUMNS = (
+        ("name", "Series", 360, tk.W),
+        ("count", "Count", 60, tk.E),
+        ("p50", "p50 ms", 70, tk.E),
+        ("p95", "p95 ms", 70, tk.E),
+        ("p99", "p99 ms", 70, tk.E),
+        ("max", "Max ms", 70, tk.E),
+        ("total", "Total ms", 80, tk.E),
+        ("rows", "Rows", 70, tk.E),
+    )
+
+    def __init__(self, parent, metrics):
+        self.theme = THEME
+        self.metrics = metrics
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("900x420")
+        self.window.configure(bg=self.theme["frame_color"])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.summary = tk.Label(
+            self.window,
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+            anchor="w",
+        )
+        self.summary.pack(fill=tk.X, padx=10, pady=5)
+
+        tree_frame = tk.Frame(self.window, bg=self.theme["frame_color"])
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree = ttk.Treeview(
+            tree_frame,
+            columns=[column[0] for column in self.COLUMNS],
+            show="headings",
+            yscrollcommand=y_scroll.set,
+        )
+        y_scroll.config(command=self.tree.yview)
+        for column, heading, width, anchor in self.COLUMNS:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, anchor=anchor)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        button_frame = tk.Frame(self.window, bg=self.theme["frame_color"], pady=10)
+        button_frame.pack(fill=tk.X)
+        buttons = [
+            ("Reset", self.reset, self.theme["warning_color"]),
+            ("Save JSON", self.save, self.theme["success_color"]),
+            ("Close", self.close, self.theme["error_color"]),
+        ]
+        for text, command, color in buttons:
+            tk.Button(
+                button_frame,
+                text=text,
+                font=("Arial", 10, "bold"),
+                width=10,
+                bg=color,
+                fg="white",
+                command=command,
+            ).pack(side=tk.LEFT, padx=10)
+
+        self.refresh()
+
+    def refresh(self):
+        snapshot = self.metrics.snapshot()
+        self.tree.delete(*self.tree.get_children())
+        for name, summary in snapshot.items():
+            self.tree.insert(
+                "",
+                tk.END,
+                values=(
+                    name,
+                    summary["count"],
+                    f"{summary['p50_ms']:.1f}",
+                    f"{summary['p95_ms']:.1f}",
+                    f"{summary['p99_ms']:.1f}",
+                    f"{summary['max_ms']:.1f}",
+                    f"{summary['total_ms']:.0f}",
+                    summary["rows"],
+                ),
+            )
+        self.summary.config(
+            text=f"{len(snapshot)} series; {self.metrics.slow_queries} queries "
+            f"slower than {self.metrics.slow_query_ms:g} ms"
+        )
+        self._refresh_id = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def reset(self):
+        self.metrics.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def save(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension=".json",
+            filetypes=[("JSON Files", "*.json")],
+            title="Save Diagnostics",
+        )
+        if not path:
+            return
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to save diagnostics: {e}")
+
+    def close(self):
+        self.window.after_cancel(self._refresh_id)
+        self.window.destroy()
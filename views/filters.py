@@ -0,0 +1,145 @@
+# ===== COMPOUND FILTER DIALOG ===== #
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from constants import THEME
+from models.filters import compile_predicates
+from models.search import SEARCH_FIELDS
+
+TERM_FORMATS = (
+    "Terms are typed as in the search box.  D.O.B: YYYY-MM-DD   "
+    "D.O.B Range: YYYY-MM-DD..YYYY-MM-DD   Age: 18-21, <18, 31+   "
+    "Hostelite: Yes or No"
+)
+
+
+class FilterDialog:
+    """Rows of criteria and term that a student must all match.
+
+    ``on_apply`` is called with the ``(criteria, term)`` pairs once they are
+    valid; an empty list means no filter.
+    """
+
+    def __init__(self, parent, backend, on_apply, predicates=()):
+        self.theme = THEME
+        self.backend = backend
+        self.on_apply = on_apply
+        self.rows = []
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Filter")
+        self.window.configure(bg=self.theme["frame_color"])
+
+        tk.Label(
+            self.window,
+            text="Students matching every condition:",
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+            anchor="w",
+        ).pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        self.rows_frame = tk.Frame(self.window, bg=self.theme["frame_color"])
+        self.rows_frame.pack(fill=tk.X, padx=10, pady=5)
+        for criteria, term in predicates or [(None, "")]:
+            self.add_row(criteria, term)
+
+        tk.Label(
+            self.window,
+            text=TERM_FORMATS,
+            font=("Arial", 9),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+            wraplength=520,
+            justify=tk.LEFT,
+        ).pack(fill=tk.X, padx=10)
+
+        button_frame = tk.Frame(self.window, bg=self.theme["frame_color"], pady=10)
+        button_frame.pack(fill=tk.X)
+        buttons = [
+            ("Add Condition", self.add_row, self.theme["info_color"]),
+            ("Apply", self.apply, self.theme["success_color"]),
+            ("Clear", self.clear, self.theme["warning_color"]),
+            ("Close", self.close, self.theme["error_color"]),
+        ]
+        for text, command, color in buttons:
+            tk.Button(
+                button_frame,
+                text=text,
+                font=("Arial", 10, "bold"),
+                width=12,
+                bg=color,
+                fg="white",
+                command=command,
+            ).pack(side=tk.LEFT, padx=10)
+
+    def add_row(self, criteria=None, term=""):
+        frame = tk.Frame(self.rows_frame, bg=self.theme["frame_color"], pady=2)
+        frame.pack(fill=tk.X)
+
+        criteria_box = ttk.Combobox(
+            frame, values=list(SEARCH_FIELDS), width=15, state="readonly"
+        )
+        if criteria in SEARCH_FIELDS:
+            criteria_box.set(criteria)
+        else:
+            criteria_box.current(0)
+        criteria_box.pack(side=tk.LEFT, padx=5)
+
+        entry = tk.Entry(frame, width=30, bg="#ECF0F1", fg="black", borderwidth=2)
+        entry.insert(0, term)
+        entry.pack(side=tk.LEFT, padx=5)
+        entry.bind("<Return>", lambda event: self.apply())
+        entry.focus_set()
+
+        row = (frame, criteria_box, entry)
+        tk.Button(
+            frame,
+            text="Remove",
+            font=("Arial", 9),
+            bg=self.theme["error_color"],
+            fg="white",
+            command=lambda: self.remove_row(row),
+        ).pack(side=tk.LEFT, padx=5)
+        self.rows.append(row)
+
+    def remove_row(self, row):
+        row[0].destroy()
+        self.rows.remove(row)
+        if not self.rows:
+            self.add_row()
+
+    def predicates(self):
+        """``(criteria, term)`` of every row with a term."""
+        predicates = []
+        for _, criteria_box, entry in self.rows:
+            term = entry.get().strip()
+            if term:
+                predicates.append((criteria_box.get(), term))
+        return predicates
+
+    def apply(self):
+        predicates = self.predicates()
+        try:
+            compile_predicates(predicates, self.backend)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e), parent=self.window)
+            return
+        self.on_apply(predicates)
+
+    def clear(self):
+        for row in list(self.rows):
+            row[0].destroy()
+        self.rows = []
+        self.add_row()
+        self.on_apply([])
+
+    def lift(self):
+        self.window.deiconify()
+        self.window.lift()
+
+    def exists(self):
+        return bool(self.window.winfo_exists())
+
+    def close(self):
+        self.window.destroy()
@@ -1,18 +1,27 @@
 # ===== STUDENT FORM ===== #
 import tkinter as tk
 from tkinter import ttk
-from tkcalendar import DateEntry
 from datetime import datetime
 from constants import THEME
+from models.pagination import STUDENT_COLUMNS
+from models.students import add_student, delete_student, update_student
+
+# How often the write-behind status line is refreshed
+JOURNAL_STATUS_MS = 500
 
 
 class StudentForm:
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, executor, journal=None):
         self.parent = parent
         self.db_manager = db_manager
+        self.executor = executor
+        # With a WriteJournal, saves are journalled locally and flushed later
+        self.journal = journal
         self.theme = THEME
         self.entries = {}
         self.create_form()
+        if journal is not None:
+            self.create_journal_status()
 
     def create_form(self):
         form_frame = tk.Frame(self.parent, bg=self.theme["frame_color"])
@@ -51,14 +60,11 @@ class StudentForm:
             ).pack(side=tk.LEFT)
 
             if field == "D.O.B":
-                entry = DateEntry(
-                    field_frame,
-                    width=27,
-                    background="#1A5276",
-                    foreground="white",
-                    borderwidth=2,
-                    date_pattern="yyyy-mm-dd",
+                # Placeholder until the calendar widget is built after first paint
+                entry = tk.Entry(
+                    field_frame, width=30, bg="#ECF0F1", fg="black", borderwidth=2
                 )
+                self.parent.after_idle(self.create_date_entry, field_frame, entry)
             elif field == "Hostelite":
                 entry = ttk.Combobox(
                     field_frame, values=["Yes", "No"], width=27, state="readonly"
@@ -92,6 +98,92 @@ class StudentForm:
                 command=command,
             ).pack(side=tk.LEFT, padx=5, pady=5)
 
+    def create_journal_status(self):
+        self.journal_label = tk.Label(
+            self.parent,
+            text="",
+            font=("Arial", 9),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+            anchor="w",
+            justify=tk.LEFT,
+            wraplength=380,
+        )
+        self.journal_label.pack(fill=tk.X, padx=5)
+        self.update_journal_status()
+
+    def update_journal_status(self):
+        """Show queue depth and lag, and report writes the database refused."""
+        self.parent.after(JOURNAL_STATUS_MS, self.update_journal_status)
+        status = self.journal.status()
+        text = f"Write-behind: {status['pending']} pending"
+        if status["pending"]:
+            text += f", oldest {status['lag_seconds']:.1f} s"
+        if status["last_error"]:
+            text += f"\nDatabase unavailable, retrying: {status['last_error']}"
+        self.journal_label.config(
+            text=text,
+            fg=self.theme["warning_color" if status["last_error"] else "text_color"],
+        )
+
+        conflicts = self.journal.take_conflicts()
+        if conflicts:
+            for conflict in conflicts:
+                self.resync(conflict.entry.key)
+            lines = "\n".join(str(conflict) for conflict in conflicts[:10])
+            self.parent.after_idle(
+                tk.messagebox.showerror,
+                "Write-behind",
+                f"{len(conflicts)} saved change(s) could not be applied:\n{lines}",
+            )
+
+    def resync(self, reg_no):
+        """Replace what the table shows for ``reg_no`` with the stored row."""
+
+        def on_done(record):
+            if record is None:
+                self.notify_change("delete", reg_no)
+            else:
+                self.notify_change("update", record)
+
+        self.executor.submit(
+            lambda db: db.fetch_one(
+                f"SELECT {STUDENT_COLUMNS} FROM students WHERE RegistrationNo = %s",
+                (reg_no,),
+                cached=False,
+                primary=True,
+            ),
+            on_success=on_done,
+            quiet=True,
+            label="journal_resync",
+        )
+
+    def journal_write(self, op, record, on_done, message):
+        """Journal a write; the form treats it as done once it is on disk."""
+        try:
+            self.journal.append(op, record)
+        except OSError as e:
+            tk.messagebox.showerror("Error", f"Could not save to the journal: {e}")
+            return
+        on_done()
+        self.show_later("Success", message)
+
+    def create_date_entry(self, frame, placeholder):
+        # tkcalendar pulls in babel, which is slow to import; keep it off startup
+        from tkcalendar import DateEntry
+
+        entry = DateEntry(
+            frame,
+            width=27,
+            background="#1A5276",
+            foreground="white",
+            borderwidth=2,
+            date_pattern="yyyy-mm-dd",
+        )
+        placeholder.destroy()
+        entry.pack(side=tk.LEFT, padx=5)
+        self.entries["D.O.B"] = entry
+
     def add_student(self):
         try:
             reg_no = self.entries["Registration#"].get().strip()
@@ -107,30 +199,31 @@ class StudentForm:
                 )
                 return
 
-            check_query = (
-                "SELECT RegistrationNo FROM students WHERE RegistrationNo = %s"
-            )
-            existing = self.db_manager.fetch_one(check_query, (reg_no,))
-            if existing:
-                tk.messagebox.showerror(
-                    "Error", f"Registration# {reg_no} already exists!"
-                )
-                return
-
             dob_formatted = datetime.strptime(dob, "%Y-%m-%d").date() if dob else None
             data = (reg_no, name, email, contact, dob_formatted, hostelite)
 
-            query = """
-                INSERT INTO students 
-                (RegistrationNo, Name, Email, Contact, DOB, Hostelite) 
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """
-            success = self.db_manager.execute_query(query, data)
+            if self.journal is not None:
+                # Duplicates are only detected when the journal is flushed
+                self.journal_write(
+                    "add",
+                    data,
+                    lambda: self.notify_change("add", data),
+                    "Student record saved; it will be added shortly.",
+                )
+                return
 
-            if success:
-                tk.messagebox.showinfo("Success", "Student record added successfully!")
-            else:
-                tk.messagebox.showerror("Error", "Failed to add student record.")
+            def on_done(outcome):
+                if outcome == "exists":
+                    tk.messagebox.showerror(
+                        "Error", f"Registration# {reg_no} already exists!"
+                    )
+                elif outcome == "added":
+                    self.notify_change("add", data)
+                    self.show_later("Success", "Student record added successfully!")
+                else:
+                    tk.messagebox.showerror("Error", "Failed to add student record.")
+
+            self.submit_write(lambda db: add_student(db, data), on_done, "add_student")
         except ValueError as ve:
             tk.messagebox.showerror("Error", f"Invalid date format: {ve}")
         except Exception as e:
@@ -157,20 +250,29 @@ class StudentForm:
 
             dob_formatted = datetime.strptime(dob, "%Y-%m-%d").date() if dob else None
 
-            query = """
-                UPDATE students 
-                SET Name = %s, Email = %s, Contact = %s, DOB = %s, Hostelite = %s
-                WHERE RegistrationNo = %s
-            """
-            data = (name, email, contact, dob_formatted, hostelite, reg_no)
-            success = self.db_manager.execute_query(query, data)
+            record = (reg_no, name, email, contact, dob_formatted, hostelite)
 
-            if success:
-                tk.messagebox.showinfo(
-                    "Success", "Student record updated successfully!"
+            if self.journal is not None:
+                self.journal_write(
+                    "update",
+                    record,
+                    lambda: self.notify_change("update", record),
+                    "Student record saved; it will be updated shortly.",
                 )
-            else:
-                tk.messagebox.showerror("Error", "Failed to update student record.")
+                return
+
+            def on_done(success):
+                if success:
+                    self.notify_change("update", record)
+                    self.show_later("Success", "Student record updated successfully!")
+                else:
+                    tk.messagebox.showerror(
+                        "Error", "Failed to update student record."
+                    )
+
+            self.submit_write(
+                lambda db: update_student(db, record), on_done, "update_student"
+            )
         except ValueError as ve:
             tk.messagebox.showerror("Error", f"Invalid date format: {ve}")
         except Exception as e:
@@ -187,13 +289,48 @@ class StudentForm:
         ):
             return
 
-        query = "DELETE FROM students WHERE RegistrationNo = %s"
-        success = self.db_manager.execute_query(query, (reg_no,))
+        if self.journal is not None:
+            self.journal_write(
+                "delete",
+                reg_no,
+                lambda: self.notify_change("delete", reg_no),
+                "Student record will be deleted shortly.",
+            )
+            return
+
+        def on_done(success):
+            if success:
+                self.notify_change("delete", reg_no)
+                self.show_later("Success", "Student record deleted successfully!")
+            else:
+                tk.messagebox.showerror("Error", "Failed to delete student record.")
+
+        self.submit_write(
+            lambda db: delete_student(db, reg_no), on_done, "delete_student"
+        )
+
+    def submit_write(self, work, on_done, label=None):
+        """Run a form write in the background; writes are never cancelled."""
+        self.executor.submit(
+            work,
+            on_success=on_done,
+            on_error=lambda e: tk.messagebox.showerror(
+                "Error", f"An error occurred: {e}"
+            ),
+            cancellable=False,
+            label=label,
+        )
+
+    def show_later(self, title, message):
+        # After the table is patched, and outside the write's measured render time
+        self.parent.after_idle(tk.messagebox.showinfo, title, message)
+
+    def set_change_callback(self, callback):
+        self.change_callback = callback
 
-        if success:
-            tk.messagebox.showinfo("Success", "Student record deleted successfully!")
-        else:
-            tk.messagebox.showerror("Error", "Failed to delete student record.")
+    def notify_change(self, action, record):
+        if hasattr(self, "change_callback"):
+            self.change_callback(action, record)
 
     def clear_form(self):
         for field, entry in self.entries.items():
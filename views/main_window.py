@@ -1,9 +1,13 @@
 # ===== MAIN WINDOW ===== #
 
 import tkinter as tk
+from tkinter import messagebox
 from datetime import datetime
 from views.form import StudentForm
 from views.table import StudentTableView
+from models.executor import QueryExecutor
+from models.journal import open_journal
+from models.schema import ensure_schema
 from constants import THEME
 
 
@@ -11,10 +15,13 @@ class StudentManagementSystem:
     def __init__(self, root, db_manager):
         self.root = root
         self.db_manager = db_manager
+        self.executor = QueryExecutor(root, db_manager)
+        self.journal = self.open_journal()
         self.theme = THEME
         self.setup_window()
         self.create_widgets()
         self.link_components()
+        self.connect()
 
     def setup_window(self):
         self.root.title("Student Management System")
@@ -50,11 +57,54 @@ class StudentManagementSystem:
             side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10, pady=10
         )
 
-        self.form = StudentForm(self.left_frame, self.db_manager)
-        self.table = StudentTableView(self.right_frame, self.db_manager)
+        self.form = StudentForm(
+            self.left_frame, self.db_manager, self.executor, self.journal
+        )
+        self.table = StudentTableView(
+            self.right_frame, self.db_manager, self.executor
+        )
 
     def link_components(self):
         self.table.set_form_callback(self.form_callback)
+        self.form.set_change_callback(self.table.apply_change)
+
+    def open_journal(self):
+        try:
+            return open_journal(self.db_manager)
+        except OSError as e:
+            messagebox.showerror(
+                "Error",
+                f"Could not open the write-behind journal: {e}\n"
+                "Saves will go straight to the database.",
+            )
+            return None
+
+    def connect(self):
+        """Connect and check the schema in the background; the window is already up."""
+        self.table.count_label.config(text="Connecting...")
+        self.executor.submit_startup(
+            ensure_schema, on_success=self.on_connected, on_error=self.on_connect_failed
+        )
+
+    def on_connected(self, schema_ok):
+        if not schema_ok:
+            messagebox.showerror(
+                "Error", "Could not create or update the database tables."
+            )
+        if self.journal is not None:
+            self.journal.start()
+        self.table.refresh_table()
+
+    def on_connect_failed(self, error):
+        if self.journal is not None:
+            # Keeps retrying, so journalled saves go in once the database is back
+            self.journal.start()
+        self.table.count_label.config(text="Not connected")
+        messagebox.showerror(
+            "Error",
+            f"Could not connect to the database: {error}\n"
+            "Use Configure DB to check the settings.",
+        )
 
     def form_callback(self, values):
         fields = [
@@ -0,0 +1,67 @@
+# ===== PROGRESS DIALOG ===== #
+
+import threading
+import tkinter as tk
+from constants import THEME
+
+
+class ProgressDialog:
+    """Small window showing a row counter for a background job, with Cancel.
+
+    The worker only assigns ``count`` and reads ``cancel_event``; the dialog
+    redraws itself from the Tk thread on a timer, so no Tk call ever happens
+    off the mainloop.
+    """
+
+    REFRESH_MS = 200
+
+    def __init__(self, parent, title, verb):
+        self.theme = THEME
+        self.verb = verb
+        self.count = 0
+        self.cancel_event = threading.Event()
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("320x120")
+        self.window.resizable(False, False)
+        self.window.configure(bg=self.theme["frame_color"])
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.label = tk.Label(
+            self.window,
+            text=f"{self.verb} 0 rows...",
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+        )
+        self.label.pack(pady=20)
+
+        self.cancel_button = tk.Button(
+            self.window,
+            text="Cancel",
+            font=("Arial", 10, "bold"),
+            width=10,
+            bg=self.theme["error_color"],
+            fg="white",
+            command=self.cancel,
+        )
+        self.cancel_button.pack()
+
+        self._refresh_id = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def progress(self, count):
+        """Record progress; safe to call from a worker thread."""
+        self.count = count
+
+    def refresh(self):
+        self.label.config(text=f"{self.verb} {self.count:,} rows...")
+        self._refresh_id = self.window.after(self.REFRESH_MS, self.refresh)
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.cancel_button.config(state=tk.DISABLED, text="Cancelling...")
+
+    def close(self):
+        self.window.after_cancel(self._refresh_id)
+        self.window.destroy()
@@ -0,0 +1,190 @@
+# ===== STATISTICS VIEW ===== #
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+from constants import THEME, CHANGE_POLL_MS
+from models.statistics import (
+    DIMENSION_TITLES,
+    age_bands,
+    fetch_statistics,
+    rebuild_statistics,
+    verify_statistics,
+)
+
+
+class StatisticsDialog:
+    """Student counts per hostel status, age band, birth year and email domain.
+
+    Everything is read from the student_stats summary table, so opening or
+    refreshing the view costs a few dozen rows however large students is.
+    """
+
+    # (key, title) of each panel; "age_band" is derived from the birth years
+    PANELS = (
+        ("hostelite", DIMENSION_TITLES["hostelite"]),
+        ("age_band", "Age Band"),
+        ("birth_year", DIMENSION_TITLES["birth_year"]),
+        ("email_domain", DIMENSION_TITLES["email_domain"]),
+    )
+
+    def __init__(self, parent, db_manager, executor):
+        self.theme = THEME
+        self.db_manager = db_manager
+        self.executor = executor
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Statistics")
+        self.window.geometry("900x420")
+        self.window.configure(bg=self.theme["frame_color"])
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.summary = tk.Label(
+            self.window,
+            text="Loading...",
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["frame_color"],
+            anchor="w",
+        )
+        self.summary.pack(fill=tk.X, padx=10, pady=5)
+
+        panels_frame = tk.Frame(self.window, bg=self.theme["frame_color"])
+        panels_frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        self.trees = {}
+        for column, (key, title) in enumerate(self.PANELS):
+            panels_frame.columnconfigure(column, weight=1)
+            panels_frame.rowconfigure(1, weight=1)
+            tk.Label(
+                panels_frame,
+                text=title,
+                font=("Arial", 10, "bold"),
+                fg=self.theme["text_color"],
+                bg=self.theme["frame_color"],
+            ).grid(row=0, column=column, sticky="w", padx=5)
+            tree = ttk.Treeview(
+                panels_frame, columns=("bucket", "students", "share"), show="headings"
+            )
+            for name, heading, width, anchor in (
+                ("bucket", title, 100, tk.W),
+                ("students", "Students", 70, tk.E),
+                ("share", "%", 50, tk.E),
+            ):
+                tree.heading(name, text=heading)
+                tree.column(name, width=width, anchor=anchor)
+            tree.grid(row=1, column=column, sticky="nsew", padx=5)
+            self.trees[key] = tree
+
+        button_frame = tk.Frame(self.window, bg=self.theme["frame_color"], pady=10)
+        button_frame.pack(fill=tk.X)
+        buttons = [
+            ("Refresh", self.refresh, self.theme["info_color"]),
+            ("Verify", self.verify, self.theme["success_color"]),
+            ("Rebuild", self.rebuild, self.theme["warning_color"]),
+            ("Close", self.close, self.theme["error_color"]),
+        ]
+        for text, command, color in buttons:
+            tk.Button(
+                button_frame,
+                text=text,
+                font=("Arial", 10, "bold"),
+                width=10,
+                bg=color,
+                fg="white",
+                command=command,
+            ).pack(side=tk.LEFT, padx=10)
+
+        self._refresh_id = None
+        self.refresh()
+
+    def refresh(self, quiet=False):
+        if self._refresh_id is not None:
+            self.window.after_cancel(self._refresh_id)
+        self._refresh_id = self.window.after(
+            CHANGE_POLL_MS, lambda: self.refresh(quiet=True)
+        )
+        self.executor.submit(
+            fetch_statistics,
+            on_success=self.show,
+            on_error=lambda e: print(f"Error loading statistics: {e}"),
+            channel="statistics",
+            quiet=quiet,
+            label="statistics",
+        )
+
+    def show(self, statistics):
+        if not self.window.winfo_exists():
+            return
+        total = sum(students for _, students in statistics["hostelite"])
+        statistics = dict(statistics, age_band=age_bands(statistics["birth_year"]))
+        for key, tree in self.trees.items():
+            rows = statistics[key]
+            if key == "email_domain":
+                rows = sorted(rows, key=lambda row: -row[1])
+            tree.delete(*tree.get_children())
+            for bucket, students in rows:
+                share = f"{100 * students / total:.1f}" if total else ""
+                tree.insert(
+                    "", tk.END, values=(bucket or "(none)", f"{students:,}", share)
+                )
+        self.summary.config(text=f"{total:,} students")
+
+    def verify(self):
+        def on_done(mismatches):
+            if mismatches is None:
+                messagebox.showerror(
+                    "Error", "Could not verify statistics", parent=self.window
+                )
+            elif not mismatches:
+                messagebox.showinfo(
+                    "Verify",
+                    "Summary tables match a full GROUP BY over students",
+                    parent=self.window,
+                )
+            else:
+                lines = [
+                    f"{DIMENSION_TITLES.get(d, d)} {b or '(none)'}: {have} "
+                    f"stored, {want} actual"
+                    for d, b, have, want in mismatches[:10]
+                ]
+                if messagebox.askyesno(
+                    "Verify",
+                    f"{len(mismatches)} buckets differ:\n"
+                    + "\n".join(lines)
+                    + "\n\nRebuild the summary tables now?",
+                    icon="warning",
+                    parent=self.window,
+                ):
+                    self.rebuild()
+
+        self.executor.submit(
+            verify_statistics,
+            on_success=on_done,
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"Could not verify statistics: {e}", parent=self.window
+            ),
+            label="verify_statistics",
+        )
+
+    def rebuild(self):
+        def on_done(success):
+            if not success:
+                messagebox.showerror(
+                    "Error", "Failed to rebuild statistics", parent=self.window
+                )
+            self.refresh()
+
+        self.executor.submit(
+            rebuild_statistics,
+            on_success=on_done,
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"Failed to rebuild statistics: {e}", parent=self.window
+            ),
+            cancellable=False,
+            label="rebuild_statistics",
+        )
+
+    def close(self):
+        if self._refresh_id is not None:
+            self.window.after_cancel(self._refresh_id)
+        self.executor.cancel("statistics", kill=False)
+        self.window.destroy()
@@ -1,19 +1,79 @@
 # ===== Table View To Display Student Records ===== #
 
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime
-from constants import THEME
+from constants import (
+    THEME,
+    PAGE_SIZE,
+    WINDOW_PAGES,
+    PREFETCH_THRESHOLD,
+    SEARCH_DEBOUNCE_MS,
+    CHANGE_POLL_MS,
+    CHANGE_OVERLAP_SECONDS,
+)
+from models.csv_io import export_students, import_students, OperationCancelled
+from models.filters import FilterPlanner, compile_predicates
+from models.fuzzy import FUZZY_FIELDS, TrigramIndex, fuzzy_pager
+from models.pagination import KeysetPager, format_sort_order, parse_sort_order
+from models.metrics import Span
+from models.schema import TRUNCATE_MARKER
+from models.search import (
+    AGE,
+    AGE_BANDS,
+    RANGE,
+    RANGE_SEPARATOR,
+    SEARCH_FIELDS,
+    build_search,
+    can_refine,
+    matches_locally,
+    search_matcher,
+    search_order,
+)
+from views.diagnostics import DiagnosticsDialog
+from views.filters import FilterDialog
+from views.progress import ProgressDialog
+from views.statistics import StatisticsDialog
+
+# Treeview column -> (heading, students column it sorts by)
+TABLE_COLUMNS = {
+    "reg_no": ("Registration#", "RegistrationNo"),
+    "name": ("Name", "Name"),
+    "email": ("Email", "Email"),
+    "contact": ("Contact#", "Contact"),
+    "dob": ("D.O.B", "DOB"),
+    "hostelite": ("Hostelite", "Hostelite"),
+}
 
 
 class StudentTableView:
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager, executor):
         self.parent = parent
         self.db_manager = db_manager
+        self.executor = executor
         self.theme = THEME
+        self.pager = None
+        self.total_rows = 0
+        self.window_offset = 0
+        self.at_end = True
+        self.page_task = None
+        self.search_cache = None
+        self._debounce_id = None
+        # Built on the first fuzzy search, then patched by apply_change()
+        self.fuzzy_index = TrigramIndex()
+        # Compound filter on screen, as (criteria, term) pairs, and its plans
+        self.active_filter = None
+        self.filter_planner = FilterPlanner()
+        self.filter_dialog = None
+        self.watermark = None
+        self.changes_task = None
+        self.sort_order = parse_sort_order(
+            db_manager.config.get("TABLE", "sort_order", fallback="")
+        )
         self.create_search_controls()
         self.create_table_view()
         self.create_controls()
+        self.tree.after(CHANGE_POLL_MS, self.poll_changes)
 
     def create_search_controls(self):
         search_frame = tk.Frame(self.parent, bg=self.theme["bg_color"], pady=10)
@@ -29,21 +89,52 @@ class StudentTableView:
 
         self.search_criteria = ttk.Combobox(
             search_frame,
-            values=["Registration#", "Name", "Email", "Contact#", "D.O.B"],
+            values=list(SEARCH_FIELDS),
             width=15,
             state="readonly",
         )
         self.search_criteria.pack(side=tk.LEFT, padx=5)
         self.search_criteria.current(0)
+        self.search_criteria.bind(
+            "<<ComboboxSelected>>", lambda event: self.on_criteria_changed()
+        )
+
+        # Holds the input the selected criteria takes: text, age band or dates
+        self.term_frame = tk.Frame(search_frame, bg=self.theme["bg_color"])
+        self.term_frame.pack(side=tk.LEFT, padx=5)
 
         self.search_entry = tk.Entry(
-            search_frame, width=25, bg="#ECF0F1", fg="black", borderwidth=2
+            self.term_frame, width=25, bg="#ECF0F1", fg="black", borderwidth=2
         )
-        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.pack(side=tk.LEFT)
         self.search_entry.bind("<Return>", lambda event: self.search_records())
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
+
+        self.age_band = ttk.Combobox(self.term_frame, values=AGE_BANDS, width=23)
+        self.age_band.bind("<<ComboboxSelected>>", lambda event: self.search_records())
+        self.age_band.bind("<Return>", lambda event: self.search_records())
+        self.age_band.bind("<KeyRelease>", self.on_search_key)
+
+        # From/To date pickers, created the first time D.O.B Range is chosen
+        self.range_frame = None
+        self.dob_from = self.dob_to = None
+
+        self.fuzzy = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            search_frame,
+            text="Fuzzy",
+            variable=self.fuzzy,
+            command=self.schedule_search,
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["bg_color"],
+            selectcolor=self.theme["frame_color"],
+            activebackground=self.theme["bg_color"],
+        ).pack(side=tk.LEFT, padx=5)
 
         buttons = [
             ("Search", self.search_records, self.theme["button_color"]),
+            ("Filter", self.open_filter, self.theme["other_color"]),
             ("Show All", self.refresh_table, self.theme["success_color"]),
             ("Clear Table", self.clear_table, self.theme["error_color"]),
         ]
@@ -64,21 +155,21 @@ class StudentTableView:
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
         x_scroll = ttk.Scrollbar(tree_frame, orient=tk.HORIZONTAL)
-        y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        self.y_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
         x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
-        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
         self.tree = ttk.Treeview(
             tree_frame,
             columns=("reg_no", "name", "email", "contact", "dob", "hostelite"),
             show="headings",
             xscrollcommand=x_scroll.set,
-            yscrollcommand=y_scroll.set,
+            yscrollcommand=self.on_tree_scroll,
             selectmode="browse",
         )
 
         x_scroll.config(command=self.tree.xview)
-        y_scroll.config(command=self.tree.yview)
+        self.y_scroll.config(command=self.tree.yview)
 
         columns = [
             ("reg_no", "Registration#", 100, tk.CENTER),
@@ -90,8 +181,11 @@ class StudentTableView:
         ]
 
         for col_id, heading, width, anchor in columns:
-            self.tree.heading(col_id, text=heading)
+            self.tree.heading(
+                col_id, text=heading, command=lambda c=col_id: self.sort_by(c)
+            )
             self.tree.column(col_id, width=width, anchor=anchor)
+        self.update_sort_headings()
 
         style = ttk.Style()
         style.configure(
@@ -108,54 +202,288 @@ class StudentTableView:
 
         self.tree.pack(fill=tk.BOTH, expand=True)
         self.tree.bind("<<TreeviewSelect>>", self.on_tree_select)
+        self.tree.bind("<Shift-Button-1>", self.on_heading_shift_click)
+
+    def on_heading_shift_click(self, event):
+        """Shift-click on a heading adds that column to the sort."""
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        column = self.tree.column(self.tree.identify_column(event.x), "id")
+        self.sort_by(column, extend=True)
+        # Keep ttk from treating it as a selection click
+        return "break"
+
+    def sort_by(self, col_id, extend=False):
+        """Sort on the server by a clicked column.
+
+        A plain click sorts by that column alone, or flips its direction if it
+        already is the only sort column; shift-click appends it as the next
+        tie-breaker, or flips it if it is already part of the sort.
+        """
+        column = TABLE_COLUMNS[col_id][1]
+        order = list(self.sort_order)
+        directions = dict(order)
+        if extend and column in directions:
+            order = [(c, not d if c == column else d) for c, d in order]
+        elif extend:
+            order.append((column, False))
+        elif len(order) == 1 and column in directions:
+            order = [(column, not directions[column])]
+        else:
+            order = [(column, False)]
+
+        self.sort_order = tuple(order)
+        self.update_sort_headings()
+        self.save_sort_order()
+        # Cached rows are in the old order
+        self.search_cache = None
+        if self.active_filter:
+            self.apply_filter(self.active_filter)
+        elif self.search_term():
+            self.search_records()
+        else:
+            self.refresh_table()
+
+    def update_sort_headings(self):
+        """Show the direction (and priority, for multi-column sorts) in headings."""
+        priorities = {column: i for i, (column, _) in enumerate(self.sort_order, 1)}
+        directions = dict(self.sort_order)
+        for col_id, (heading, column) in TABLE_COLUMNS.items():
+            if column in directions:
+                heading += " \u25bc" if directions[column] else " \u25b2"
+                if len(self.sort_order) > 1:
+                    heading += str(priorities[column])
+            self.tree.heading(col_id, text=heading)
+
+    def save_sort_order(self):
+        """Persist the sort order in the config file for the next session."""
+        config = self.db_manager.config
+        if not config.has_section("TABLE"):
+            config.add_section("TABLE")
+        config["TABLE"]["sort_order"] = format_sort_order(self.sort_order)
+        try:
+            with open(self.db_manager.config_file, "w") as configfile:
+                config.write(configfile)
+        except OSError as e:
+            print(f"Error saving sort order: {e}")
+
+    def on_criteria_changed(self):
+        """Show the input the selected criteria takes, then search with it."""
+        strategy = SEARCH_FIELDS[self.search_criteria.get()].strategy
+        for widget in self.term_frame.winfo_children():
+            widget.pack_forget()
+        if strategy == RANGE:
+            if self.range_frame is None:
+                self.create_range_inputs()
+            self.range_frame.pack(side=tk.LEFT)
+            # Both dates start at today; wait until the user picks a range
+            return
+        if strategy == AGE:
+            self.age_band.pack(side=tk.LEFT)
+        else:
+            self.search_entry.pack(side=tk.LEFT)
+        self.schedule_search()
+
+    def create_range_inputs(self):
+        # tkcalendar pulls in babel, which is slow to import; keep it off startup
+        from tkcalendar import DateEntry
+
+        self.range_frame = tk.Frame(self.term_frame, bg=self.theme["bg_color"])
+        entries = []
+        for text in ("From", "To"):
+            tk.Label(
+                self.range_frame,
+                text=text,
+                font=("Arial", 10, "bold"),
+                fg=self.theme["text_color"],
+                bg=self.theme["bg_color"],
+            ).pack(side=tk.LEFT, padx=2)
+            entry = DateEntry(
+                self.range_frame,
+                width=10,
+                background="#1A5276",
+                foreground="white",
+                borderwidth=2,
+                date_pattern="yyyy-mm-dd",
+            )
+            entry.pack(side=tk.LEFT, padx=2)
+            entry.bind("<<DateEntrySelected>>", lambda event: self.search_records())
+            entry.bind("<Return>", lambda event: self.search_records())
+            entries.append(entry)
+        self.dob_from, self.dob_to = entries
+
+    def search_term(self):
+        """The search input of the selected criteria, as build_search() takes it."""
+        strategy = SEARCH_FIELDS[self.search_criteria.get()].strategy
+        if strategy == RANGE:
+            if self.dob_from is None:
+                return ""
+            return f"{self.dob_from.get()}{RANGE_SEPARATOR}{self.dob_to.get()}"
+        if strategy == AGE:
+            return self.age_band.get().strip()
+        return self.search_entry.get().strip()
 
     def search_records(self):
+        self.cancel_scheduled_search()
+        self.active_filter = None
         criteria = self.search_criteria.get()
-        search_term = self.search_entry.get().strip()
+        search_term = self.search_term()
 
         if not search_term:
             self.refresh_table()
             return
 
-        criteria_map = {
-            "Registration#": "RegistrationNo",
-            "Name": "Name",
-            "Email": "Email",
-            "Contact#": "Contact",
-            "D.O.B": "DOB",
-        }
+        if self.fuzzy_mode(criteria):
+            self.fuzzy_search(
+                criteria, search_term, empty_message="No similar records found"
+            )
+            return
 
-        db_column = criteria_map.get(criteria)
-        if not db_column:
+        try:
+            where, params = build_search(
+                criteria, search_term, self.db_manager.backend
+            )
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
 
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        pager = KeysetPager(
+            where,
+            params,
+            matcher=search_matcher(criteria, search_term),
+            order=search_order(criteria, self.sort_order),
+        )
+        self.load_pager(
+            pager,
+            label="search_records",
+            empty_message="No matching records found",
+            on_loaded=lambda records: self.remember_search(
+                criteria, search_term, records
+            ),
+        )
 
-        if criteria == "D.O.B":
-            try:
-                search_date = datetime.strptime(search_term, "%Y-%m-%d").date()
-                query = f"SELECT * FROM students WHERE {db_column} = %s"
-                params = (search_date,)
-            except ValueError:
-                messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD")
-                return
-        else:
-            query = f"SELECT * FROM students WHERE {db_column} LIKE %s"
-            params = (f"%{search_term}%",)
+    def on_search_key(self, event):
+        if event.keysym in ("Return", "KP_Enter"):
+            return
+        self.schedule_search()
 
-        records = self.db_manager.fetch_all(query, params)
+    def schedule_search(self):
+        """Debounce: restart the timer on every keystroke."""
+        self.cancel_scheduled_search()
+        self._debounce_id = self.search_entry.after(
+            SEARCH_DEBOUNCE_MS, self.incremental_search
+        )
 
-        if records:
-            for record in records:
-                dob = record[4].strftime("%Y-%m-%d") if record[4] else ""
-                self.tree.insert(
-                    "",
-                    tk.END,
-                    values=(record[0], record[1], record[2], record[3], dob, record[5]),
-                )
+    def cancel_scheduled_search(self):
+        if self._debounce_id is not None:
+            self.search_entry.after_cancel(self._debounce_id)
+            self._debounce_id = None
+
+    def incremental_search(self):
+        """Search-as-you-type, answered locally whenever the last result can."""
+        self._debounce_id = None
+        criteria = self.search_criteria.get()
+        search_term = self.search_term()
+
+        cache = self.search_cache
+        if cache and (cache["criteria"], cache["term"]) == (criteria, search_term):
+            return
+        self.active_filter = None
+
+        if not search_term:
+            self.search_cache = None
+            self.refresh_table()
+            return
+
+        if self.fuzzy_mode(criteria):
+            self.fuzzy_search(criteria, search_term, label="incremental_fuzzy_search")
+            return
+
+        try:
+            where, params = build_search(
+                criteria, search_term, self.db_manager.backend
+            )
+        except ValueError:
+            # Half-typed dates are expected here; wait for more input
+            return
+
+        pager = KeysetPager(
+            where,
+            params,
+            matcher=search_matcher(criteria, search_term),
+            order=search_order(criteria, self.sort_order),
+        )
+        if (
+            cache
+            and cache["criteria"] == criteria
+            and can_refine(criteria, cache["term"], search_term)
+        ):
+            with Span(self.db_manager.metrics, "incremental_search.local"):
+                records = [
+                    record
+                    for record in cache["rows"]
+                    if matches_locally(criteria, search_term, record)
+                ]
+                # Drop whatever the server was still working on for an older term
+                self.executor.cancel("table", kill=False)
+                self.executor.cancel("page", kill=False)
+                self.show_first_page(pager, len(records), records)
+                self.remember_search(criteria, search_term, records)
+            return
+
+        self.load_pager(
+            pager,
+            label="incremental_search",
+            on_loaded=lambda records: self.remember_search(
+                criteria, search_term, records
+            ),
+        )
+
+    def fuzzy_mode(self, criteria):
+        return self.fuzzy.get() and criteria in FUZZY_FIELDS
+
+    def fuzzy_search(
+        self, criteria, search_term, label="fuzzy_search", empty_message=None
+    ):
+        """Show the closest Name/Email matches, best first, from the trigram index.
+
+        The first fuzzy search builds the index from the whole table in the
+        background; later ones catch it up from the change feed and only look
+        up the matched rows by key.
+        """
+        self.search_cache = None
+        index = self.fuzzy_index
+
+        def work(db):
+            index.ensure_current(db)
+            watermark = db.change_watermark()
+            keys = [key for key, _ in index.search(criteria, search_term)]
+            pager = fuzzy_pager(keys)
+            rank = {key: position for position, key in enumerate(keys)}
+            records = pager.fetch_after(db) if keys else []
+            records.sort(key=lambda record: rank[str(record[0])])
+            return watermark, pager, records
+
+        def show(result):
+            watermark, pager, records = result
+            self.watermark = watermark
+            self.show_first_page(pager, len(records), records)
+            if not records and empty_message:
+                self.tree.after_idle(messagebox.showinfo, "Info", empty_message)
+
+        self.executor.cancel("page")
+        self.executor.submit(work, on_success=show, channel="table", label=label)
+
+    def remember_search(self, criteria, search_term, records):
+        """Keep a result set for local refinement if it is complete."""
+        if self.at_end and self.window_offset == 0:
+            self.search_cache = {
+                "criteria": criteria,
+                "term": search_term,
+                "rows": list(records),
+            }
         else:
-            messagebox.showinfo("Info", "No matching records found")
+            self.search_cache = None
 
     def clear_table(self):
         if not messagebox.askyesno(
@@ -165,15 +493,33 @@ class StudentTableView:
         ):
             return
 
-        try:
-            success = self.db_manager.execute_query("TRUNCATE TABLE students")
+        def work(db):
+            if not db.execute_query("TRUNCATE TABLE students"):
+                return False
+            # TRUNCATE skips the statistics triggers as well
+            if not db.execute_query("TRUNCATE TABLE student_stats"):
+                return False
+            # TRUNCATE fires no delete triggers; tell other clients to reload
+            return db.execute_query(
+                "REPLACE INTO student_tombstones (RegistrationNo) VALUES (%s)",
+                (TRUNCATE_MARKER,),
+            )
+
+        def on_done(success):
+            self.fuzzy_index.clear()
+            self.filter_planner.clear()
             if success:
                 messagebox.showinfo("Success", "All records have been deleted")
                 self.refresh_table()
             else:
                 messagebox.showerror("Error", "Failed to clear the table")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+        self.executor.submit(
+            work,
+            on_success=on_done,
+            on_error=lambda e: messagebox.showerror("Error", f"An error occurred: {e}"),
+            cancellable=False,
+        )
 
     def on_tree_select(self, event):
         selected_item = self.tree.selection()
@@ -190,7 +536,10 @@ class StudentTableView:
         buttons = [
             ("Refresh", self.refresh_table, self.theme["info_color"]),
             ("Export CSV", self.export_to_csv, self.theme["success_color"]),
+            ("Import CSV", self.import_from_csv, self.theme["other_color"]),
             ("Configure DB", self.configure_database, self.theme["warning_color"]),
+            ("Statistics", self.show_statistics, self.theme["other_color"]),
+            ("Diagnostics", self.show_diagnostics, self.theme["button_color"]),
         ]
 
         for text, command, color in buttons:
@@ -205,30 +554,348 @@ class StudentTableView:
             )
             button.pack(side=tk.LEFT, padx=5)
 
+        self.count_label = tk.Label(
+            control_frame,
+            text="No records",
+            font=("Arial", 10, "bold"),
+            fg=self.theme["text_color"],
+            bg=self.theme["bg_color"],
+        )
+        self.count_label.pack(side=tk.RIGHT, padx=5)
+
+        self.cancel_button = tk.Button(
+            control_frame,
+            text="Cancel",
+            font=("Arial", 10, "bold"),
+            width=8,
+            bg=self.theme["error_color"],
+            fg="white",
+            state=tk.DISABLED,
+            command=self.executor.cancel,
+        )
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+
+        self.busy_bar = ttk.Progressbar(control_frame, mode="indeterminate", length=80)
+        self.busy_bar.pack(side=tk.RIGHT, padx=5)
+        self.executor.add_busy_listener(self.on_busy_changed)
+
+    def on_busy_changed(self, busy):
+        if busy:
+            self.busy_bar.start(15)
+            self.cancel_button.config(state=tk.NORMAL)
+        else:
+            self.busy_bar.stop()
+            self.cancel_button.config(state=tk.DISABLED)
+
     def refresh_table(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.search_cache = None
+        self.active_filter = None
+        self.load_pager(KeysetPager(order=self.sort_order), label="refresh_table")
 
-        query = (
-            "SELECT RegistrationNo, Name, Email, Contact, DOB, Hostelite FROM students"
+    def open_filter(self):
+        if self.filter_dialog is not None and self.filter_dialog.exists():
+            self.filter_dialog.lift()
+            return
+        self.filter_dialog = FilterDialog(
+            self.parent,
+            self.db_manager.backend,
+            self.apply_filter,
+            self.active_filter or (),
         )
-        records = self.db_manager.fetch_all(query)
 
-        if records:
-            for record in records:
-                dob = record[4].strftime("%Y-%m-%d") if record[4] else ""
-                self.tree.insert(
-                    "",
-                    tk.END,
-                    values=(record[0], record[1], record[2], record[3], dob, record[5]),
-                )
+    def apply_filter(self, predicates):
+        """Show the students matching every ``(criteria, term)`` pair.
 
-    def export_to_csv(self):
+        The filter is planned on the worker (see models/filters.py), since
+        choosing the driving index reads the table.
+        """
+        self.cancel_scheduled_search()
+        if not predicates:
+            self.refresh_table()
+            return
         try:
-            query = "SELECT * FROM students"
-            records = self.db_manager.fetch_all(query)
+            compiled = compile_predicates(predicates, self.db_manager.backend)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.search_cache = None
+        self.active_filter = list(predicates)
+        self.load_pager(
+            lambda db: self.filter_planner.pager(db, compiled, self.sort_order),
+            label="apply_filter",
+            empty_message="No matching records found",
+        )
+
+    def load_pager(self, pager, label=None, empty_message=None, on_loaded=None):
+        """Fetch the first page of ``pager`` in the background and show it.
+
+        ``pager`` may also be a function that builds the pager from the
+        DatabaseManager on the worker. ``label`` names the UI action in the
+        latency metrics.
+        """
+
+        def work(db):
+            loaded = pager(db) if callable(pager) else pager
+            # Taken first, so changes made while the page is read are polled again
+            watermark = db.change_watermark()
+            return loaded, watermark, loaded.count(db), loaded.fetch_after(db)
+
+        def show(result):
+            loaded, watermark, total_rows, records = result
+            self.watermark = watermark
+            self.show_first_page(loaded, total_rows, records)
+            if on_loaded:
+                on_loaded(records)
+            if not records and empty_message:
+                # Deferred so the dialog is not counted as render time
+                self.tree.after_idle(messagebox.showinfo, "Info", empty_message)
+
+        # A new result set makes any in-flight page of the old one meaningless
+        self.executor.cancel("page")
+        self.executor.submit(work, on_success=show, channel="table", label=label)
+
+    def show_first_page(self, pager, total_rows, records):
+        self.pager = pager
+        self.total_rows = total_rows
+        self.window_offset = 0
+        self.at_end = len(records) < pager.page_size or len(records) == total_rows
+
+        pager.remember(records)
+        self.reconcile(records)
+        self.tree.yview_moveto(0)
+        self.update_count_label()
 
+    def format_record(self, record):
+        dob = record[4].strftime("%Y-%m-%d") if record[4] else ""
+        return (record[0], record[1], record[2], record[3], dob, record[5])
+
+    def reconcile(self, records):
+        """Make the tree show exactly ``records``, touching only rows that differ.
+
+        Items are keyed by RegistrationNo, so unchanged rows (and the selection)
+        survive a refresh instead of being deleted and re-inserted.
+        """
+        wanted = {str(record[0]) for record in records}
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        for index, record in enumerate(records):
+            self.put_row(record, index)
+
+    def put_row(self, record, index):
+        """Insert or update one keyed row so that it sits at ``index``."""
+        iid = str(record[0])
+        values = self.format_record(record)
+        if not self.tree.exists(iid):
+            self.tree.insert("", index, iid=iid, values=values)
+            return
+        current = tuple(str(v) for v in self.tree.item(iid, "values"))
+        if current != tuple(str(v) for v in values):
+            self.tree.item(iid, values=values)
+        if self.tree.index(iid) != index:
+            self.tree.move(iid, "", index)
+
+    def apply_change(self, action, record):
+        """Patch the single row a form write touched instead of reloading.
+
+        ``record`` is the full student row for "add"/"update" and the
+        registration number for "delete".
+        """
+        self.search_cache = None
+        if action == "delete":
+            self.fuzzy_index.remove(record)
+            if self.tree.exists(record):
+                self.tree.delete(record)
+                self.total_rows = max(self.total_rows - 1, 0)
+            self.update_count_label()
+            return
+
+        self.fuzzy_index.add(record)
+        iid = str(record[0])
+        belongs = self.pager.matches(record) if self.pager else None
+        if self.tree.exists(iid):
+            if belongs is False:
+                self.tree.delete(iid)
+                self.total_rows = max(self.total_rows - 1, 0)
+            else:
+                self.tree.item(iid, values=self.format_record(record))
+                self.reposition(iid, record)
+        elif belongs:
+            index = self.window_position(record)
+            if index is not None:
+                values = self.format_record(record)
+                self.tree.insert("", index, iid=iid, values=values)
+                self.pager.remember([record])
+            self.total_rows += 1
+        self.update_count_label()
+
+    def poll_changes(self):
+        """Apply other clients' edits by reading only what changed."""
+        self.tree.after(CHANGE_POLL_MS, self.poll_changes)
+        if self.watermark is None or self.pager is None:
+            return
+        if self.changes_task and not self.changes_task.done:
+            return
+
+        pager, since = self.pager, self.watermark
+
+        def work(db):
+            changes = db.fetch_changes(since, CHANGE_OVERLAP_SECONDS)
+            if not changes or not (changes[0] or changes[1]):
+                return changes, None
+            return changes, pager.count(db)
+
+        def apply(result):
+            changes, total_rows = result
+            if changes is None or pager is not self.pager:
+                return
+            rows, deleted, self.watermark = changes
+            if not rows and not deleted:
+                return
+            if TRUNCATE_MARKER in deleted:
+                self.load_pager(pager, label="poll_changes")
+                return
+
+            for key in deleted:
+                self.apply_change("delete", key)
+            for record in rows:
+                self.apply_change("update", record)
+            self.total_rows = total_rows
+            self.update_count_label()
+
+        self.changes_task = self.executor.submit(
+            work, on_success=apply, channel="changes", quiet=True, label="poll_changes"
+        )
+
+    def window_position(self, record, keys=None):
+        """Index ``record`` would take in the loaded window, or None if outside it."""
+        if keys is None:
+            keys = self.tree.get_children()
+        index = self.pager.sorted_index(keys, record)
+        if index is None:
+            return None
+        if keys and index == 0 and self.window_offset > 0:
+            return None
+        if keys and index == len(keys) and not self.at_end:
+            return None
+        return index
+
+    def reposition(self, iid, record):
+        """Move an edited row to where the sort order now puts it."""
+        if self.pager is None or self.pager.keyed:
+            # Ordered by the key alone, which an edit cannot change
+            return
+        self.pager.remember([record])
+        keys = [key for key in self.tree.get_children() if key != iid]
+        index = self.pager.sorted_index(keys, record)
+        if index is None:
+            return
+        if keys and index == 0 and self.window_offset > 0:
+            # Sorted into the rows before the window
+            self.tree.delete(iid)
+            self.window_offset += 1
+        elif keys and index == len(keys) and not self.at_end:
+            self.tree.delete(iid)
+        elif self.tree.index(iid) != index:
+            self.tree.move(iid, "", index)
+
+    def on_tree_scroll(self, first, last):
+        """Scrollbar hook that slides the loaded window as the user nears an edge."""
+        self.y_scroll.set(first, last)
+        if self.pager is None or (self.page_task and not self.page_task.done):
+            return
+
+        if float(last) >= PREFETCH_THRESHOLD and not self.at_end:
+            self.load_next_page()
+        elif float(first) <= 1 - PREFETCH_THRESHOLD and self.window_offset > 0:
+            self.load_previous_page()
+
+    def load_next_page(self):
+        pager = self.pager
+        children = self.tree.get_children()
+        last_key = children[-1] if children else None
+
+        def show(records):
+            if pager is not self.pager:
+                return
+            self.at_end = len(records) < pager.page_size
             if not records:
+                return
+
+            top_index = self.top_visible_index(self.tree.get_children())
+            for record in records:
+                self.put_row(record, len(self.tree.get_children()))
+
+            children = self.tree.get_children()
+            excess = len(children) - PAGE_SIZE * WINDOW_PAGES
+            if excess > 0:
+                self.tree.delete(*children[:excess])
+                self.window_offset += excess
+                self.keep_view_at(top_index - excess)
+            self.update_count_label()
+
+        self.submit_page(lambda db: pager.fetch_after(db, last_key), show)
+
+    def load_previous_page(self):
+        pager = self.pager
+        children = self.tree.get_children()
+        if not children:
+            return
+        first_key = children[0]
+
+        def show(records):
+            if pager is not self.pager:
+                return
+            if len(records) < pager.page_size:
+                self.window_offset = 0
+            else:
+                self.window_offset = max(self.window_offset - len(records), 0)
+            if not records:
+                return
+
+            top_index = self.top_visible_index(self.tree.get_children())
+            for index, record in enumerate(records):
+                self.put_row(record, index)
+
+            children = self.tree.get_children()
+            excess = len(children) - PAGE_SIZE * WINDOW_PAGES
+            if excess > 0:
+                self.tree.delete(*children[-excess:])
+                self.at_end = False
+            self.keep_view_at(top_index + len(records))
+            self.update_count_label()
+
+        self.submit_page(lambda db: pager.fetch_before(db, first_key), show)
+
+    def submit_page(self, work, show):
+        self.page_task = self.executor.submit(
+            work,
+            on_success=show,
+            on_error=lambda e: print(f"Error loading page: {e}"),
+            channel="page",
+            label="load_page",
+        )
+
+    def top_visible_index(self, children):
+        return int(round(self.tree.yview()[0] * len(children)))
+
+    def keep_view_at(self, index):
+        total = len(self.tree.get_children())
+        if total:
+            self.tree.yview_moveto(max(index, 0) / total)
+
+    def update_count_label(self):
+        loaded = len(self.tree.get_children())
+        if not loaded:
+            self.count_label.config(text="No records")
+            return
+        first = self.window_offset + 1
+        last = self.window_offset + loaded
+        self.count_label.config(text=f"Rows {first}-{last} of {self.total_rows}")
+
+    def export_to_csv(self):
+        def on_checked(has_rows):
+            if not has_rows:
                 messagebox.showinfo("Info", "No records to export!")
                 return
 
@@ -241,23 +908,122 @@ class StudentTableView:
             if not file_path:
                 return
 
-            with open(file_path, "w") as f:
-                f.write("RegistrationNo,Name,Email,Contact,DOB,Hostelite\n")
+            self.start_export(file_path)
+
+        self.executor.submit(
+            lambda db: db.fetch_one("SELECT 1 FROM students LIMIT 1"),
+            on_success=on_checked,
+            on_error=lambda e: messagebox.showerror(
+                "Error", f"Failed to export records: {e}"
+            ),
+            channel="export",
+        )
+
+    def start_export(self, file_path):
+        dialog = ProgressDialog(self.parent, "Export CSV", "Exported")
+
+        def work(db):
+            with open(file_path, "w", newline="", encoding="utf-8") as f:
+                return export_students(
+                    db,
+                    f,
+                    progress=dialog.progress,
+                    cancel_event=dialog.cancel_event,
+                )
+
+        def on_done(count):
+            dialog.close()
+            self.tree.after_idle(
+                messagebox.showinfo,
+                "Success",
+                f"{count:,} records exported to {file_path}",
+            )
+
+        def on_error(error):
+            dialog.close()
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            if isinstance(error, OperationCancelled):
+                messagebox.showinfo("Info", str(error))
+            else:
+                messagebox.showerror("Error", f"Failed to export records: {error}")
+
+        # The dialog owns cancellation, so the global Cancel leaves exports alone
+        self.executor.submit(
+            work,
+            on_success=on_done,
+            on_error=on_error,
+            cancellable=False,
+            label="export_to_csv",
+        )
+
+    def import_from_csv(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV Files", "*.csv")],
+            title="Import Student Records",
+        )
+
+        if not file_path:
+            return
+
+        dialog = ProgressDialog(self.parent, "Import CSV", "Processed")
+
+        def work(db):
+            with open(file_path, newline="", encoding="utf-8") as f:
+                return import_students(
+                    db,
+                    f,
+                    progress=dialog.progress,
+                    cancel_event=dialog.cancel_event,
+                    use_load_data=db.allow_local_infile,
+                )
+
+        def on_done(report):
+            dialog.close()
+            # Rebuilding on the next fuzzy search is cheaper than reading a
+            # whole import back through the change feed; filter plans were
+            # chosen for the old data
+            self.fuzzy_index.clear()
+            self.filter_planner.clear()
+            self.tree.after_idle(
+                messagebox.showinfo, "Import Complete", report.summary()
+            )
+            self.refresh_table()
+
+        def on_error(error):
+            dialog.close()
+            self.fuzzy_index.clear()
+            self.filter_planner.clear()
+            if isinstance(error, OperationCancelled):
+                messagebox.showinfo("Info", str(error))
+            else:
+                messagebox.showerror("Error", f"Failed to import records: {error}")
+            self.refresh_table()
+
+        self.executor.submit(
+            work,
+            on_success=on_done,
+            on_error=on_error,
+            cancellable=False,
+            label="import_from_csv",
+        )
 
-                for record in records:
-                    dob = record[4].strftime("%Y-%m-%d") if record[4] else ""
-                    line = f"{record[0]},{record[1]},{record[2]},{record[3]},{dob},{record[5]}\n"
-                    f.write(line)
+    def show_statistics(self):
+        StatisticsDialog(self.parent, self.db_manager, self.executor)
 
-            messagebox.showinfo("Success", f"Records exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export records: {e}")
+    def show_diagnostics(self):
+        if self.db_manager.metrics is None:
+            messagebox.showinfo(
+                "Info", "Diagnostics are disabled ([DIAGNOSTICS] enabled = no)"
+            )
+            return
+        DiagnosticsDialog(self.parent, self.db_manager.metrics)
 
     def configure_database(self):
         """Open database configuration dialog."""
         config_dialog = tk.Toplevel(self.parent)
         config_dialog.title("Database Configuration")
-        config_dialog.geometry("400x300")
+        config_dialog.geometry("400x410")
         config_dialog.resizable(False, False)
         config_dialog.configure(bg=self.theme["frame_color"])
 
@@ -266,7 +1032,10 @@ class StudentTableView:
 
         # Form fields
         fields = [
+            ("Backend", "backend", current_config.get("backend", "mysql")),
+            ("SQLite file", "path", current_config.get("path", "students.db")),
             ("Host", "host", current_config.get("host", "localhost")),
+            ("Port", "port", current_config.get("port", "3306")),
             ("Username", "user", current_config.get("user", "root")),
             ("Password", "password", current_config.get("password", "")),
             ("Database", "database", current_config.get("database", "uobs")),
@@ -300,14 +1069,17 @@ class StudentTableView:
         def save_config():
             """Save the new configuration."""
             new_config = {
+                "backend": entries["backend"].get().strip().lower(),
+                "path": entries["path"].get(),
                 "host": entries["host"].get(),
+                "port": entries["port"].get().strip(),
                 "user": entries["user"].get(),
                 "password": entries["password"].get(),
                 "database": entries["database"].get(),
             }
 
-            # Update config
-            self.db_manager.config["DATABASE"] = new_config
+            # Update config; keys the dialog does not show are kept
+            self.db_manager.config["DATABASE"].update(new_config)
 
             # Write to file
             with open(self.db_manager.config_file, "w") as configfile: